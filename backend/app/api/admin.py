@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import get_async_read_db
+from app.core.deps import get_current_admin_user
+from app.core.profiling import ProfileStore, arm_requests, armed_requests
+from app.models import User
+from app.schemas import JobMetricsResponse, ProfilingArmRequest, ProfilingArmResponse, ProfileInfo
+from app.services.job_metrics_service import JobMetricsService
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/metrics/jobs", response_model=JobMetricsResponse)
+async def get_job_metrics(
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    days: int = Query(7, ge=1, le=90, description="Only include jobs from the last N days"),
+):
+    """Per-stage latency percentiles and token usage across recent research jobs"""
+    metrics_service = JobMetricsService()
+    return JobMetricsResponse(**await metrics_service.summary(db, days=days))
+
+
+def _require_profiling():
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Profiling is disabled (PROFILING_ENABLED)"
+        )
+
+
+@router.post("/profiling/arm", response_model=ProfilingArmResponse)
+async def arm_request_profiling(
+    arm_request: ProfilingArmRequest,
+    current_user: User = Depends(get_current_admin_user),
+):
+    """Profile the next requests whose path starts with the given prefix"""
+    _require_profiling()
+    await run_in_threadpool(arm_requests, arm_request.path_prefix, arm_request.count)
+    logger.info(f"Profiling armed for {arm_request.count} request(s) under {arm_request.path_prefix}")
+    return ProfilingArmResponse(armed=await run_in_threadpool(armed_requests))
+
+
+@router.get("/profiling/profiles", response_model=List[ProfileInfo])
+async def list_profiles(
+    current_user: User = Depends(get_current_admin_user),
+    kind: Optional[str] = Query(None, pattern="^(requests|tasks|rolling)$"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Stored profiles, newest first"""
+    return await run_in_threadpool(ProfileStore().list, kind, limit)
+
+
+@router.get("/profiling/profiles/{kind}/{name}")
+async def download_profile(
+    kind: str,
+    name: str,
+    current_user: User = Depends(get_current_admin_user),
+):
+    """A profile as collapsed stacks (load it in speedscope.app or flamegraph.pl)"""
+    path = ProfileStore().path(f"{kind}/{name}")
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path=path, media_type="text/plain", filename=name)
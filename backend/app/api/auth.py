@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash
-from app.core.deps import get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.security import (
+    create_access_token,
+    hash_password_async,
+    verify_and_update_password_async,
+)
+from app.core.deps import get_current_user_readonly
 from app.models import User
 from app.models.user import SubscriptionTier, PaymentProvider
 from app.schemas import UserCreate, UserLogin, TokenResponse, UserResponse
 from app.services.email_service import EmailService
+from app.services.email_outbox_service import EmailOutboxService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,10 +21,11 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).filter(User.email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,10 +37,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     payment_service = PaymentService()
     payment_provider = payment_service.get_payment_provider(user_data.country)
 
+    # Hash off the event loop
+    hashed_password = await hash_password_async(user_data.password)
+
     # Create new user
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         full_name=user_data.full_name,
         company_name=user_data.company_name,
         country=user_data.country.upper(),
@@ -44,19 +54,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # Welcome email goes out once the account is committed (drain_email_outbox)
+    await EmailOutboxService().queue_async(db, EmailService().welcome_email(user.email, user.full_name))
+    await db.commit()
+    await db.refresh(user)
 
     logger.info(f"New user registered: {user.email} (ID: {user.id})")
 
-    # Send welcome email
-    email_service = EmailService()
-    try:
-        await email_service.send_welcome_email(user.email, user.full_name)
-    except Exception as e:
-        logger.error(f"Failed to send welcome email: {str(e)}")
-        # Don't fail registration if email fails
-
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
 
@@ -83,12 +87,23 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
     # Find user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    result = await db.execute(select(User).filter(User.email == credentials.email))
+    user = result.scalars().first()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    verified, new_hash = await verify_and_update_password_async(
+        credentials.password, user.hashed_password
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -101,6 +116,12 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Account is inactive"
         )
 
+    # Upgrade hashes created with old cost parameters
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        logger.info(f"Rehashed password for user {user.id}")
+
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
 
@@ -129,7 +150,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_user_readonly)):
     """Get current user information"""
     return UserResponse(
         id=current_user.id,
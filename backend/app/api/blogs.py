@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.deps import get_current_user
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db, get_async_read_db
+from app.core.deps import get_current_user, get_current_user_readonly
+from app.core.http_cache import IMMUTABLE, REVALIDATE, etag_matches, make_etag, not_modified
 from app.models import User, Blog
-from app.schemas import BlogResponse, BlogListResponse, BlogSummary
+from app.schemas import (
+    BlogResponse,
+    BlogListResponse,
+    BlogSummary,
+    BlogSearchResponse,
+    BlogSearchResult,
+    BlogEnhanceRequest,
+    BlogEnhanceResponse,
+)
+from app.services.search_service import BlogSearchService
 from app.services.storage_service import StorageService
+from app.tasks.blog_tasks import enhance_blog_task
 from typing import Optional
 import logging
 import os
@@ -17,22 +29,24 @@ router = APIRouter(prefix="/blogs", tags=["Blogs"])
 
 @router.get("", response_model=BlogListResponse)
 async def list_blogs(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
 ):
     """List all blogs for the current user"""
-    query = db.query(Blog).filter(Blog.user_id == current_user.id)
+    query = select(Blog).filter(Blog.user_id == current_user.id)
 
-    total = query.count()
+    total = await db.scalar(
+        select(func.count()).select_from(query.subquery())
+    )
 
-    blogs = (
+    result = await db.execute(
         query.order_by(Blog.created_at.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
-        .all()
     )
+    blogs = result.scalars().all()
 
     return BlogListResponse(
         blogs=[BlogResponse.from_orm(blog) for blog in blogs],
@@ -42,18 +56,57 @@ async def list_blogs(
     )
 
 
+@router.get("/search", response_model=BlogSearchResponse)
+async def search_blogs(
+    q: str = Query(..., min_length=1, max_length=200),
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+):
+    """Full-text search over the current user's blogs, ranked with highlighted snippets"""
+    search_service = BlogSearchService()
+    results, total = await search_service.search(
+        db, current_user.id, q, page=page, page_size=page_size
+    )
+
+    return BlogSearchResponse(
+        query=q,
+        results=[BlogSearchResult(**result) for result in results],
+        total=total,
+        page=page,
+        page_size=page_size,
+    )
+
+
 @router.get("/{blog_id}", response_model=BlogResponse)
 async def get_blog(
     blog_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
+    if_none_match: Optional[str] = Header(None),
 ):
     """Get a specific blog"""
-    blog = (
-        db.query(Blog)
-        .filter(Blog.id == blog_id, Blog.user_id == current_user.id)
-        .first()
+    # Validate against the row version before loading the content column
+    version = await db.scalar(
+        select(Blog.version).filter(Blog.id == blog_id, Blog.user_id == current_user.id)
+    )
+
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blog not found"
+        )
+
+    etag = make_etag("blog", blog_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    result = await db.execute(
+        select(Blog).filter(Blog.id == blog_id, Blog.user_id == current_user.id)
     )
+    blog = result.scalars().first()
 
     if not blog:
         raise HTTPException(
@@ -61,21 +114,25 @@ async def get_blog(
             detail="Blog not found"
         )
 
+    response.headers["ETag"] = make_etag("blog", blog.id, blog.version)
+    response.headers["Cache-Control"] = REVALIDATE
     return BlogResponse.from_orm(blog)
 
 
 @router.get("/{blog_id}/download/markdown")
 async def download_markdown(
     blog_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
+    v: Optional[int] = Query(None, description="Blog version; versioned URLs are cached as immutable"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """Download blog as Markdown file"""
-    blog = (
-        db.query(Blog)
+    result = await db.execute(
+        select(Blog.title, Blog.version, Blog.markdown_file_path)
         .filter(Blog.id == blog_id, Blog.user_id == current_user.id)
-        .first()
     )
+    blog = result.first()
 
     if not blog:
         raise HTTPException(
@@ -83,6 +140,11 @@ async def download_markdown(
             detail="Blog not found"
         )
 
+    etag = make_etag("blog", blog_id, blog.version, variant="markdown")
+    cache_control = IMMUTABLE if v == blog.version else REVALIDATE
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+
     if not blog.markdown_file_path or not os.path.exists(blog.markdown_file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -96,21 +158,24 @@ async def download_markdown(
         path=blog.markdown_file_path,
         media_type="text/markdown",
         filename=filename,
+        headers={"ETag": etag, "Cache-Control": cache_control},
     )
 
 
 @router.get("/{blog_id}/download/pdf")
 async def download_pdf(
     blog_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
+    v: Optional[int] = Query(None, description="Blog version; versioned URLs are cached as immutable"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """Download blog as PDF file"""
-    blog = (
-        db.query(Blog)
+    result = await db.execute(
+        select(Blog.title, Blog.version, Blog.pdf_file_path)
         .filter(Blog.id == blog_id, Blog.user_id == current_user.id)
-        .first()
     )
+    blog = result.first()
 
     if not blog:
         raise HTTPException(
@@ -118,6 +183,11 @@ async def download_pdf(
             detail="Blog not found"
         )
 
+    etag = make_etag("blog", blog_id, blog.version, variant="pdf")
+    cache_control = IMMUTABLE if v == blog.version else REVALIDATE
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+
     if not blog.pdf_file_path or not os.path.exists(blog.pdf_file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -131,6 +201,41 @@ async def download_pdf(
         path=blog.pdf_file_path,
         media_type="application/pdf",
         filename=filename,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+@router.post(
+    "/{blog_id}/enhance",
+    response_model=BlogEnhanceResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enhance_blog(
+    blog_id: int,
+    enhance_data: BlogEnhanceRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Start enhancing a blog in the background; the result is saved as a new version"""
+    version = await db.scalar(
+        select(Blog.version).filter(Blog.id == blog_id, Blog.user_id == current_user.id)
+    )
+
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blog not found"
+        )
+
+    task = enhance_blog_task.delay(blog_id, enhance_data.enhancement_type)
+
+    logger.info(f"Started Celery task {task.id} to enhance blog {blog_id}")
+
+    return BlogEnhanceResponse(
+        blog_id=blog_id,
+        enhancement_type=enhance_data.enhancement_type,
+        task_id=task.id,
+        version=version,
     )
 
 
@@ -138,14 +243,13 @@ async def download_pdf(
 async def delete_blog(
     blog_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a blog"""
-    blog = (
-        db.query(Blog)
-        .filter(Blog.id == blog_id, Blog.user_id == current_user.id)
-        .first()
+    result = await db.execute(
+        select(Blog).filter(Blog.id == blog_id, Blog.user_id == current_user.id)
     )
+    blog = result.scalars().first()
 
     if not blog:
         raise HTTPException(
@@ -161,8 +265,8 @@ async def delete_blog(
     )
 
     # Delete from database
-    db.delete(blog)
-    db.commit()
+    await db.delete(blog)
+    await db.commit()
 
     logger.info(f"Deleted blog {blog_id}")
 
@@ -171,16 +275,15 @@ async def delete_blog(
 
 @router.get("/stats/summary")
 async def get_blog_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Get blog statistics for the current user"""
-    total_blogs = db.query(Blog).filter(Blog.user_id == current_user.id).count()
-
-    total_words = db.query(Blog).filter(Blog.user_id == current_user.id).with_entities(
-        Blog.word_count
-    ).all()
-    total_word_count = sum([w[0] for w in total_words if w[0]])
+    result = await db.execute(
+        select(func.count(Blog.id), func.coalesce(func.sum(Blog.word_count), 0))
+        .filter(Blog.user_id == current_user.id)
+    )
+    total_blogs, total_word_count = result.one()
 
     return {
         "total_blogs": total_blogs,
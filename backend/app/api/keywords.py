@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_read_db
+from app.core.deps import get_current_user_readonly
+from app.models import User
+from app.schemas import TrendingKeywordsResponse, KeywordFrequency
+from app.services.keyword_index_service import KeywordIndexService
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/keywords", tags=["Keywords"])
+
+
+@router.get("/trending", response_model=TrendingKeywordsResponse)
+async def get_trending_keywords(
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
+    sector: Optional[str] = Query(None, max_length=100),
+    location: Optional[str] = Query(None, max_length=100),
+    days: Optional[int] = Query(None, ge=1, le=365, description="Only count jobs from the last N days"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Most frequently recurring keywords across research jobs"""
+    keyword_service = KeywordIndexService()
+    keywords = await keyword_service.top_keywords(
+        db, sector=sector, location=location, days=days, limit=limit
+    )
+
+    return TrendingKeywordsResponse(
+        sector=sector,
+        location=location,
+        days=days,
+        keywords=[KeywordFrequency(**keyword) for keyword in keywords],
+    )
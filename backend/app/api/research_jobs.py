@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.deps import get_current_user
-from app.models import User, ResearchJob, JobStatus
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal, get_async_db, get_async_read_db
+from app.core.deps import get_current_user, get_current_user_readonly
+from app.core.http_cache import REVALIDATE, etag_matches, make_etag, not_modified
+from app.models import User, ResearchJob, JobStatus, Blog
 from app.schemas import ResearchJobCreate, ResearchJobResponse, ResearchJobListResponse
+from app.services.job_event_service import JOB_DELETED, JobEventService, TERMINAL_STATUSES
 from app.tasks.blog_tasks import generate_blog_task
 from typing import Optional
+import json
 import logging
+import redis
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +23,7 @@ router = APIRouter(prefix="/jobs", tags=["Research Jobs"])
 async def create_research_job(
     job_data: ResearchJobCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new research job and start blog generation"""
     # Check if user can create more blogs
@@ -46,15 +52,15 @@ async def create_research_job(
     )
 
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
 
     logger.info(f"Created research job {job.id} for user {current_user.id}")
 
     # Start background task
     task = generate_blog_task.delay(job.id)
     job.celery_task_id = task.id
-    db.commit()
+    await db.commit()
 
     logger.info(f"Started Celery task {task.id} for job {job.id}")
 
@@ -63,26 +69,28 @@ async def create_research_job(
 
 @router.get("", response_model=ResearchJobListResponse)
 async def list_research_jobs(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     status: Optional[JobStatus] = None,
 ):
     """List all research jobs for the current user"""
-    query = db.query(ResearchJob).filter(ResearchJob.user_id == current_user.id)
+    query = select(ResearchJob).filter(ResearchJob.user_id == current_user.id)
 
     if status:
         query = query.filter(ResearchJob.status == status)
 
-    total = query.count()
+    total = await db.scalar(
+        select(func.count()).select_from(query.subquery())
+    )
 
-    jobs = (
+    result = await db.execute(
         query.order_by(ResearchJob.created_at.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
-        .all()
     )
+    jobs = result.scalars().all()
 
     return ResearchJobListResponse(
         jobs=[ResearchJobResponse.from_orm(job) for job in jobs],
@@ -95,37 +103,139 @@ async def list_research_jobs(
 @router.get("/{job_id}", response_model=ResearchJobResponse)
 async def get_research_job(
     job_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    response: Response,
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
+    if_none_match: Optional[str] = Header(None),
 ):
     """Get a specific research job"""
-    job = (
-        db.query(ResearchJob)
+    # Validate against the row version before loading research_data
+    version = await db.scalar(
+        select(ResearchJob.version)
         .filter(ResearchJob.id == job_id, ResearchJob.user_id == current_user.id)
-        .first()
     )
 
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Research job not found"
+        )
+
+    etag = make_etag("job", job_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    result = await db.execute(
+        select(ResearchJob)
+        .filter(ResearchJob.id == job_id, ResearchJob.user_id == current_user.id)
+    )
+    job = result.scalars().first()
+
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Research job not found"
         )
 
+    response.headers["ETag"] = make_etag("job", job.id, job.version)
+    response.headers["Cache-Control"] = REVALIDATE
     return ResearchJobResponse.from_orm(job)
 
 
+@router.get("/{job_id}/events")
+async def stream_research_job_events(
+    job_id: int,
+    current_user: User = Depends(get_current_user_readonly),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Stream status transitions for a research job as server-sent events"""
+    exists = await db.scalar(
+        select(ResearchJob.id)
+        .filter(ResearchJob.id == job_id, ResearchJob.user_id == current_user.id)
+    )
+
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Research job not found"
+        )
+
+    event_service = JobEventService()
+    try:
+        pubsub = await event_service.subscribe(job_id)
+    except redis.RedisError as e:
+        logger.warning(f"Job events unavailable for job {job_id}: {str(e)}")
+        pubsub = None
+
+    # Snapshot from the primary only after subscribing, so a transition
+    # can't slip between the read and the subscription. Both happen before
+    # the response starts, so a failure is a status code rather than a
+    # stream cut short, which EventSource would retry in a loop.
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(ResearchJob.status, ResearchJob.error_message, Blog.id)
+                .outerjoin(Blog, Blog.research_job_id == ResearchJob.id)
+                .filter(ResearchJob.id == job_id)
+            )
+            row = result.one_or_none()
+    except BaseException:
+        if pubsub is not None:
+            await event_service.unsubscribe(pubsub)
+        raise
+
+    if row is None:
+        # Deleted since the ownership check
+        snapshot = event_service.build_event(job_id, JOB_DELETED)
+    else:
+        job_status, error_message, blog_id = row
+        snapshot = event_service.build_event(
+            job_id, job_status, error_message=error_message, blog_id=blog_id
+        )
+
+    if pubsub is None:
+        # Clients fall back to polling GET /jobs/{id}
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=snapshot,
+            headers={"Retry-After": "5"},
+        )
+
+    async def event_stream():
+        try:
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+
+            async for event in event_service.listen(pubsub):
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+                if event.get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            await event_service.unsubscribe(pubsub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_research_job(
     job_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a research job"""
-    job = (
-        db.query(ResearchJob)
+    result = await db.execute(
+        select(ResearchJob)
         .filter(ResearchJob.id == job_id, ResearchJob.user_id == current_user.id)
-        .first()
     )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(
@@ -140,8 +250,8 @@ async def delete_research_job(
             detail="Cannot delete a job that is in progress"
         )
 
-    db.delete(job)
-    db.commit()
+    await db.delete(job)
+    await db.commit()
 
     logger.info(f"Deleted research job {job_id}")
 
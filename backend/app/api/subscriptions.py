@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.deps import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.deps import get_current_user, get_current_user_readonly
 from app.models import User, SubscriptionTier
 from app.schemas import (
     SubscriptionCreate,
@@ -10,7 +11,11 @@ from app.schemas import (
     PaymentMethodResponse,
 )
 from app.services.payment_service import PaymentService
+from app.services.payment_gateway import PaymentProviderUnavailable
 from app.services.email_service import EmailService
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.stripe_webhook_service import StripeWebhookService, HANDLED_EVENTS
+from app.tasks.webhook_tasks import process_stripe_webhooks
 from datetime import datetime
 import logging
 
@@ -19,8 +24,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/subscriptions", tags=["Subscriptions"])
 
 
+def _provider_unavailable(error: PaymentProviderUnavailable) -> HTTPException:
+    """503 for a provider that's down or overloaded; nothing was charged"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(settings.PAYMENT_BREAKER_RESET_SECONDS)},
+    )
+
+
 @router.get("/pricing", response_model=list[PricingInfo])
-async def get_pricing(current_user: User = Depends(get_current_user)):
+async def get_pricing(current_user: User = Depends(get_current_user_readonly)):
     """Get pricing information for user's country"""
     payment_service = PaymentService()
     pricing = payment_service.get_pricing_info(current_user.country)
@@ -28,7 +42,7 @@ async def get_pricing(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/payment-method", response_model=PaymentMethodResponse)
-async def get_payment_method(current_user: User = Depends(get_current_user)):
+async def get_payment_method(current_user: User = Depends(get_current_user_readonly)):
     """Get payment method details (Stripe or Paystack) for user's country"""
     payment_service = PaymentService()
     payment_info = payment_service.get_publishable_key(current_user.country)
@@ -40,7 +54,7 @@ async def get_payment_method(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/current", response_model=SubscriptionResponse)
-async def get_current_subscription(current_user: User = Depends(get_current_user)):
+async def get_current_subscription(current_user: User = Depends(get_current_user_readonly)):
     """Get current user's subscription details"""
     return SubscriptionResponse(
         tier=current_user.subscription_tier,
@@ -56,7 +70,7 @@ async def get_current_subscription(current_user: User = Depends(get_current_user
 async def create_subscription(
     subscription_data: SubscriptionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new subscription (upgrade/change plan)"""
     # Validate tier
@@ -86,23 +100,23 @@ async def create_subscription(
                 result["current_period_end"]
             )
 
-            db.commit()
-
-            # Send confirmation email
-            email_service = EmailService()
+            # Confirmation email, committed with the plan change
             pricing = payment_service.get_pricing_info(current_user.country)
             tier_pricing = next(
                 (p for p in pricing if p["tier"] == subscription_data.tier), None
             )
 
             if tier_pricing:
-                await email_service.send_subscription_confirmation(
+                await EmailOutboxService().queue_async(db, EmailService().subscription_confirmation(
+                    reference=result["subscription_id"],
                     to_email=current_user.email,
                     user_name=current_user.full_name,
                     tier=subscription_data.tier.value,
                     amount=tier_pricing["price"],
                     currency=tier_pricing["currency"],
-                )
+                ))
+
+            await db.commit()
 
             return {
                 "status": "success",
@@ -126,6 +140,9 @@ async def create_subscription(
                 "reference": result["reference"],
             }
 
+    except PaymentProviderUnavailable as e:
+        logger.warning(f"Failed to create subscription: {str(e)}")
+        raise _provider_unavailable(e)
     except Exception as e:
         logger.error(f"Failed to create subscription: {str(e)}")
         raise HTTPException(
@@ -137,7 +154,7 @@ async def create_subscription(
 @router.post("/cancel", status_code=status.HTTP_200_OK)
 async def cancel_subscription(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Cancel current subscription"""
     if current_user.subscription_tier == SubscriptionTier.FREE:
@@ -161,7 +178,7 @@ async def cancel_subscription(
             current_user.subscription_id = None
             current_user.subscription_status = "canceled"
 
-            db.commit()
+            await db.commit()
 
             return {
                 "status": "success",
@@ -170,6 +187,9 @@ async def cancel_subscription(
         else:
             raise Exception("Failed to cancel subscription")
 
+    except PaymentProviderUnavailable as e:
+        logger.warning(f"Failed to cancel subscription: {str(e)}")
+        raise _provider_unavailable(e)
     except Exception as e:
         logger.error(f"Failed to cancel subscription: {str(e)}")
         raise HTTPException(
@@ -182,72 +202,48 @@ async def cancel_subscription(
 async def stripe_webhook(
     request: Request,
     stripe_signature: str = Header(None, alias="stripe-signature"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Handle Stripe webhooks"""
+    """
+    Handle Stripe webhooks
+
+    The event is only verified and recorded here; process_stripe_webhooks
+    applies it. Stripe's redeliveries of an event already recorded are
+    acknowledged without doing anything.
+    """
     payment_service = PaymentService()
+    webhooks = StripeWebhookService()
 
+    payload = await request.body()
     try:
-        payload = await request.body()
         event = payment_service.construct_stripe_webhook_event(
             payload, stripe_signature
         )
+    except Exception as e:
+        logger.error(f"Stripe webhook error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Handle different event types
-        if event["type"] == "invoice.payment_succeeded":
-            # Payment successful, ensure subscription is active
-            subscription_id = event["data"]["object"]["subscription"]
-            customer_id = event["data"]["object"]["customer"]
-
-            user = db.query(User).filter(
-                User.stripe_customer_id == customer_id
-            ).first()
-
-            if user:
-                user.subscription_status = "active"
-                db.commit()
-                logger.info(f"Subscription payment succeeded for user {user.id}")
-
-        elif event["type"] == "invoice.payment_failed":
-            # Payment failed
-            customer_id = event["data"]["object"]["customer"]
-
-            user = db.query(User).filter(
-                User.stripe_customer_id == customer_id
-            ).first()
-
-            if user:
-                user.subscription_status = "past_due"
-                db.commit()
-                logger.warning(f"Subscription payment failed for user {user.id}")
-
-        elif event["type"] == "customer.subscription.deleted":
-            # Subscription canceled
-            subscription_id = event["data"]["object"]["id"]
-
-            user = db.query(User).filter(
-                User.subscription_id == subscription_id
-            ).first()
-
-            if user:
-                user.subscription_tier = SubscriptionTier.FREE
-                user.subscription_status = "canceled"
-                user.subscription_id = None
-                db.commit()
-                logger.info(f"Subscription canceled for user {user.id}")
+    if event["type"] not in HANDLED_EVENTS:
+        return {"status": "ignored"}
 
-        return {"status": "success"}
+    # A database error here is a 500, so Stripe delivers the event again
+    if not await webhooks.record(db, event, payload):
+        return {"status": "duplicate"}
 
+    try:
+        process_stripe_webhooks.delay(webhooks.customer_id(event))
     except Exception as e:
-        logger.error(f"Stripe webhook error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+        # Recorded, so sweep_stripe_webhooks will pick it up
+        logger.error(f"Failed to queue Stripe event {event['id']}: {str(e)}")
+
+    return {"status": "success"}
 
 
 @router.get("/verify/paystack/{reference}")
 async def verify_paystack_payment(
     reference: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Verify Paystack payment after redirect"""
     payment_service = PaymentService()
@@ -267,23 +263,24 @@ async def verify_paystack_payment(
                 # Note: Paystack doesn't have subscription IDs like Stripe
                 # You might store the reference or handle recurring billing differently
 
-                db.commit()
-
-                # Send confirmation email
-                email_service = EmailService()
+                # Confirmation email, committed with the plan change; verifying
+                # the same reference again doesn't send a second one
                 pricing = payment_service.get_pricing_info(current_user.country)
                 tier_pricing = next(
                     (p for p in pricing if p["tier"].value == tier), None
                 )
 
                 if tier_pricing:
-                    await email_service.send_subscription_confirmation(
+                    await EmailOutboxService().queue_async(db, EmailService().subscription_confirmation(
+                        reference=reference,
                         to_email=current_user.email,
                         user_name=current_user.full_name,
                         tier=tier,
                         amount=tier_pricing["price"],
                         currency=tier_pricing["currency"],
-                    )
+                    ))
+
+                await db.commit()
 
                 return {
                     "status": "success",
@@ -295,6 +292,9 @@ async def verify_paystack_payment(
             "message": "Payment verification failed"
         }
 
+    except PaymentProviderUnavailable as e:
+        logger.warning(f"Paystack verification error: {str(e)}")
+        raise _provider_unavailable(e)
     except Exception as e:
         logger.error(f"Paystack verification error: {str(e)}")
         raise HTTPException(
@@ -13,29 +13,127 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
 
+    # Password hashing (bcrypt runs on a dedicated thread pool)
+    BCRYPT_ROUNDS: int = 12  # Existing hashes with a different cost are rehashed on login
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Pending hashes beyond workers before returning 503
+
     # Database
     DATABASE_URL: str
+    DATABASE_READ_URL: Optional[str] = None  # Read replica for list/get/stats endpoints
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced, -1 to disable
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout (extra round trip)
+    DB_PGBOUNCER: bool = False  # Defer pooling to PgBouncer (transaction mode safe)
 
     # Redis
     REDIS_URL: str
+    CELERY_BROKER_URL: Optional[str] = None  # Defaults to REDIS_URL (memory:// for in-process benchmarks)
+    CELERY_RESULT_BACKEND: Optional[str] = None  # Defaults to REDIS_URL
+
+    # Metrics (Prometheus; set PROMETHEUS_MULTIPROC_DIR in the environment for multi-process servers)
+    METRICS_ENABLED: bool = True  # Serve /metrics and record HTTP latencies
+    METRICS_WORKER_PORT: Optional[int] = None  # Port Celery workers expose their own /metrics on
+    METRICS_CELERY_QUEUES: list = ["celery", "email"]  # Broker queues whose depth is reported
+
+    # Tracing (OpenTelemetry; spans from the API through Celery into the services)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"  # "otlp" (HTTP) or "file" (JSON lines, for local runs and tests)
+    TRACING_OTLP_ENDPOINT: Optional[str] = None  # e.g. http://collector:4318/v1/traces; defaults to OTEL_EXPORTER_OTLP_ENDPOINT
+    TRACING_FILE_PATH: str = "/tmp/content-scout-traces.jsonl"
+    TRACING_SERVICE_NAME: str = "content-scout"  # Suffixed with -api / -worker
+    TRACING_SAMPLE_RATE: float = 1.0  # Fraction of new traces kept; continued traces follow their parent
+
+    # Sampling profiler (off unless PROFILING_ENABLED; profiles are collapsed stacks for flame graphs)
+    PROFILING_ENABLED: bool = False
+    PROFILING_PATH: Optional[str] = None  # Defaults to STORAGE_PATH/profiles
+    PROFILING_INTERVAL_MS: float = 5.0  # Sampling interval for request and task profiles
+    PROFILING_HEADER: str = "X-Profile"  # Requests sending this header with PROFILING_TOKEN are profiled
+    PROFILING_TOKEN: Optional[str] = None  # Header trigger is off without a token (admins can still arm paths)
+    PROFILING_TASKS: list = []  # Celery task names to profile, e.g. ["generate_blog_task"], or ["*"]
+    PROFILING_TASK_SAMPLE_RATE: float = 1.0  # Fraction of matching task runs profiled
+    PROFILING_KEEP_PROFILES: int = 200  # Newest request/task profiles kept, per kind
+    PROFILING_CONTINUOUS: bool = False  # Rolling whole-process profile in every API/worker process
+    PROFILING_CONTINUOUS_INTERVAL_MS: float = 50.0
+    PROFILING_DUMP_SECONDS: int = 300  # One rolling flame graph per window
+    PROFILING_KEEP_DUMPS: int = 288  # Newest rolling dumps kept (a day of 5 minute windows for one process)
 
     # Claude AI
     ANTHROPIC_API_KEY: str
     AI_MODEL: Optional[str] = None  # Optional, defaults to hardcoded model in service
+    ANTHROPIC_BASE_URL: Optional[str] = None  # Override the API host, e.g. benchmarks/fake_anthropic.py
+    PROMPT_INPUT_TOKEN_BUDGET: int = 2500  # Estimated tokens per blog prompt; research context is trimmed to fit
+    PROMPT_CUSTOM_INSTRUCTIONS_TOKENS: int = 400  # Longer custom instructions are cut
+    GENERATION_MAX_OUTPUT_TOKENS: int = 8192  # Model's completion limit
+    GENERATION_TOKENS_PER_WORD: float = 1.5  # max_tokens = top of word range x this + overhead
+    PROMPT_CACHING_ENABLED: bool = True  # Mark shared long-form preambles for prompt caching
+    LONGFORM_ENABLED: bool = True  # Section-wise parallel generation for long posts
+    LONGFORM_MIN_WORDS: int = 2500  # Word targets reaching this use long-form mode (as does "comprehensive" depth)
+    LONGFORM_MAX_CONCURRENCY: int = 6  # Section requests in flight per post
+    ENHANCE_MAX_CONCURRENCY: int = 4  # Section rewrites in flight per enhancement
+    ENHANCE_CACHE_TTL_SECONDS: int = 604800  # Enhanced sections are reused for 7 days
+
+    # Research fetching (search feed URL takes a {query} placeholder, RSS response)
+    RESEARCH_FETCH_ENABLED: bool = True  # False = research from the queries alone (offline dev)
+    RESEARCH_SEARCH_URL: str = "https://www.bing.com/news/search?q={query}&format=rss"
+    RESEARCH_RESULTS_PER_QUERY: int = 5
+    RESEARCH_MAX_PAGE_BYTES: int = 512000  # Stop reading a result page after this many bytes
+    RESEARCH_FETCH_CONCURRENCY: int = 8  # Global cap on pages in flight per research run
+    RESEARCH_FETCH_TIMEOUT: float = 10.0  # Seconds
+    RESEARCH_HOST_RATE: float = 1.0  # Requests per second per host (token bucket refill)
+    RESEARCH_HOST_BURST: int = 2  # Bucket size: back-to-back requests allowed per host
+    RESEARCH_HOST_CONCURRENCY: int = 2  # Requests in flight per host
+    RESEARCH_HOST_MAX_FAILURES: int = 3  # Consecutive timeouts/errors before skipping a host for the run
+    RESEARCH_ROBOTS_TTL: int = 3600  # Seconds robots.txt rules are cached
+
+    # Research snapshots (popular sector/location pairs refreshed by Celery beat)
+    RESEARCH_SNAPSHOT_ENABLED: bool = True
+    RESEARCH_SNAPSHOT_TOP_N: int = 20  # Pairs kept warm
+    RESEARCH_SNAPSHOT_POPULARITY_DAYS: int = 30  # Job history window used to pick them
+    RESEARCH_SNAPSHOT_REFRESH_MINUTES: int = 60  # Beat interval; keep below half the shortest max age
+    RESEARCH_SNAPSHOT_MAX_AGE_HOURS: int = 12  # Older snapshots are never served
+    RESEARCH_SNAPSHOT_SECTOR_MAX_AGE_HOURS: dict = {}  # Per-sector overrides, e.g. {"Finance": 3}
+    RESEARCH_SNAPSHOT_KEEP_VERSIONS: int = 3
 
     # Email
     RESEND_API_KEY: str = ""
     FROM_EMAIL: str = "noreply@contentscout.com"
+    EMAIL_SEND_TIMEOUT: float = 15.0  # Seconds per Resend batch request
+    EMAIL_OUTBOX_QUEUE: str = "email"  # Celery queue the outbox is drained from
+    EMAIL_OUTBOX_POLL_SECONDS: int = 5  # Beat interval for drain_email_outbox
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100  # Emails per Resend batch request (max 100)
+    EMAIL_OUTBOX_MAX_BATCHES: int = 20  # Batches per drain before yielding to the next run
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30  # Doubles per attempt
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_OUTBOX_CLAIM_TIMEOUT: int = 300  # Seconds before a claim from a crashed drain is retaken
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 30  # Sent emails are purged after this; failed ones are kept
+    EMAIL_DIGEST_ENABLED: bool = True  # Summarise jobs finishing close together in one email per user
+    EMAIL_DIGEST_WINDOW_MINUTES: int = 10  # The first job is emailed at once, the rest at the end of the window
+    EMAIL_DIGEST_POLL_SECONDS: int = 60  # Beat interval for send_notification_digests
     ADMIN_EMAIL: str = "admin@contentscout.com"
 
     # Payments
     STRIPE_SECRET_KEY: str
     STRIPE_PUBLISHABLE_KEY: str
     STRIPE_WEBHOOK_SECRET: Optional[str] = None
+    WEBHOOK_SWEEP_SECONDS: int = 60  # Beat interval for re-queueing events left pending this long
+    WEBHOOK_EVENT_RETENTION_DAYS: int = 30  # Handled events are deduplicated until purged (Stripe retries for 3 days)
 
     PAYSTACK_SECRET_KEY: str
     PAYSTACK_PUBLIC_KEY: str
 
+    # Payment provider calls (app/services/payment_gateway.py)
+    STRIPE_TIMEOUT: float = 10.0  # Seconds per Stripe HTTP request, and max time a call may queue
+    STRIPE_MAX_CONCURRENCY: int = 8  # Threads running Stripe SDK calls
+    STRIPE_MAX_QUEUE: int = 32  # Pending Stripe calls beyond the threads before returning 503
+    PAYSTACK_TIMEOUT: float = 10.0  # Seconds per Paystack request
+    PAYSTACK_MAX_CONNECTIONS: int = 20
+    PAYMENT_BREAKER_THRESHOLD: int = 5  # Consecutive provider failures before its circuit opens
+    PAYMENT_BREAKER_RESET_SECONDS: int = 30  # Open circuits reject calls this long, then let one through
+
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
 
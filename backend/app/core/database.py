@@ -1,14 +1,90 @@
+from uuid import uuid4
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+def _async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver"""
+    scheme, _, rest = url.partition("://")
+    if scheme in ("postgres", "postgresql", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme in ("sqlite", "sqlite+pysqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    """Pool configuration shared by every engine, driven by Settings"""
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool class; sizing arguments don't apply
+        return {}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer owns pooling: hold no idle connections here and avoid
+        # named prepared statements, which don't survive transaction pooling
+        options = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Create SQLAlchemy engine (sync - used by Celery workers and scripts)
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engines (used by the FastAPI request path). Read-only
+# endpoints go to DATABASE_READ_URL when a replica is configured.
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    **_engine_options(settings.DATABASE_URL, is_async=True),
+)
+
+if settings.DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        _async_database_url(settings.DATABASE_READ_URL),
+        **_engine_options(settings.DATABASE_READ_URL, is_async=True),
+    )
+else:
+    async_read_engine = async_engine
+
+# Statement timings for /metrics (async engines run on a sync core)
+for _engine in {engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+    instrument_engine(_engine)
+
+# Create AsyncSessionLocal classes
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -20,3 +96,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Dependency for getting an async session on the read replica (or primary)"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,7 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal, get_async_db, get_async_read_db
+from app.core.config import settings
 from app.core.security import verify_token
 from app.models import User
 from typing import Optional
@@ -9,13 +11,8 @@ from typing import Optional
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """
-    Dependency to get the current authenticated user
-    """
+def _get_token_user_id(credentials: HTTPAuthorizationCredentials) -> int:
+    """Validate the bearer token and return the user ID it carries"""
     token = credentials.credentials
 
     payload = verify_token(token)
@@ -34,7 +31,11 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return int(user_id)
+
+
+def _ensure_user_is_usable(user: Optional[User]) -> User:
+    """Reject missing or inactive users"""
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,6 +52,44 @@ async def get_current_user(
     return user
 
 
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).filter(User.id == user_id))
+    return result.scalars().first()
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """
+    Dependency to get the current authenticated user
+    """
+    user_id = _get_token_user_id(credentials)
+    user = await _load_user(db, user_id)
+    return _ensure_user_is_usable(user)
+
+
+async def get_current_user_readonly(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> User:
+    """
+    Dependency to get the current user for read-only endpoints
+
+    Loads the user through the read replica session so the endpoint holds a
+    single replica connection. Falls back to the primary when the user has
+    not replicated yet (e.g. right after registration).
+    """
+    user_id = _get_token_user_id(credentials)
+    user = await _load_user(db, user_id)
+
+    if user is None and settings.DATABASE_READ_URL:
+        async with AsyncSessionLocal() as primary_db:
+            user = await _load_user(primary_db, user_id)
+
+    return _ensure_user_is_usable(user)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -63,3 +102,17 @@ async def get_current_active_user(
             detail="Inactive user"
         )
     return current_user
+
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_user_readonly),
+) -> User:
+    """
+    Dependency for admin-only endpoints (accounts with is_admin set)
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
@@ -0,0 +1,35 @@
+from fastapi import Response, status
+from app.core.metrics import record_cache
+from typing import Optional
+
+# Mutable resources: clients may store them but must revalidate every time
+REVALIDATE = "private, no-cache"
+
+# Exports addressed by version (?v=N) never change under that URL
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+def make_etag(kind: str, resource_id: int, version: int, variant: str = "") -> str:
+    """Build a strong ETag from a resource's row version"""
+    suffix = f"-{variant}" if variant else ""
+    return f'"{kind}-{resource_id}-v{version}{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    opaque = etag.removeprefix("W/")
+    matched = "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
+    record_cache("http_etag", matched)
+    return matched
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    """Empty 304 response carrying the validators"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,257 @@
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from app.core.config import settings
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics shared by the API and Celery workers. With several
+# processes (uvicorn --workers N, Celery prefork), point PROMETHEUS_MULTIPROC_DIR
+# at an empty directory shared by all of them before they start: each process
+# writes its samples there and /metrics aggregates them. Without it, each
+# process reports only its own samples.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+TASK_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0)
+PASSWORD_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=HTTP_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time",
+    ["operation"],
+    buckets=DB_BUCKETS,
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task runtime by final state",
+    ["task", "state"],
+    buckets=TASK_BUCKETS,
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    "external_call_duration_seconds",
+    "Latency of calls to third-party APIs",
+    ["service", "operation"],
+    buckets=EXTERNAL_BUCKETS,
+)
+EXTERNAL_CALL_ERRORS = Counter(
+    "external_call_errors_total",
+    "Failed calls to third-party APIs",
+    ["service", "operation", "error"],
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash/verify time on the password hashing pool",
+    ["operation"],
+    buckets=PASSWORD_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hashing operations rejected (503) because the pool was saturated",
+    ["operation"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by result; hit ratio = hit / (hit + miss)",
+    ["cache", "result"],
+)
+
+_SQL_OPERATIONS = {"select", "insert", "update", "delete"}
+
+# Same tracer as app.core.tracing; external calls become client spans
+_tracer = trace.get_tracer("content_scout")
+
+
+@contextmanager
+def track_external(service: str, operation: str) -> Iterator[None]:
+    """Time (and trace) a third-party call; exceptions are counted under their class name"""
+    start = time.perf_counter()
+    with _tracer.start_as_current_span(
+        f"{service} {operation}", kind=SpanKind.CLIENT, attributes={"peer.service": service}
+    ):
+        try:
+            yield
+        except Exception as e:
+            record_external_error(service, operation, type(e).__name__)
+            raise
+        finally:
+            EXTERNAL_CALL_DURATION.labels(service, operation).observe(time.perf_counter() - start)
+
+
+def record_external_error(service: str, operation: str, error: str) -> None:
+    """Count a failure reported without an exception (e.g. an error status in the body)"""
+    EXTERNAL_CALL_ERRORS.labels(service, operation, error).inc()
+
+
+def record_cache(cache: str, hit: bool, count: int = 1) -> None:
+    if count:
+        CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc(count)
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement run through a (sync) SQLAlchemy engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+        operation = keyword if keyword in _SQL_OPERATIONS else "other"
+        DB_QUERY_DURATION.labels(operation).observe(time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+def instrument_celery(celery_app) -> None:
+    """Task runtime histograms, plus a metrics port on worker processes if configured"""
+    from celery.signals import task_postrun, task_prerun, worker_init, worker_process_shutdown
+
+    started = {}
+    lock = threading.Lock()
+
+    @task_prerun.connect(weak=False)
+    def on_task_prerun(task_id=None, **_):
+        with lock:
+            started[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def on_task_postrun(task_id=None, task=None, state=None, **_):
+        with lock:
+            start = started.pop(task_id, None)
+        if start is not None and task is not None:
+            CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - start)
+
+    @worker_init.connect(weak=False)
+    def on_worker_init(**_):
+        if settings.METRICS_ENABLED and settings.METRICS_WORKER_PORT:
+            from prometheus_client import start_http_server
+
+            start_http_server(settings.METRICS_WORKER_PORT, registry=metrics_registry())
+            logger.info(f"Serving worker metrics on port {settings.METRICS_WORKER_PORT}")
+
+    @worker_process_shutdown.connect(weak=False)
+    def on_worker_process_shutdown(pid=None, **_):
+        if MULTIPROCESS:
+            multiprocess.mark_process_dead(pid or os.getpid())
+
+
+class CeleryQueueCollector:
+    """Broker queue lengths, read at scrape time (Redis brokers only)"""
+
+    def collect(self):
+        depth = GaugeMetricFamily("celery_queue_depth", "Messages waiting in a Celery queue", labels=["queue"])
+        broker_url = settings.CELERY_BROKER_URL or settings.REDIS_URL
+        if broker_url.startswith(("redis://", "rediss://")):
+            import redis
+
+            try:
+                client = redis.Redis.from_url(broker_url, socket_timeout=1)
+                for queue in settings.METRICS_CELERY_QUEUES:
+                    depth.add_metric([queue], client.llen(queue))
+            except redis.RedisError as e:
+                logger.warning(f"Failed to read Celery queue depth: {str(e)}")
+        yield depth
+
+
+_queue_registry = CollectorRegistry(auto_describe=False)
+_queue_registry.register(CeleryQueueCollector())
+
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry to expose: all processes' samples in multiprocess mode, else this process'"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition body and content type for GET /metrics"""
+    return generate_latest(metrics_registry()) + generate_latest(_queue_registry), CONTENT_TYPE_LATEST
+
+
+# Route templates per ASGI app, keyed by endpoint
+_route_paths: Dict[int, Dict] = {}
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route (/api/v1/blogs/{blog_id}); "unmatched" if none"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    app = scope["app"]
+    paths = _route_paths.get(id(app))
+    if paths is None:
+        paths = _route_paths[id(app)] = {getattr(route, "endpoint", None): route.path for route in app.routes}
+    return paths.get(endpoint, "unmatched")
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording HTTP latency per route template
+
+    Routes are labelled by their path template (/api/v1/blogs/{blog_id}),
+    never the raw path, to keep label cardinality bounded. Durations run
+    until the response is fully sent, so streaming endpoints report their
+    whole lifetime.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            if route != "/metrics":
+                HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(
+                    time.perf_counter() - start
+                )
@@ -0,0 +1,415 @@
+from app.core.config import settings
+from fastapi.concurrency import run_in_threadpool
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import asyncio
+import logging
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Opt-in sampling profiler. A background thread reads every thread's Python
+# stack (sys._current_frames) at a fixed interval and counts identical
+# stacks; nothing is hooked into the code being profiled, so the cost is
+# one sampler thread while a profile runs and nothing at all otherwise.
+#
+# Profiles are written as collapsed ("folded") stacks, one
+# "root;frame;frame count" line per distinct stack, which flamegraph.pl,
+# speedscope.app and inferno render as flame graphs.
+
+# Stacks deeper than this keep their innermost frames
+MAX_DEPTH = 128
+
+# Threads parked in these modules are idle (pool workers, selectors, sleeps);
+# sampling them would bury the busy stacks
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", os.path.join("concurrent", "futures", "thread.py"))
+
+# How often the middleware re-reads admin-armed paths from Redis
+ARM_REFRESH_SECONDS = 2.0
+ARM_KEY = "profiling:armed"
+
+_SAFE_LABEL = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold_stack(frame, root: str) -> Optional[str]:
+    """One sample as "root;outer;...;inner", or None for an idle thread"""
+    if frame.f_code.co_filename.endswith(_IDLE_FILES):
+        return None
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Wall-clock sampler over the threads of this process
+
+    Args:
+        interval: Seconds between samples
+        thread_ids: Only sample these threads (default: every thread but the sampler)
+    """
+
+    def __init__(self, interval: float, thread_ids: Optional[Set[int]] = None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the stack counts"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def drain(self) -> Counter:
+        """Hand over the stacks collected so far and start a fresh count"""
+        with self._lock:
+            stacks, self.stacks = self.stacks, Counter()
+            self.samples = 0
+        return stacks
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            with self._lock:
+                self.samples += 1
+                for thread_id, frame in frames.items():
+                    if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                        continue
+                    stack = fold_stack(frame, names.get(thread_id, str(thread_id)))
+                    if stack is not None:
+                        self.stacks[stack] += 1
+
+
+def folded(stacks: Counter) -> str:
+    """Collapsed-stack text, heaviest stacks first"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class ProfileStore:
+    """Profiles on disk under PROFILING_PATH (default STORAGE_PATH/profiles), one directory per kind"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.PROFILING_PATH or os.path.join(settings.STORAGE_PATH, "profiles"))
+
+    def new_id(self, kind: str, label: str) -> str:
+        """
+        Id ("kind/file") for a profile about to be taken
+
+        Args:
+            kind: "requests", "tasks" or "rolling"
+            label: Route, task name or process role, kept in the file name
+        """
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        label = _SAFE_LABEL.sub("_", label).strip("_")[:80]
+        return f"{kind}/{stamp}-{label}-{socket.gethostname()}-{os.getpid()}.folded"
+
+    def save(self, profile_id: str, stacks: Counter) -> bool:
+        """Write stacks from StackSampler under profile_id; False if empty or the write failed"""
+        if not stacks:
+            return False
+        path = self.root / profile_id
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(folded(stacks))
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write profile {path}: {str(e)}")
+            return False
+        return True
+
+    def list(self, kind: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Newest profiles first"""
+        entries = []
+        for path in self.root.glob(f"{kind or '*'}/*.folded"):
+            directory = path.parent
+            stat = path.stat()
+            entries.append({
+                "id": f"{directory.name}/{path.name}",
+                "kind": directory.name,
+                "size_bytes": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime),
+            })
+        entries.sort(key=lambda entry: entry["created_at"], reverse=True)
+        return entries[:limit]
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """Resolve a profile id to its file, refusing anything outside the store"""
+        path = (self.root / profile_id).resolve()
+        if self.root.resolve() not in path.parents or path.suffix != ".folded" or not path.is_file():
+            return None
+        return path
+
+    def prune(self, kind: str, keep: int) -> None:
+        """Delete all but the newest `keep` profiles of a kind (file names sort by time)"""
+        paths = sorted((self.root / kind).glob("*.folded"))
+        for path in paths[:-keep] if keep > 0 else paths:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+# Shared per process, like the job event pools. The middleware uses the
+# async client, so a slow Redis never blocks the event loop.
+_pool = None
+_async_pool = None
+
+
+def _redis_client():
+    global _pool
+    import redis
+
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(settings.REDIS_URL, socket_timeout=1)
+    return redis.Redis(connection_pool=_pool)
+
+
+def _async_redis_client():
+    global _async_pool
+    import redis.asyncio as aioredis
+
+    if _async_pool is None:
+        _async_pool = aioredis.ConnectionPool.from_url(settings.REDIS_URL, socket_timeout=1)
+    return aioredis.Redis(connection_pool=_async_pool)
+
+
+def _decode_armed(raw: Dict[bytes, bytes]) -> Dict[str, int]:
+    return {prefix.decode(): int(count) for prefix, count in raw.items() if int(count) > 0}
+
+
+def arm_requests(path_prefix: str, count: int) -> None:
+    """Profile the next `count` requests (across all API processes) whose path starts with path_prefix"""
+    _redis_client().hset(ARM_KEY, path_prefix, count)
+
+
+def armed_requests() -> Dict[str, int]:
+    """Path prefixes still armed and how many requests each will profile"""
+    return _decode_armed(_redis_client().hgetall(ARM_KEY))
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests
+
+    A request is profiled when it carries PROFILING_HEADER set to
+    PROFILING_TOKEN, or when an admin has armed its path via
+    POST /admin/profiling/arm. The sampler covers every thread, so work
+    handed to thread pools (bcrypt, sync endpoints) is included, and so
+    is whatever else the process was doing meanwhile; profile on a quiet
+    instance for a clean picture. The profile id is returned in the
+    X-Profile-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.store = ProfileStore()
+        self.header = settings.PROFILING_HEADER.lower().encode("latin-1")
+        self.token = (settings.PROFILING_TOKEN or "").encode("latin-1")
+        self._armed: Dict[str, int] = {}
+        self._armed_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        profile_id = self.store.new_id("requests", label)
+        sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000).start()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            # Joining the sampler and writing the profile block, so keep
+            # them off the event loop
+            await run_in_threadpool(self._finish, sampler, profile_id, label)
+
+    def _finish(self, sampler: StackSampler, profile_id: str, label: str) -> None:
+        """Stop a request's sampler and save its profile"""
+        stacks = sampler.stop()
+        if self.store.save(profile_id, stacks):
+            self.store.prune("requests", settings.PROFILING_KEEP_PROFILES)
+            logger.info(f"Profiled {label}: {sampler.samples} samples in {profile_id}")
+
+    async def _should_profile(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == self.header and value == self.token:
+                    return True
+        return await self._take_armed(scope["path"])
+
+    async def _take_armed(self, path: str) -> bool:
+        """
+        Claim one armed profile for path, if any
+
+        Matching uses the locally cached set of armed prefixes, refreshed in
+        the background, so only requests under an armed prefix talk to
+        Redis on the request path.
+        """
+        self._refresh_armed()
+        for prefix in list(self._armed):
+            if path.startswith(prefix):
+                client = _async_redis_client()
+                try:
+                    remaining = await client.hincrby(ARM_KEY, prefix, -1)
+                    if remaining <= 0:
+                        # This process took the last one (or lost the race for it)
+                        self._armed.pop(prefix, None)
+                        await client.hdel(ARM_KEY, prefix)
+                except Exception as e:
+                    logger.warning(f"Failed to claim armed profile for {prefix}: {str(e)}")
+                    return False
+                return remaining >= 0
+        return False
+
+    def _refresh_armed(self) -> None:
+        """Re-read the armed prefixes every ARM_REFRESH_SECONDS, without waiting for it"""
+        now = time.monotonic()
+        if now - self._armed_at <= ARM_REFRESH_SECONDS or (self._refresh and not self._refresh.done()):
+            return
+        self._armed_at = now
+        self._refresh = asyncio.create_task(self._load_armed())
+
+    async def _load_armed(self) -> None:
+        try:
+            self._armed = _decode_armed(await _async_redis_client().hgetall(ARM_KEY))
+        except Exception as e:
+            logger.warning(f"Failed to read armed profiling paths: {str(e)}")
+            self._armed = {}
+
+
+def profile_celery(celery_app) -> None:
+    """
+    Sample the tasks named in PROFILING_TASKS ("*" for all) while they run,
+    and start the rolling profiler in worker processes
+
+    Only the thread executing the task is sampled, so with the threads
+    pool concurrent tasks don't leak into each other's profiles.
+    PROFILING_TASK_SAMPLE_RATE profiles a fraction of runs.
+    """
+    from celery.signals import task_postrun, task_prerun, worker_init, worker_process_init
+
+    tasks = set(settings.PROFILING_TASKS)
+    store = ProfileStore()
+    running: Dict[str, tuple] = {}
+    lock = threading.Lock()
+
+    @task_prerun.connect(weak=False)
+    def on_task_prerun(task_id=None, task=None, **_):
+        if task is None or not (task.name in tasks or "*" in tasks):
+            return
+        if random.random() >= settings.PROFILING_TASK_SAMPLE_RATE:
+            return
+        sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000, thread_ids={threading.get_ident()})
+        with lock:
+            running[task_id] = (store.new_id("tasks", task.name), sampler.start())
+
+    @task_postrun.connect(weak=False)
+    def on_task_postrun(task_id=None, task=None, **_):
+        with lock:
+            profile = running.pop(task_id, None)
+        if profile is None:
+            return
+        profile_id, sampler = profile
+        if store.save(profile_id, sampler.stop()):
+            store.prune("tasks", settings.PROFILING_KEEP_PROFILES)
+            logger.info(f"Profiled {task.name} [{task_id}]: {sampler.samples} samples in {profile_id}")
+
+    # Prefork children run the tasks; other pools run them in the worker itself
+    @worker_init.connect(weak=False)
+    @worker_process_init.connect(weak=False)
+    def on_worker_start(**_):
+        start_continuous_profiler("worker")
+
+
+class ContinuousProfiler:
+    """
+    Low-rate sampling of the whole process, dumped every PROFILING_DUMP_SECONDS
+
+    Each dump is a flame graph of that window ("rolling/<time>-<role>-...");
+    the newest PROFILING_KEEP_DUMPS are kept.
+    """
+
+    def __init__(self, role: str):
+        self.role = role
+        self.pid = os.getpid()
+        self.store = ProfileStore()
+        self.sampler = StackSampler(settings.PROFILING_CONTINUOUS_INTERVAL_MS / 1000)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ContinuousProfiler":
+        self.sampler.start()
+        self._thread = threading.Thread(target=self._run, name="profile-dumper", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.sampler.stop()
+        if self._thread is not None:
+            self._thread.join()
+        self.dump()
+
+    def dump(self) -> None:
+        stacks = self.sampler.drain()
+        if self.store.save(self.store.new_id("rolling", self.role), stacks):
+            self.store.prune("rolling", settings.PROFILING_KEEP_DUMPS)
+
+    def _run(self):
+        while not self._stop.wait(settings.PROFILING_DUMP_SECONDS):
+            self.dump()
+
+
+_continuous: Optional[ContinuousProfiler] = None
+
+
+def start_continuous_profiler(role: str) -> None:
+    """Start this process' rolling profiler if PROFILING_CONTINUOUS is on (once per process)"""
+    global _continuous
+    if not (settings.PROFILING_ENABLED and settings.PROFILING_CONTINUOUS):
+        return
+    # A forked child inherits the object but not the threads
+    if _continuous is not None and _continuous.pid == os.getpid():
+        return
+    _continuous = ContinuousProfiler(role).start()
+    logger.info(f"Continuous profiling ({role}) every {settings.PROFILING_CONTINUOUS_INTERVAL_MS}ms, "
+                f"dumped every {settings.PROFILING_DUMP_SECONDS}s")
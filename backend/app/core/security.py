@@ -1,10 +1,30 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_REJECTED
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt is CPU-bound, so it runs on its own pool instead of the event loop.
+# Slots cap running + queued operations; once exhausted callers get a 503.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_password_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -42,3 +62,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
+
+
+async def _run_password_operation(operation: str, fn: Callable, *args):
+    """Run a bcrypt call on the password pool, rejecting work when saturated"""
+    if not _password_slots.acquire(blocking=False):
+        logger.warning(f"Password hashing pool saturated, rejecting {operation}")
+        PASSWORD_HASH_REJECTED.labels(operation).inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    def timed():
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - start)
+
+    try:
+        future = _password_executor.submit(timed)
+    except BaseException:
+        _password_slots.release()
+        raise
+    # Release on completion rather than on await so a cancelled request
+    # can't free a slot while its hash is still running
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password hashing pool"""
+    return await _run_password_operation("hash", pwd_context.hash, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the password hashing pool
+
+    Returns (verified, new_hash). new_hash is set when the stored hash uses
+    outdated cost parameters and should be replaced.
+    """
+    return await _run_password_operation(
+        "verify", pwd_context.verify_and_update, plain_password, hashed_password
+    )
@@ -0,0 +1,216 @@
+from opentelemetry import context, trace
+from opentelemetry.propagate import extract, inject
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from app.core.config import settings
+from app.core.metrics import route_template
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+import functools
+import inspect
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Distributed tracing (OpenTelemetry). A trace starts at the API request
+# (or continues one from an incoming traceparent header), travels to Celery
+# in the task message headers, and the services add spans beneath it for
+# research, generation, file writes, email and every third-party call.
+# With TRACING_ENABLED off no provider is installed and every span is the
+# API's no-op span.
+
+tracer = trace.get_tracer("content_scout")
+
+_provider: Optional[TracerProvider] = None
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a local file, one JSON object per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(span_to_dict(span)) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning(f"Failed to write spans to {self.path}: {str(e)}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def span_to_dict(span: ReadableSpan) -> Dict:
+    """Flat representation used by the file exporter and benchmarks/trace_report.py"""
+    return {
+        "trace_id": format(span.context.trace_id, "032x"),
+        "span_id": format(span.context.span_id, "016x"),
+        "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+        "name": span.name,
+        "kind": span.kind.name,
+        "service": span.resource.attributes.get("service.name"),
+        "start": datetime.utcfromtimestamp(span.start_time / 1e9).isoformat(),
+        "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+        "status": span.status.status_code.name,
+        "attributes": dict(span.attributes or {}),
+        "events": [event.name for event in span.events],
+    }
+
+
+def setup_tracing(role: str) -> None:
+    """
+    Install the tracer provider for this process, if TRACING_ENABLED
+
+    Args:
+        role: "api" or "worker", appended to TRACING_SERVICE_NAME
+    """
+    global _provider
+    if not settings.TRACING_ENABLED or _provider is not None:
+        return
+
+    if settings.TRACING_EXPORTER == "file":
+        exporter = JsonLinesSpanExporter(settings.TRACING_FILE_PATH)
+    elif settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        # None falls back to OTEL_EXPORTER_OTLP_ENDPOINT, then localhost:4318
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}")
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": f"{settings.TRACING_SERVICE_NAME}-{role}"}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATE)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info(f"Tracing enabled ({settings.TRACING_EXPORTER} exporter, sample rate {settings.TRACING_SAMPLE_RATE})")
+
+
+def traced(name: str):
+    """Run the decorated function (sync or async) in a span called name"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_celery(celery_app) -> None:
+    """
+    Carry the caller's trace into tasks, and run each task in a span
+
+    The trace context is written into the message headers at publish time
+    (so it survives the broker) and read back from task.request. The API
+    imports this too, to publish; only worker processes install the
+    "worker" provider.
+    """
+    from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun, worker_init
+
+    running: Dict[str, tuple] = {}
+    lock = threading.Lock()
+
+    @worker_init.connect(weak=False)
+    def on_worker_init(**_):
+        setup_tracing("worker")
+
+    @before_task_publish.connect(weak=False)
+    def on_before_task_publish(headers=None, **_):
+        if headers is not None:
+            inject(headers)
+
+    @task_prerun.connect(weak=False)
+    def on_task_prerun(task_id=None, task=None, args=None, **_):
+        carrier = {
+            key: value
+            for key in ("traceparent", "tracestate")
+            if (value := getattr(task.request, key, None))
+        }
+        span = tracer.start_span(
+            f"celery {task.name}",
+            context=extract(carrier),
+            kind=SpanKind.CONSUMER,
+            attributes={"celery.task_id": task_id, "celery.task": task.name, "celery.args": str(args)[:200]},
+        )
+        token = context.attach(trace.set_span_in_context(span))
+        with lock:
+            running[task_id] = (span, token)
+
+    @task_failure.connect(weak=False)
+    def on_task_failure(task_id=None, exception=None, **_):
+        with lock:
+            span, _token = running.get(task_id, (None, None))
+        if span is not None and exception is not None:
+            span.record_exception(exception)
+            span.set_status(Status(StatusCode.ERROR, type(exception).__name__))
+
+    @task_postrun.connect(weak=False)
+    def on_task_postrun(task_id=None, state=None, **_):
+        with lock:
+            span, token = running.pop(task_id, (None, None))
+        if span is None:
+            return
+        span.set_attribute("celery.state", state or "UNKNOWN")
+        span.end()
+        context.detach(token)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware running each HTTP request in a server span
+
+    Continues the trace from an incoming traceparent header. The span is
+    named after the route template once routing has matched it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            scope["method"],
+            context=extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_template(scope)
+                span.update_name(f"{scope['method']} {route}")
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.api import auth, research_jobs, blogs, subscriptions
+from app.core.metrics import PrometheusMiddleware, render_metrics
+from app.core.profiling import ProfilingMiddleware, start_continuous_profiler
+from app.core.tracing import TracingMiddleware, setup_tracing
+from app.api import auth, research_jobs, blogs, subscriptions, keywords, admin
+from app.services.search_service import install_search_index
+from app.services.payment_gateway import paystack_gateway
 import logging
 
 # Configure logging
@@ -16,6 +21,10 @@ logger = logging.getLogger(__name__)
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Create the SQLite full-text index (on Postgres: migrations/add_blog_search.sql)
+with engine.begin() as connection:
+    install_search_index(connection)
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -34,11 +43,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency histograms for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
+# Request spans, continuing any incoming traceparent
+if settings.TRACING_ENABLED:
+    setup_tracing("api")
+    app.add_middleware(TracingMiddleware)
+
+# Opt-in sampling profiles of selected requests, and the rolling profile
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+
+@app.on_event("startup")
+def start_profiling():
+    start_continuous_profiler("api")
+
+
+@app.on_event("shutdown")
+async def close_payment_clients():
+    await paystack_gateway.close()
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_STR)
 app.include_router(research_jobs.router, prefix=settings.API_V1_STR)
 app.include_router(blogs.router, prefix=settings.API_V1_STR)
 app.include_router(subscriptions.router, prefix=settings.API_V1_STR)
+app.include_router(keywords.router, prefix=settings.API_V1_STR)
+app.include_router(admin.router, prefix=settings.API_V1_STR)
 
 
 @app.get("/")
@@ -61,6 +95,14 @@ async def health_check():
     }
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint (all processes in multiprocess mode)"""
+        body, content_type = render_metrics()
+        return Response(content=body, headers={"Content-Type": content_type})
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,6 +1,10 @@
 from app.models.user import User, SubscriptionTier, PaymentProvider
 from app.models.research_job import ResearchJob, JobStatus
 from app.models.blog import Blog, BlogFormat
+from app.models.keyword import Keyword, KeywordPosting, KeywordStat
+from app.models.research_snapshot import ResearchSnapshot
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus
 
 __all__ = [
     "User",
@@ -10,4 +14,12 @@ __all__ = [
     "JobStatus",
     "Blog",
     "BlogFormat",
+    "Keyword",
+    "KeywordPosting",
+    "KeywordStat",
+    "ResearchSnapshot",
+    "EmailOutbox",
+    "EmailStatus",
+    "WebhookEvent",
+    "WebhookEventStatus",
 ]
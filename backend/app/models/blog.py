@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from app.core.database import Base
 import enum
 
@@ -36,6 +36,19 @@ class Blog(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Row version, bumped on every UPDATE (drives ETags)
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+
+    # Fetch the bumped version in the UPDATE itself (RETURNING) so it never
+    # needs a lazy refresh, which async sessions can't do implicitly
+    __mapper_args__ = {"eager_defaults": True}
+
     # Relationships
     user = relationship("User", back_populates="blogs")
     research_job = relationship("ResearchJob", back_populates="blog")
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class EmailStatus(str, enum.Enum):
+    PENDING = "pending"  # Waiting for (another) delivery attempt
+    SENDING = "sending"  # Claimed by a drain; reclaimable after EMAIL_OUTBOX_CLAIM_TIMEOUT
+    SENT = "sent"
+    FAILED = "failed"  # Rejected by the provider, or out of attempts
+
+
+class EmailOutbox(Base):
+    """
+    Transactional email waiting to be delivered
+
+    Rows are inserted in the same transaction as the change that triggers
+    the email and delivered by the drain_email_outbox task, so an email is
+    sent if and only if its change committed.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    dedup_key = Column(String, nullable=False, unique=True)  # e.g. "blog-ready:42"; repeats are dropped
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+
+    status = Column(Enum(EmailStatus), default=EmailStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    provider_id = Column(String, nullable=True)  # Resend email id
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
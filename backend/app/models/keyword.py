@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Keyword(Base):
+    """Normalized keyword dictionary (one row per distinct term)"""
+    __tablename__ = "keywords"
+
+    id = Column(Integer, primary_key=True, index=True)
+    term = Column(String, unique=True, nullable=False)  # Lowercased, whitespace-collapsed
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class KeywordPosting(Base):
+    """
+    Inverted index entry: keyword found by a research run
+
+    A run is either a job that researched live or a research snapshot;
+    jobs served from a snapshot are not indexed again.
+    """
+    __tablename__ = "keyword_postings"
+
+    id = Column(Integer, primary_key=True)
+    keyword_id = Column(Integer, ForeignKey("keywords.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("research_jobs.id", ondelete="CASCADE"), nullable=True)
+    # No foreign key: old snapshot versions are pruned, their postings are kept
+    snapshot_id = Column(Integer, nullable=True)
+
+    # Denormalized from the job so trending queries never touch research_jobs
+    sector = Column(String, nullable=False)  # Normalized (lowercase)
+    location = Column(String, nullable=False)  # Normalized (lowercase)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("keyword_id", "job_id", name="uq_keyword_postings_job"),
+        UniqueConstraint("keyword_id", "snapshot_id", name="uq_keyword_postings_snapshot"),
+        Index("ix_keyword_postings_scope_time", "sector", "location", "created_at"),
+    )
+
+
+class KeywordStat(Base):
+    """All-time frequency counter per keyword and sector/location, maintained on insert"""
+    __tablename__ = "keyword_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    keyword_id = Column(Integer, ForeignKey("keywords.id"), nullable=False)
+    sector = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    job_count = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("keyword_id", "sector", "location", name="uq_keyword_stats_scope"),
+        Index("ix_keyword_stats_scope_count", "sector", "location", "job_count"),
+    )
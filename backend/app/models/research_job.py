@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from app.core.database import Base
 import enum
 
@@ -48,9 +48,28 @@ class ResearchJob(Base):
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Performance accounting, filled in by generate_blog_task
+    stage_timings = Column(JSON, nullable=True)  # Seconds per stage, e.g. {"research": 2.1, "generation": 31.4}
+    input_tokens = Column(Integer, nullable=True)  # Uncached prompt tokens
+    output_tokens = Column(Integer, nullable=True)
+    cached_tokens = Column(Integer, nullable=True)  # Prompt tokens read from the prompt cache
+
     # Celery task ID for tracking
     celery_task_id = Column(String, nullable=True)
 
+    # Row version, bumped on every UPDATE (drives ETags)
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
+
+    # Fetch the bumped version in the UPDATE itself (RETURNING) so it never
+    # needs a lazy refresh, which async sessions can't do implicitly
+    __mapper_args__ = {"eager_defaults": True}
+
     # Relationships
     user = relationship("User", back_populates="research_jobs")
     blog = relationship("Blog", back_populates="research_job", uselist=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, UniqueConstraint
+from app.core.database import Base
+
+
+class ResearchSnapshot(Base):
+    """Precomputed research_sector() result for a popular sector/location pair"""
+    __tablename__ = "research_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sector = Column(String, nullable=False)  # Normalized (lowercase)
+    location = Column(String, nullable=False)  # Normalized (lowercase)
+    version = Column(Integer, nullable=False)  # Increments per sector/location on every refresh
+
+    research_data = Column(JSON, nullable=False)
+    job_count = Column(Integer, nullable=False, default=0)  # Jobs in the popularity window at refresh time
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("sector", "location", "version", name="uq_research_snapshots_version"),
+        Index("ix_research_snapshots_scope_time", "sector", "location", "refreshed_at"),
+    )
@@ -27,6 +27,7 @@ class User(Base):
     country = Column(String, nullable=False)  # ISO country code (e.g., "GH", "US")
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
+    is_admin = Column(Boolean, default=False, server_default="false", nullable=False)  # Set by hand; see migrations/add_user_admin_flag.sql
 
     # Subscription details
     subscription_tier = Column(
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class WebhookEventStatus(str, enum.Enum):
+    PENDING = "pending"  # Recorded by the webhook endpoint, waiting for process_stripe_webhooks
+    PROCESSED = "processed"
+    SUPERSEDED = "superseded"  # Older than a status event already applied for the same subscription
+    FAILED = "failed"  # The handler raised; see last_error
+
+
+class WebhookEvent(Base):
+    """
+    Payment provider webhook event, stored as received
+
+    The endpoint only verifies and records events; a Celery task applies
+    them in order per customer. The unique (provider, event_id) pair makes
+    a redelivered event a no-op.
+    """
+    __tablename__ = "webhook_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    provider = Column(String, nullable=False)  # "stripe"
+    event_id = Column(String, nullable=False)  # e.g. "evt_1N..."
+    event_type = Column(String, nullable=False)
+    customer_id = Column(String, nullable=True)  # Provider customer id; events are ordered per customer
+    subscription_id = Column(String, nullable=True)  # Subscription the event changes, if any
+    event_created = Column(Integer, nullable=False)  # Provider's creation time (Unix seconds)
+    payload = Column(Text, nullable=False)  # Raw request body
+
+    status = Column(Enum(WebhookEventStatus), default=WebhookEventStatus.PENDING, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("provider", "event_id", name="uq_webhook_events_provider_event_id"),
+        Index("ix_webhook_events_customer_status", "provider", "customer_id", "status"),
+    )
@@ -15,6 +15,22 @@ from app.schemas.blog import (
     BlogResponse,
     BlogListResponse,
     BlogSummary,
+    BlogSearchResult,
+    BlogSearchResponse,
+    BlogEnhanceRequest,
+    BlogEnhanceResponse,
+)
+from app.schemas.keyword import (
+    KeywordFrequency,
+    TrendingKeywordsResponse,
+)
+from app.schemas.metrics import (
+    StageLatency,
+    TokenUsage,
+    JobMetricsResponse,
+    ProfilingArmRequest,
+    ProfilingArmResponse,
+    ProfileInfo,
 )
 from app.schemas.subscription import (
     SubscriptionCreate,
@@ -37,6 +53,18 @@ __all__ = [
     "BlogResponse",
     "BlogListResponse",
     "BlogSummary",
+    "BlogSearchResult",
+    "BlogSearchResponse",
+    "BlogEnhanceRequest",
+    "BlogEnhanceResponse",
+    "KeywordFrequency",
+    "TrendingKeywordsResponse",
+    "StageLatency",
+    "TokenUsage",
+    "JobMetricsResponse",
+    "ProfilingArmRequest",
+    "ProfilingArmResponse",
+    "ProfileInfo",
     "SubscriptionCreate",
     "SubscriptionResponse",
     "PricingInfo",
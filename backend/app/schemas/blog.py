@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from app.models.blog import BlogFormat
 
@@ -18,6 +18,7 @@ class BlogResponse(BaseModel):
     pdf_file_path: Optional[str]
     html_file_path: Optional[str]
     created_at: datetime
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -41,3 +42,32 @@ class BlogSummary(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BlogSearchResult(BaseModel):
+    id: int
+    title: str
+    summary: Optional[str]
+    snippet: Optional[str]  # Matching excerpt, terms wrapped in <mark></mark>
+    rank: float
+    word_count: Optional[int]
+    created_at: datetime
+
+
+class BlogSearchResponse(BaseModel):
+    query: str
+    results: List[BlogSearchResult]
+    total: int
+    page: int
+    page_size: int
+
+
+class BlogEnhanceRequest(BaseModel):
+    enhancement_type: Literal["seo", "readability", "tone"] = "seo"
+
+
+class BlogEnhanceResponse(BaseModel):
+    blog_id: int
+    enhancement_type: str
+    task_id: str
+    version: int  # Current version; the enhanced blog is saved as a newer one
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class KeywordFrequency(BaseModel):
+    keyword: str
+    job_count: int  # Number of research jobs that surfaced the keyword
+
+
+class TrendingKeywordsResponse(BaseModel):
+    sector: Optional[str]
+    location: Optional[str]
+    days: Optional[int]  # Time window; None means all time
+    keywords: List[KeywordFrequency]
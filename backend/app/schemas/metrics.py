@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict
+
+
+class StageLatency(BaseModel):
+    count: int
+    p50: float  # Seconds
+    p95: float
+    p99: float
+    max: float
+
+
+class TokenUsage(BaseModel):
+    input: int  # Uncached prompt tokens
+    output: int
+    cached: int  # Prompt tokens read from the prompt cache
+    avg_input_per_job: int
+    avg_output_per_job: int
+    avg_cached_per_job: int
+
+
+class JobMetricsResponse(BaseModel):
+    days: int
+    jobs: Dict[str, int]  # Job count by status
+    sampled_jobs: int  # Completed jobs behind the stage percentiles
+    stages: Dict[str, StageLatency]
+    tokens: TokenUsage
+
+
+class ProfilingArmRequest(BaseModel):
+    path_prefix: str = Field(..., min_length=1, description="e.g. /api/v1/auth/login")
+    count: int = Field(1, ge=1, le=100)  # Requests to profile, across all API processes
+
+
+class ProfilingArmResponse(BaseModel):
+    armed: Dict[str, int]  # Path prefix -> requests still to profile
+
+
+class ProfileInfo(BaseModel):
+    id: str  # "<kind>/<file>.folded"
+    kind: str  # requests, tasks or rolling
+    size_bytes: int
+    created_at: datetime
@@ -1,16 +1,86 @@
-from anthropic import Anthropic
-from typing import Dict, Any, List
+from anthropic import Anthropic, AsyncAnthropic
+from typing import Dict, Any, List, Optional
 from app.core.config import settings
+from app.core.metrics import record_cache, track_external
+from app.core.tracing import traced
+from app.services.enhancement_cache import chunk_key
+from app.services.prompt_budget import PromptBudgetPlanner, estimate_tokens, parse_word_range
+import asyncio
+import logging
 import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Extra sections appended to long-form outlines when requested via include_sections
+LONGFORM_EXTRA_SECTIONS = {
+    "faqs": {"heading": "Frequently Asked Questions", "key_points": ["Common reader questions with concise answers"]},
+}
+
+# Words of each section edge shown to the stitching pass
+SEAM_WORDS = 60
+
+ENHANCEMENT_PROMPTS = {
+    "seo": "Enhance this blog post for better SEO. Add relevant keywords naturally, improve meta descriptions, and optimize headings.",
+    "readability": "Improve the readability of this blog post. Make it more engaging, break up long paragraphs, and add transitions.",
+    "tone": "Adjust the tone of this blog post to be more professional and authoritative while maintaining engagement.",
+}
+
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+def blog_stats(title: str, summary: str, content: str) -> Dict[str, Any]:
+    """Final blog fields, with word count and reading time"""
+    # Clean up the content
+    content = content.strip()
+
+    # Calculate word count
+    word_count = len(content.split())
+
+    # Estimate reading time (average 200 words per minute)
+    reading_time = max(1, round(word_count / 200))
+
+    return {
+        "title": title,
+        "summary": summary,
+        "content": content,
+        "word_count": word_count,
+        "reading_time_minutes": reading_time,
+    }
+
+
+def split_h2_sections(content: str) -> List[str]:
+    """
+    Split Markdown into the part before the first H2 and one chunk per H2
+
+    Lines inside fenced code blocks are never treated as headings. Chunks
+    are stripped; empty ones are dropped.
+    """
+    chunks, current, fenced = [], [], False
+    for line in content.splitlines():
+        if _FENCE_RE.match(line):
+            fenced = not fenced
+        elif not fenced and line.startswith("## ") and current:
+            chunks.append("\n".join(current))
+            current = []
+        current.append(line)
+    chunks.append("\n".join(current))
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
 
 
 class BlogGenerationService:
     """Service for generating blog content using Claude AI"""
 
     def __init__(self):
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.client = Anthropic(
+            api_key=settings.ANTHROPIC_API_KEY, base_url=settings.ANTHROPIC_BASE_URL
+        )
+        self.async_client = AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY, base_url=settings.ANTHROPIC_BASE_URL
+        )
         self.model = settings.AI_MODEL or "claude-3-5-sonnet-20241022"
 
+    @traced("generation.blog")
     async def generate_blog(
         self,
         sector: str,
@@ -48,8 +118,38 @@ class BlogGenerationService:
             custom_instructions: Custom generation instructions
 
         Returns:
-            Dictionary containing title, content, and summary
+            Dictionary containing title, content, and summary, plus "metrics"
+            (token usage, time to first token and parse time)
         """
+        # Token usage and timings for the job's metrics, filled in by each call
+        metrics = {"input_tokens": 0, "output_tokens": 0, "cached_tokens": 0}
+
+        # Long posts are written section by section in parallel
+        if self._use_longform(outline, target_word_count, content_depth):
+            preamble = self._build_blog_prompt(
+                sector=sector,
+                location=location,
+                research_data=research_data,
+                keywords=keywords,
+                tone=tone,
+                outline=outline,
+                custom_title=custom_title,
+                target_word_count=target_word_count,
+                writing_style=writing_style,
+                target_audience=target_audience,
+                content_depth=content_depth,
+                seo_focus=seo_focus,
+                include_sections=include_sections,
+                custom_instructions=custom_instructions,
+                include_format=False,
+            )
+            try:
+                return await self._generate_longform(
+                    preamble, outline, target_word_count, custom_title, include_sections, metrics
+                )
+            except Exception as e:
+                raise Exception(f"Failed to generate blog: {str(e)}")
+
         # Build the prompt for Claude
         prompt = self._build_blog_prompt(
             sector=sector,
@@ -70,24 +170,29 @@ class BlogGenerationService:
 
         # Generate blog using Claude
         try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                temperature=0.7,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+            # Streamed so time to first token can be measured
+            blog_content = await self._complete(
+                dict(
+                    model=self.model,
+                    max_tokens=PromptBudgetPlanner().max_output_tokens(target_word_count),
+                    temperature=0.7,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                ),
+                metrics,
+                stream=True,
             )
 
-            # Extract the blog content
-            blog_content = message.content[0].text
-
             # Parse the response to extract title, content, and summary
+            started = time.perf_counter()
             parsed_blog = self._parse_blog_response(blog_content)
+            metrics["parse"] = round(time.perf_counter() - started, 3)
 
+            parsed_blog["metrics"] = metrics
             return parsed_blog
 
         except Exception as e:
@@ -109,15 +214,82 @@ class BlogGenerationService:
         seo_focus: str = "medium",
         include_sections: List[str] = None,
         custom_instructions: str = None,
+        include_format: bool = True,
     ) -> str:
         """Build the prompt for Claude to generate the blog"""
 
-        trending_topics = research_data.get("trending_topics", [])
-        trending_topics_text = "\n".join(
-            [f"- {topic.get('title', '')}" for topic in trending_topics]
+        planner = PromptBudgetPlanner()
+        options = dict(
+            sector=sector,
+            location=location,
+            tone=tone,
+            custom_title=custom_title,
+            target_word_count=target_word_count,
+            writing_style=writing_style,
+            target_audience=target_audience,
+            content_depth=content_depth,
+            seo_focus=seo_focus,
+            include_sections=include_sections,
+            custom_instructions=planner.truncate(
+                custom_instructions, settings.PROMPT_CUSTOM_INSTRUCTIONS_TOKENS
+            ),
+            include_format=include_format,
+        )
+
+        # Research context is optional and trimmed to the input budget, most
+        # important first: top keywords and topics, then the rest. Snippets
+        # are fitted afterwards into what's left, and only for admitted
+        # topics, since a snippet is rendered under its topic's title.
+        topics = [t for t in research_data.get("trending_topics", []) if t.get("title")]
+        keywords = list(keywords[:10])
+        candidates = (
+            [("keywords", k, k) for k in keywords[:5]]
+            + [("topics", i, topics[i]["title"]) for i in range(min(3, len(topics)))]
+            + [("keywords", k, k) for k in keywords[5:]]
+            + [("topics", i, topics[i]["title"]) for i in range(3, len(topics))]
+        )
+        skeleton = self._render_blog_prompt(trending_topics_text="", keywords_text="", **options)
+        admitted = planner.fit(skeleton, candidates)
+
+        topic_ids = sorted(admitted.get("topics", []))
+        keywords_text = ", ".join(k for k in keywords if k in admitted.get("keywords", []))
+
+        def topics_text(snippet_ids) -> str:
+            return "\n".join(
+                f"- {topics[i]['title']}" + (f": {topics[i]['snippet']}" if i in snippet_ids else "")
+                for i in topic_ids
+            )
+
+        with_titles = self._render_blog_prompt(
+            trending_topics_text=topics_text(set()), keywords_text=keywords_text, **options
+        )
+        snippet_ids = set(planner.fit(
+            with_titles,
+            [("snippets", i, topics[i]["snippet"]) for i in topic_ids if topics[i].get("snippet")],
+        ).get("snippets", []))
+
+        return self._render_blog_prompt(
+            trending_topics_text=topics_text(snippet_ids), keywords_text=keywords_text, **options
         )
 
-        keywords_text = ", ".join(keywords[:10])
+    def _render_blog_prompt(
+        self,
+        sector: str,
+        location: str,
+        trending_topics_text: str,
+        keywords_text: str,
+        tone: str,
+        custom_title: str = None,
+        target_word_count: str = None,
+        writing_style: str = None,
+        target_audience: str = None,
+        content_depth: str = "moderate",
+        seo_focus: str = "medium",
+        include_sections: List[str] = None,
+        custom_instructions: str = None,
+        include_format: bool = True,
+    ) -> str:
+        """Assemble the prompt text around already-budgeted research context"""
 
         # Determine word count target
         word_count = target_word_count or "1200-1800"
@@ -144,7 +316,10 @@ class BlogGenerationService:
             }
             prompt += f"\n- Style: {writing_style} ({style_descriptions.get(writing_style, 'engaging and well-structured')})"
 
-        prompt += f"\n- Length: {word_count} words"
+        if include_format:
+            prompt += f"\n- Length: {word_count} words"
+        else:
+            prompt += f"\n- Length: {word_count} words for the whole post, across all sections"
 
         if target_audience:
             prompt += f"\n- Target Audience: {target_audience}"
@@ -165,7 +340,9 @@ class BlogGenerationService:
         }
         prompt += f"\n- SEO Focus: {seo_descriptions.get(seo_focus, seo_descriptions['medium'])}"
 
-        prompt += "\n- Make it engaging and actionable\n- Use proper headings (H1, H2, H3)\n- Include an introduction and conclusion"
+        prompt += "\n- Make it engaging and actionable"
+        if include_format:
+            prompt += "\n- Use proper headings (H1, H2, H3)\n- Include an introduction and conclusion"
 
         # Include sections if specified
         if include_sections and len(include_sections) > 0:
@@ -185,8 +362,9 @@ class BlogGenerationService:
         if custom_instructions:
             prompt += f"\n\n**Additional Instructions:**\n{custom_instructions}"
 
-        # Format requirements
-        if custom_title:
+        # Format requirements (left out of long-form preambles; each section
+        # request carries its own)
+        if include_format and custom_title:
             prompt += f"""
 
 **Format Requirements:**
@@ -198,7 +376,7 @@ SUMMARY: [A 2-3 sentence summary of the blog post]
 
 CONTENT:
 [The full blog post in Markdown format with proper headings, paragraphs, and formatting]"""
-        else:
+        elif include_format:
             prompt += """
 
 **Format Requirements:**
@@ -211,8 +389,11 @@ SUMMARY: [A 2-3 sentence summary of the blog post]
 CONTENT:
 [The full blog post in Markdown format with proper headings, paragraphs, and formatting]"""
 
-        # Additional guidelines
-        prompt += f"""
+        # Additional guidelines (long-form preambles are shared by section
+        # writers, so whole-post structure is left to the opening and
+        # closing sections)
+        if include_format:
+            prompt += f"""
 
 **Additional Guidelines:**
 1. Start with a hook that grabs attention
@@ -221,9 +402,19 @@ CONTENT:
 4. Ensure the content is original and valuable
 5. Optimize for readability with short paragraphs
 6. Include relevant subheadings
-7. End with a strong conclusion
+7. End with a strong conclusion"""
+        else:
+            prompt += f"""
 
-Write the blog post now:"""
+**Additional Guidelines:**
+1. Use data and examples specific to {location}
+2. Include practical insights and actionable takeaways
+3. Ensure the content is original and valuable
+4. Optimize for readability with short paragraphs
+5. Only the opening section hooks the reader and only the closing section concludes; every other section goes straight into its subject and ends on its last point"""
+
+        if include_format:
+            prompt += "\n\nWrite the blog post now:"
 
         return prompt
 
@@ -248,58 +439,329 @@ Write the blog post now:"""
         )
         content = content_match.group(1).strip() if content_match else response
 
-        # Clean up the content
-        content = content.strip()
+        return blog_stats(title, summary, content)
 
-        # Calculate word count
-        word_count = len(content.split())
+    async def _complete(
+        self, request: Dict[str, Any], metrics: Dict[str, Any], stream: bool = False, on_start=None
+    ) -> str:
+        """
+        Run one Messages request and return its text
 
-        # Estimate reading time (average 200 words per minute)
-        reading_time = max(1, round(word_count / 200))
+        Token usage is added to metrics. Streamed requests also record
+        "ttft" (first text delta) unless an earlier request already did,
+        and call on_start when the response begins.
+        """
+        if not stream:
+            with track_external("anthropic", "messages.create"):
+                message = await self.async_client.messages.create(**request)
+            self._add_usage(metrics, message.usage)
+            return message.content[0].text
 
-        return {
-            "title": title,
-            "summary": summary,
-            "content": content,
-            "word_count": word_count,
-            "reading_time_minutes": reading_time,
+        with track_external("anthropic", "messages.stream"):
+            return await self._stream(request, metrics, on_start)
+
+    async def _stream(self, request: Dict[str, Any], metrics: Dict[str, Any], on_start=None) -> str:
+        """Streamed half of _complete"""
+        started = time.perf_counter()
+        chunks = []
+        response = await self.async_client.messages.create(stream=True, **request)
+        async for event in response:
+            if event.type == "message_start":
+                # Output tokens arrive with message_delta
+                self._add_usage(metrics, event.message.usage, output=False)
+                if on_start is not None:
+                    on_start()
+            elif event.type == "content_block_delta":
+                if not chunks:
+                    metrics.setdefault("ttft", round(time.perf_counter() - started, 3))
+                chunks.append(event.delta.text)
+            elif event.type == "message_delta":
+                metrics["output_tokens"] += event.usage.output_tokens
+        return "".join(chunks)
+
+    @staticmethod
+    def _add_usage(metrics: Dict[str, Any], usage: Any, output: bool = True):
+        """Accumulate an API usage block; prompt cache reads count as cached input"""
+        metrics["input_tokens"] += getattr(usage, "input_tokens", 0) or 0
+        metrics["cached_tokens"] += getattr(usage, "cache_read_input_tokens", 0) or 0
+        if output:
+            metrics["output_tokens"] += getattr(usage, "output_tokens", 0) or 0
+
+    def _use_longform(
+        self, outline: Optional[Dict[str, Any]], target_word_count: Optional[str], content_depth: str
+    ) -> bool:
+        """Long-form mode: comprehensive depth or long targets, given an outline to split on"""
+        if not settings.LONGFORM_ENABLED or len((outline or {}).get("sections") or []) < 2:
+            return False
+        _, high = parse_word_range(target_word_count)
+        return content_depth == "comprehensive" or high >= settings.LONGFORM_MIN_WORDS
+
+    async def _generate_longform(
+        self,
+        preamble: str,
+        outline: Dict[str, Any],
+        target_word_count: Optional[str],
+        custom_title: Optional[str],
+        include_sections: Optional[List[str]],
+        metrics: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Write every outline section concurrently, then stitch them
+
+        All section requests share the same system preamble (brief, research
+        context, outline), marked for prompt caching. The first section is
+        streamed and the others start once its response begins, by which
+        point the preamble is cached, so wall-clock time is roughly the
+        slowest section plus one short stitching call.
+        """
+        sections = list(outline["sections"])
+        for key in include_sections or []:
+            if key in LONGFORM_EXTRA_SECTIONS:
+                # Before the conclusion, which is conventionally last
+                sections.insert(max(len(sections) - 1, 0), LONGFORM_EXTRA_SECTIONS[key])
+
+        outline_text = "\n".join(
+            f"{i + 1}. {section['heading']}" for i, section in enumerate(sections)
+        )
+        system_text = f"""{preamble}
+
+**Outline:**
+{outline_text}
+
+The post is written one section at a time, in parallel, by several writers sharing this brief. Write only the section you are asked for."""
+        if settings.PROMPT_CACHING_ENABLED:
+            system = [{"type": "text", "text": system_text, "cache_control": {"type": "ephemeral"}}]
+        else:
+            system = system_text
+
+        budgets = self._section_word_budgets(len(sections), target_word_count)
+        preamble_cached = asyncio.Event()
+        semaphore = asyncio.Semaphore(settings.LONGFORM_MAX_CONCURRENCY)
+
+        async def write(index: int) -> str:
+            if index > 0:
+                await preamble_cached.wait()
+            async with semaphore:
+                try:
+                    return await self._generate_section(
+                        system, sections, index, budgets[index], metrics,
+                        on_start=preamble_cached.set if index == 0 else None,
+                    )
+                finally:
+                    if index == 0:
+                        preamble_cached.set()
+
+        bodies = await asyncio.gather(*(write(i) for i in range(len(sections))))
+        title, summary, transitions = await self._stitch_sections(
+            system,
+            bodies,
+            metrics,
+            fallback_title=(outline.get("title_suggestions") or ["Untitled Blog Post"])[0],
+            custom_title=custom_title,
+        )
+
+        started = time.perf_counter()
+        parts = [f"# {title}"]
+        for i, body in enumerate(bodies):
+            parts.append(body)
+            if transitions.get(i + 1):
+                parts.append(transitions[i + 1])
+        result = blog_stats(title, summary, "\n\n".join(parts))
+        metrics["parse"] = round(time.perf_counter() - started, 3)
+
+        result["metrics"] = metrics
+        return result
+
+    @staticmethod
+    def _section_word_budgets(count: int, target_word_count: Optional[str]) -> List[int]:
+        """Split the word target across sections; intro and conclusion get half shares"""
+        _, high = parse_word_range(target_word_count)
+        weights = [1.0] * count
+        if count >= 3:
+            weights[0] = weights[-1] = 0.5
+        total = sum(weights)
+        return [max(100, round(high * w / total)) for w in weights]
+
+    @traced("generation.section")
+    async def _generate_section(
+        self,
+        system: Any,
+        sections: List[Dict[str, Any]],
+        index: int,
+        words: int,
+        metrics: Dict[str, Any],
+        on_start=None,
+    ) -> str:
+        """Write one outline section as Markdown starting with its H2"""
+        section = sections[index]
+        heading = section["heading"]
+        key_points = "\n".join(f"- {point}" for point in section.get("key_points", []) if point)
+        position = "the opening section" if index == 0 else (
+            "the closing section" if index == len(sections) - 1 else f"section {index + 1} of {len(sections)}"
+        )
+
+        prompt = f"""Write {position}: "{heading}".
+
+Points to cover:
+{key_points or "- Use your judgement based on the brief"}
+
+Length: about {words} words.
+Start with the line "## {heading}" and use ### for any subheadings. Do not write the post title, and do not introduce or summarise the whole post unless this is the opening or closing section. Output only the section's Markdown."""
+
+        request = dict(
+            model=self.model,
+            max_tokens=min(
+                round(words * settings.GENERATION_TOKENS_PER_WORD) + 200,
+                settings.GENERATION_MAX_OUTPUT_TOKENS,
+            ),
+            temperature=0.7,
+            system=system,
+            messages=[{"role": "user", "content": prompt}],
+        )
+
+        # The first section is streamed so the others can start as soon as
+        # its response begins (the preamble is cached by then)
+        text = await self._complete(request, metrics, stream=on_start is not None, on_start=on_start)
+
+        text = text.strip()
+        if not text.lstrip("#").strip().lower().startswith(heading.lower()):
+            text = f"## {heading}\n\n{text}"
+        return text
+
+    async def _stitch_sections(
+        self,
+        system: Any,
+        bodies: List[str],
+        metrics: Dict[str, Any],
+        fallback_title: str,
+        custom_title: Optional[str] = None,
+    ):
+        """
+        Short pass over the seams between sections
+
+        Returns (title, summary, {n: transition sentence closing section n}).
+        A custom title is used as given, as in single-shot generation; the
+        model only titles the post otherwise. Failures fall back to the
+        custom or outline title with no summary or transitions, since the
+        sections already stand on their own.
+        """
+        fallback_title = custom_title or fallback_title
+        seams = []
+        for i in range(len(bodies) - 1):
+            tail = " ".join(bodies[i].split()[-SEAM_WORDS:])
+            head = " ".join(bodies[i + 1].split()[:SEAM_WORDS])
+            seams.append(f"SEAM {i + 1}\nEnd of section {i + 1}: ...{tail}\nStart of section {i + 2}: {head}...")
+        openings = "\n\n".join(" ".join(body.split()[:SEAM_WORDS]) for body in bodies[:2])
+
+        prompt = f"""The sections of the post were written separately. Here is how it opens:
+
+{openings}
+
+And the seams between consecutive sections:
+
+{chr(10).join(seams)}
+
+""" + (f'The post is titled "{custom_title}".\n\n' if custom_title else "") + """Reply EXACTLY in this format:
+""" + ("" if custom_title else "TITLE: [compelling title]\n") + """SUMMARY: [2-3 sentence summary of the post]
+""" + "\n".join(
+            f"TRANSITION {i + 1}: [one sentence ending section {i + 1} that leads naturally into section {i + 2}]"
+            for i in range(len(bodies) - 1)
+        )
+
+        try:
+            reply = await self._complete(
+                dict(
+                    model=self.model,
+                    max_tokens=300 + 80 * len(seams),
+                    temperature=0.5,
+                    system=system,
+                    messages=[{"role": "user", "content": prompt}],
+                ),
+                metrics,
+            )
+        except Exception:
+            return fallback_title, "", {}
+
+        title_match = re.search(r"TITLE:\s*(.+)", reply)
+        summary_match = re.search(r"SUMMARY:\s*(.+?)(?=\nTRANSITION|\Z)", reply, re.DOTALL)
+        transitions = {
+            int(number): sentence.strip()
+            for number, sentence in re.findall(r"TRANSITION\s+(\d+):\s*(.+)", reply)
         }
+        title = custom_title or (title_match.group(1).strip() if title_match else fallback_title)
+        summary = summary_match.group(1).strip() if summary_match else ""
+        return title, summary, transitions
 
+    @traced("generation.enhance")
     async def enhance_blog(
-        self, original_content: str, enhancement_type: str = "seo"
+        self, original_content: str, enhancement_type: str = "seo", cache=None
     ) -> str:
         """
         Enhance an existing blog post
 
+        The post is split on its H2 sections and the sections are enhanced
+        concurrently, so long posts are never cut off by one response's
+        output limit. With a cache (get_many/set_many over chunk_key keys),
+        sections enhanced before with the same content are reused as-is.
+
         Args:
             original_content: The original blog content
             enhancement_type: Type of enhancement (seo, readability, tone)
+            cache: Optional EnhancementCache
 
         Returns:
             Enhanced blog content
         """
-        enhancement_prompts = {
-            "seo": "Enhance this blog post for better SEO. Add relevant keywords naturally, improve meta descriptions, and optimize headings.",
-            "readability": "Improve the readability of this blog post. Make it more engaging, break up long paragraphs, and add transitions.",
-            "tone": "Adjust the tone of this blog post to be more professional and authoritative while maintaining engagement.",
-        }
+        instruction = ENHANCEMENT_PROMPTS.get(enhancement_type, ENHANCEMENT_PROMPTS["seo"])
+        chunks = split_h2_sections(original_content)
+        keys = [chunk_key(self.model, enhancement_type, chunk) for chunk in chunks]
+        cached = cache.get_many(set(keys)) if cache is not None else {}
+        if cache is not None:
+            hits = sum(key in cached for key in keys)
+            record_cache("enhancement", True, hits)
+            record_cache("enhancement", False, len(keys) - hits)
+
+        semaphore = asyncio.Semaphore(settings.ENHANCE_MAX_CONCURRENCY)
+
+        async def enhance(index: int) -> str:
+            if keys[index] in cached:
+                return cached[keys[index]]
+            async with semaphore:
+                return await self._enhance_chunk(instruction, chunks, index)
+
+        try:
+            enhanced = await asyncio.gather(*(enhance(i) for i in range(len(chunks))))
+        except Exception as e:
+            raise Exception(f"Failed to enhance blog: {str(e)}")
+
+        if cache is not None:
+            cache.set_many({
+                key: text for key, text in zip(keys, enhanced) if key not in cached
+            })
+        logger.info(
+            f"Enhanced {len(chunks)} sections ({sum(key in cached for key in keys)} from cache)"
+        )
+        return "\n\n".join(enhanced)
 
-        prompt = f"""{enhancement_prompts.get(enhancement_type, enhancement_prompts['seo'])}
+    async def _enhance_chunk(self, instruction: str, chunks: List[str], index: int) -> str:
+        """Rewrite one section of a post, keeping its heading"""
+        chunk = chunks[index]
+        prompt = f"""{instruction}
+
+This is part {index + 1} of {len(chunks)} of a longer post; the other parts are enhanced separately. Keep its heading line (if any) and its place in the post: do not add a title, introduction or conclusion that isn't already there.
 
 Original Content:
-{original_content}
+{chunk}
 
-Provide the enhanced version:"""
+Provide the enhanced version of this part only, in Markdown, with no commentary:"""
 
-        try:
-            message = self.client.messages.create(
+        with track_external("anthropic", "messages.create"):
+            message = await self.async_client.messages.create(
                 model=self.model,
-                max_tokens=4096,
+                max_tokens=min(
+                    estimate_tokens(chunk) * 2 + 256, settings.GENERATION_MAX_OUTPUT_TOKENS
+                ),
                 temperature=0.7,
-                messages=[{"role": "user", "content": prompt}]
+                messages=[{"role": "user", "content": prompt}],
             )
-
-            return message.content[0].text
-
-        except Exception as e:
-            raise Exception(f"Failed to enhance blog: {str(e)}")
+        return message.content[0].text.strip()
@@ -0,0 +1,207 @@
+import hashlib
+import httpx
+import resend
+from sqlalchemy import and_, delete, insert, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import track_external
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Resend's limit per /emails/batch request
+MAX_BATCH_SIZE = 100
+
+# Statuses worth retrying: rate limits, provider errors and credentials
+# being rotated. Anything else (400/422 validation) is permanent.
+RETRYABLE_STATUSES = {401, 403, 408, 409, 429}
+
+# One pooled client per process, created on first use (after any fork)
+_client: Optional[httpx.Client] = None
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            timeout=settings.EMAIL_SEND_TIMEOUT,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+    return _client
+
+
+class EmailDeliveryError(Exception):
+    """Resend rejected a batch"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code >= 500 or self.status_code in RETRYABLE_STATUSES
+
+
+def _insert_ignoring_duplicates(dialect: str, message: Dict[str, str]):
+    """INSERT that silently skips a dedup_key already in the outbox"""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(EmailOutbox).values(**message)
+    return dialect_insert(EmailOutbox).values(**message).on_conflict_do_nothing(index_elements=["dedup_key"])
+
+
+class EmailOutboxService:
+    """Service queueing transactional email and delivering it in batches"""
+
+    def queue(self, db: Session, message: Dict[str, str]) -> None:
+        """
+        Add a message (from EmailService) to the outbox in db's transaction
+
+        Nothing is committed: the email goes out only if the caller's
+        change does. A message whose dedup_key was queued before is dropped.
+        """
+        db.execute(_insert_ignoring_duplicates(db.get_bind().dialect.name, message))
+
+    async def queue_async(self, db: AsyncSession, message: Dict[str, str]) -> None:
+        """queue() for async sessions"""
+        await db.execute(_insert_ignoring_duplicates(db.bind.dialect.name, message))
+
+    def drain(self, db: Session, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """
+        Deliver due messages, a batch at a time, until none are left
+
+        Args:
+            db: Database session (committed after every claim and every batch)
+            max_batches: Stop after this many batches (default EMAIL_OUTBOX_MAX_BATCHES)
+
+        Returns:
+            Counts of messages sent, scheduled for retry and failed for good
+        """
+        batch_size = min(settings.EMAIL_OUTBOX_BATCH_SIZE, MAX_BATCH_SIZE)
+        counts = {"sent": 0, "retried": 0, "failed": 0}
+        for _ in range(max_batches or settings.EMAIL_OUTBOX_MAX_BATCHES):
+            rows = self._claim(db, batch_size)
+            if not rows:
+                break
+            self._deliver(rows, counts)
+            db.commit()
+            if len(rows) < batch_size:
+                break
+        return counts
+
+    def purge(self, db: Session, days: int) -> int:
+        """Delete sent messages older than `days`; failed ones are kept for inspection"""
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        result = db.execute(
+            delete(EmailOutbox).where(EmailOutbox.status == EmailStatus.SENT, EmailOutbox.sent_at < cutoff)
+        )
+        db.commit()
+        return result.rowcount
+
+    def _claim(self, db: Session, limit: int) -> List[EmailOutbox]:
+        """
+        Mark due messages as being sent and return them
+
+        Claims left by a crashed drain are taken over once they are older
+        than EMAIL_OUTBOX_CLAIM_TIMEOUT. Concurrent drains skip each other's
+        rows on Postgres (FOR UPDATE SKIP LOCKED).
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+        rows = (
+            db.query(EmailOutbox)
+            .filter(or_(
+                and_(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+                and_(EmailOutbox.status == EmailStatus.SENDING, EmailOutbox.claimed_at < stale),
+            ))
+            .order_by(EmailOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for row in rows:
+            row.status = EmailStatus.SENDING
+            row.claimed_at = now
+            row.attempts += 1
+        db.commit()
+        return rows
+
+    def _deliver(self, rows: List[EmailOutbox], counts: Dict[str, int]) -> None:
+        """Send claimed rows as one batch and record the outcome on each"""
+        try:
+            provider_ids = self._send_batch(rows)
+        except EmailDeliveryError as e:
+            if not e.retryable and len(rows) > 1:
+                # A batch is validated as a whole; send one at a time so a
+                # single bad address doesn't hold back the rest
+                for row in rows:
+                    self._deliver([row], counts)
+                return
+            for row in rows:
+                self._attempt_failed(row, str(e), permanent=not e.retryable, counts=counts)
+            return
+        except httpx.HTTPError as e:
+            for row in rows:
+                self._attempt_failed(row, f"{type(e).__name__}: {e}", permanent=False, counts=counts)
+            return
+
+        now = datetime.utcnow()
+        for row, provider_id in zip(rows, provider_ids):
+            row.status = EmailStatus.SENT
+            row.provider_id = provider_id
+            row.sent_at = now
+            row.last_error = None
+        counts["sent"] += len(rows)
+
+    def _send_batch(self, rows: List[EmailOutbox]) -> List[str]:
+        """
+        POST /emails/batch; returns the Resend id of each email, in order
+
+        The idempotency key is derived from the outbox ids, so resending the
+        same batch (e.g. after a timeout whose request actually succeeded)
+        is deduplicated by Resend.
+        """
+        key = hashlib.sha256(",".join(str(row.id) for row in rows).encode()).hexdigest()
+        with track_external("resend", "emails.batch"):
+            response = _get_client().post(
+                f"{resend.api_url}/emails/batch",
+                json=[
+                    {"from": settings.FROM_EMAIL, "to": [row.to_email], "subject": row.subject, "html": row.html}
+                    for row in rows
+                ],
+                headers={
+                    "Authorization": f"Bearer {settings.RESEND_API_KEY}",
+                    "Idempotency-Key": f"outbox-{key}",
+                },
+            )
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message") or response.text
+            except ValueError:
+                message = response.text
+            raise EmailDeliveryError(f"Resend returned {response.status_code}: {message}", response.status_code)
+        return [item["id"] for item in response.json()["data"]]
+
+    def _attempt_failed(self, row: EmailOutbox, error: str, permanent: bool, counts: Dict[str, int]) -> None:
+        """Schedule a retry with exponential backoff, or give up"""
+        row.last_error = error[:1000]
+        if permanent or row.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            row.status = EmailStatus.FAILED
+            counts["failed"] += 1
+            logger.error(f"Giving up on email {row.id} ({row.dedup_key}) after {row.attempts} attempt(s): {error}")
+            return
+        delay = min(
+            settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (row.attempts - 1),
+            settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS,
+        )
+        row.status = EmailStatus.PENDING
+        row.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        counts["retried"] += 1
+        logger.warning(f"Email {row.id} ({row.dedup_key}) failed, retrying in {delay}s: {error}")
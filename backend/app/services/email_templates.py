@@ -0,0 +1,52 @@
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+from app.core.config import settings
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+
+class EmailTemplates:
+    """
+    Email templates compiled once per process
+
+    Every template in the directory extends _layout.html (shared markup and
+    CSS) and is compiled when this is constructed, so rendering is a call
+    into already-compiled code. Variables are HTML-escaped and a missing
+    one raises instead of rendering blank.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        directory = directory or TEMPLATE_DIR
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=True,
+            undefined=StrictUndefined,
+            auto_reload=False,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        self.env.globals["frontend_url"] = settings.FRONTEND_URL
+        # Files starting with "_" are layouts and partials, not emails
+        self.templates: Dict[str, Template] = {
+            path.stem: self.env.get_template(path.name)
+            for path in sorted(directory.glob("*.html"))
+            if not path.name.startswith("_")
+        }
+
+    def render(self, name: str, context: Mapping[str, Any]) -> str:
+        """
+        Render an email body
+
+        Args:
+            name: Template file name without .html, e.g. "blog_ready"
+            context: Template variables
+
+        Raises:
+            KeyError: Unknown template
+            jinja2.UndefinedError: A variable the template uses is missing
+        """
+        return self.templates[name].render(context)
+
+
+email_templates = EmailTemplates()
@@ -0,0 +1,57 @@
+import hashlib
+import redis
+from app.core.config import settings
+from typing import Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shared per process, like the job event pools
+_pool: Optional[redis.ConnectionPool] = None
+
+
+def _get_client() -> redis.Redis:
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(settings.REDIS_URL)
+    return redis.Redis(connection_pool=_pool)
+
+
+def chunk_key(model: str, enhancement_type: str, chunk: str) -> str:
+    """Cache key for one enhanced chunk: model, enhancement type and content hash"""
+    digest = hashlib.sha256(f"{model}\0{enhancement_type}\0{chunk}".encode("utf-8")).hexdigest()
+    return f"enhance-chunk:{digest}"
+
+
+class EnhancementCache:
+    """
+    Redis cache of enhanced chunks keyed by the hash of their input
+
+    Re-enhancing an edited post only sends the sections that changed. Redis
+    errors are logged and treated as misses; the cache is never required.
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl or settings.ENHANCE_CACHE_TTL_SECONDS
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = _get_client().mget(keys)
+        except redis.RedisError as e:
+            logger.warning(f"Enhancement cache lookup failed: {str(e)}")
+            return {}
+        return {key: value.decode("utf-8") for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items: Dict[str, str]) -> None:
+        if not items:
+            return
+        try:
+            pipeline = _get_client().pipeline(transaction=False)
+            for key, value in items.items():
+                pipeline.set(key, value, ex=self.ttl)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Enhancement cache store failed: {str(e)}")
@@ -0,0 +1,260 @@
+import asyncio
+import httpx
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from app.core.metrics import record_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROBOTS_MAX_BYTES = 512000
+ROBOTS_UNREACHABLE_TTL = 300  # Seconds before retrying a robots.txt that failed with 5xx/network errors
+MAX_THROTTLE_RETRIES = 2
+MAX_RETRY_AFTER = 60.0  # Longer Retry-After values give up on the URL for this run
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class HostThrottled(Exception):
+    """Raised by a fetch job when a host answers 429/503"""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__(f"throttled, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds (HTTP-date values are ignored)"""
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Per-host rate limiter
+
+    Reservations are plain time arithmetic (no asyncio primitives), so one
+    bucket keeps limiting a host across research runs and event loops in
+    the same worker process.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate  # Tokens per second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until or self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def block(self, seconds: float):
+        """Stop handing out tokens for a while (after a 429/503)"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def slow_down(self, rate: float):
+        """Lower the rate, e.g. to honour a robots.txt Crawl-delay"""
+        with self._lock:
+            self.rate = min(self.rate, rate)
+
+
+class RobotsCache:
+    """robots.txt rules per host, cached with a TTL (RFC 9309 semantics)"""
+
+    def __init__(self, user_agent: str, ttl: float):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}  # host -> (RobotFileParser, expires_at)
+        self._pending: Dict[tuple, asyncio.Future] = {}  # (event loop, host) -> lookup
+
+    async def rules(self, client: httpx.AsyncClient, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+
+        entry = self._entries.get(host)
+        if entry and entry[1] > time.monotonic():
+            record_cache("robots", True)
+            return entry[0]
+        record_cache("robots", False)
+
+        # Concurrent lookups for the same host share one robots.txt request.
+        # Futures can't cross event loops, so threaded Celery pools (one
+        # loop per thread) share only the cached entries.
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get((loop, host))
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        self._pending[(loop, host)] = future
+        try:
+            parser, ttl = await self._fetch(client, f"{parts.scheme}://{parts.netloc}/robots.txt")
+            self._entries[host] = (parser, time.monotonic() + ttl)
+            future.set_result(parser)
+            return parser
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters re-raise it
+            raise
+        finally:
+            self._pending.pop((loop, host), None)
+
+    async def _fetch(self, client: httpx.AsyncClient, robots_url: str):
+        """Returns (parser, ttl): 4xx allows everything, 5xx/errors disallow everything"""
+        parser = RobotFileParser(robots_url)
+        try:
+            response = await client.get(robots_url)
+        except httpx.HTTPError as e:
+            logger.info(f"robots.txt unreachable at {robots_url}: {e}")
+            parser.disallow_all = True
+            return parser, min(self.ttl, ROBOTS_UNREACHABLE_TTL)
+
+        if response.status_code >= 500:
+            parser.disallow_all = True
+            return parser, min(self.ttl, ROBOTS_UNREACHABLE_TTL)
+        if response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text[:ROBOTS_MAX_BYTES].splitlines())
+        return parser, self.ttl
+
+    async def allowed(self, client: httpx.AsyncClient, url: str) -> bool:
+        return (await self.rules(client, url)).can_fetch(self.user_agent, url)
+
+
+class HostScheduler:
+    """
+    Runs fetch jobs politely across many hosts
+
+    URLs are queued per host. A fixed set of workers (the global in-flight
+    cap) repeatedly takes the next URL from whichever host is ready: it has
+    a token in its bucket and fewer than `per_host` requests in flight.
+    A slow or throttled host therefore holds at most `per_host` workers
+    while the rest keep draining other hosts' queues.
+    """
+
+    def __init__(
+        self,
+        buckets: Dict[str, TokenBucket],
+        bucket_factory: Callable[[], TokenBucket],
+        max_in_flight: int,
+        per_host: int,
+        max_host_failures: int,
+    ):
+        self.buckets = buckets
+        self.bucket_factory = bucket_factory
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.max_host_failures = max_host_failures
+
+    def bucket(self, host: str) -> TokenBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets.setdefault(host, self.bucket_factory())
+        return bucket
+
+    async def run(
+        self, urls: List[str], job: Callable[[str], Awaitable[Any]]
+    ) -> List[Optional[Any]]:
+        """
+        Run job(url) for every URL
+
+        Returns results in input order; None where the job failed or its
+        host was given up on (too many failures, or throttled too long).
+        """
+        results: List[Optional[Any]] = [None] * len(urls)
+        queues: Dict[str, Deque[tuple]] = {}
+        for index, url in enumerate(urls):
+            queues.setdefault(host_of(url), deque()).append((index, url, 0))
+
+        in_flight: Dict[str, int] = {host: 0 for host in queues}
+        failures: Dict[str, int] = {host: 0 for host in queues}
+        changed = asyncio.Event()  # Set whenever a slot frees up or work is requeued
+
+        def next_item():
+            """Pop from the ready host with the longest queue, else return the shortest wait"""
+            wait = None
+            ready = None
+            for host, queue in queues.items():
+                if not queue or in_flight[host] >= self.per_host:
+                    continue
+                delay = self.bucket(host).wait_time()
+                if delay > 0:
+                    wait = delay if wait is None else min(wait, delay)
+                elif ready is None or len(queue) > len(queues[ready]):
+                    ready = host
+            if ready is not None and self.bucket(ready).try_acquire():
+                return ready, queues[ready].popleft(), None
+            return None, None, wait
+
+        async def worker():
+            while True:
+                host, item, wait = next_item()
+                if item is None:
+                    if not any(queues.values()):
+                        return  # Nothing queued; in-flight jobs requeue through their own worker
+                    changed.clear()
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                index, url, attempt = item
+                in_flight[host] += 1
+                try:
+                    results[index] = await job(url)
+                    failures[host] = 0
+                except HostThrottled as e:
+                    retry_after = e.retry_after if e.retry_after is not None else 2.0 ** (attempt + 1)
+                    self.bucket(host).block(min(retry_after, MAX_RETRY_AFTER))
+                    if attempt < MAX_THROTTLE_RETRIES and retry_after <= MAX_RETRY_AFTER:
+                        queues[host].append((index, url, attempt + 1))
+                    else:
+                        logger.warning(f"Giving up on {url}: host keeps throttling")
+                except Exception as e:
+                    failures[host] += 1
+                    logger.warning(f"Fetch failed for {url}: {e}")
+                    if failures[host] >= self.max_host_failures and queues[host]:
+                        logger.warning(f"Skipping {len(queues[host])} more URLs on {host} after repeated failures")
+                        queues[host].clear()
+                finally:
+                    in_flight[host] -= 1
+                    changed.set()
+
+        workers = min(self.max_in_flight, len(urls))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
@@ -0,0 +1,211 @@
+from lxml import etree
+from typing import Any, Dict, Iterable, Iterator, Optional
+import re
+
+# Subtrees that never carry article content; dropped as soon as they close
+STRIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select",
+}
+
+# Elements whose text is emitted as a candidate
+TOPIC_TAGS = {"title": 0.9, "h1": 0.8, "h2": 0.6}
+TEXT_TAGS = {"p", "li", "h3", "blockquote", "td"}
+
+STOP_WORDS = {
+    "the", "a", "an", "in", "on", "at", "for", "to", "of", "and", "or", "but",
+    "is", "are", "was", "were", "be", "been", "being", "this", "that", "these",
+    "those", "with", "from", "by", "as", "it", "its", "into", "about", "than",
+    "then", "there", "their", "they", "them", "have", "has", "had", "will",
+    "would", "could", "should", "can", "may", "might", "also", "more", "most",
+    "such", "some", "other", "which", "who", "what", "when", "where", "while",
+    "your", "you", "our", "we", "not", "all", "any", "each", "over", "after",
+    "before", "said", "says", "just", "like", "new", "one", "two", "year",
+    "years", "2024", "2025", "2026",
+}
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9'-]+")
+_SPACE_RE = re.compile(r"\s+")
+
+MIN_TOPIC_CHARS = 12
+MAX_TOPIC_CHARS = 200
+
+
+def _clean_text(text: str) -> str:
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def extract_terms(text: str) -> Iterator[str]:
+    """Yield keyword candidates (words and adjacent-word bigrams) from text"""
+    previous = None
+    for word in _WORD_RE.findall(text.lower()):
+        word = word.strip("'-")
+        if word in STOP_WORDS or len(word) <= 3:
+            previous = None
+            continue
+        yield word
+        if previous:
+            yield f"{previous} {word}"
+        previous = word
+
+
+class ChunkAligner:
+    """
+    Re-chunks streamed HTML bytes into parser-safe pieces
+
+    libxml2's push parser can drop the rest of the document (or crash) when a
+    chunk boundary falls inside markup - a DOCTYPE, a tag, or a </script>
+    inside raw text. Chunks are therefore cut only right after a ">", and
+    <script>/<style> bodies are removed entirely before they reach the parser
+    (their opening and closing tags are kept). Only the bytes after the last
+    ">" are held between chunks.
+    """
+
+    RAW_TEXT_TAGS = (b"script", b"style")
+
+    def __init__(self):
+        self._buffer = b""
+        self._closing: Optional[bytes] = None  # Closing tag we're skipping to
+
+    def feed(self, chunk: bytes) -> bytes:
+        self._buffer += chunk
+        output = []
+
+        while self._buffer:
+            lowered = self._buffer.lower()
+
+            if self._closing is None:
+                start, tag = self._find_opening(lowered)
+                tag_end = lowered.find(b">", start) if start >= 0 else -1
+                if tag_end < 0:
+                    # No complete raw-text opening tag: emit through the last ">"
+                    cut = lowered.rfind(b">", 0, start if start >= 0 else len(lowered)) + 1
+                    output.append(self._buffer[:cut])
+                    self._buffer = self._buffer[cut:]
+                    break
+                output.append(self._buffer[:tag_end + 1])
+                self._buffer = self._buffer[tag_end + 1:]
+                self._closing = b"</" + tag
+            else:
+                end = lowered.find(self._closing)
+                tag_end = lowered.find(b">", end) if end >= 0 else -1
+                if tag_end < 0:
+                    # Raw text is dropped; keep just enough to match a split closing tag
+                    keep = end if end >= 0 else max(len(self._buffer) - len(self._closing), 0)
+                    self._buffer = self._buffer[keep:]
+                    break
+                output.append(self._buffer[end:tag_end + 1])
+                self._buffer = self._buffer[tag_end + 1:]
+                self._closing = None
+
+        return b"".join(output)
+
+    def close(self) -> bytes:
+        remaining = b"" if self._closing else self._buffer
+        self._buffer = b""
+        return remaining
+
+    def _find_opening(self, lowered: bytes):
+        """Earliest <script/<style opening tag (followed by whitespace, / or >)"""
+        best, best_tag = -1, None
+        for tag in self.RAW_TEXT_TAGS:
+            position = lowered.find(b"<" + tag)
+            while position >= 0:
+                follow = lowered[position + len(tag) + 1:position + len(tag) + 2]
+                if follow == b"" or follow in (b">", b"/", b" ", b"\t", b"\n", b"\r"):
+                    break
+                position = lowered.find(b"<" + tag, position + 1)
+            if position >= 0 and (best < 0 or position < best):
+                best, best_tag = position, tag
+        return best, best_tag
+
+
+class PageExtractor:
+    """
+    Incremental HTML extractor
+
+    Bytes are fed as they arrive from the network. Script/style/navigation
+    subtrees are discarded as they close, and every processed element is
+    cleared, so memory stays bounded by the largest open element rather than
+    the page size.
+    """
+
+    def __init__(self, source: Optional[str] = None):
+        self.source = source
+        self._aligner = ChunkAligner()
+        self._parser = etree.HTMLPullParser(events=("start", "end"), recover=True)
+        self._skip_depth = 0
+        self._seen_topics = set()
+
+    def feed(self, chunk: bytes) -> Iterator[Dict[str, Any]]:
+        """Feed a chunk of the page and yield any completed candidates"""
+        data = self._aligner.feed(chunk)
+        if data:
+            self._parser.feed(data)
+        yield from self._drain()
+
+    def close(self) -> Iterator[Dict[str, Any]]:
+        """Finish parsing and yield the remaining candidates"""
+        try:
+            remaining = self._aligner.close()
+            if remaining:
+                self._parser.feed(remaining)
+            self._parser.close()
+        except etree.LxmlError:
+            pass
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[Dict[str, Any]]:
+        for event, element in self._parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ""
+            tag = tag.lower()
+
+            if event == "start":
+                if tag in STRIP_TAGS:
+                    self._skip_depth += 1
+                continue
+
+            if tag in STRIP_TAGS:
+                self._skip_depth -= 1
+                self._discard(element)
+                continue
+
+            if self._skip_depth == 0:
+                if tag in TOPIC_TAGS:
+                    yield from self._topic(element, TOPIC_TAGS[tag])
+                elif tag in TEXT_TAGS:
+                    yield from self._keywords(element)
+
+            if tag not in ("html", "body"):
+                self._discard(element)
+
+    def _topic(self, element, relevance: float) -> Iterator[Dict[str, Any]]:
+        title = _clean_text("".join(element.itertext()))
+        if MIN_TOPIC_CHARS <= len(title) <= MAX_TOPIC_CHARS and title.lower() not in self._seen_topics:
+            self._seen_topics.add(title.lower())
+            yield {"type": "topic", "title": title, "relevance": relevance, "source": self.source}
+        yield from self._keywords(element)
+
+    def _keywords(self, element) -> Iterator[Dict[str, Any]]:
+        text = "".join(element.itertext())
+        for term in extract_terms(text):
+            yield {"type": "keyword", "term": term}
+
+    @staticmethod
+    def _discard(element):
+        """Free a processed element and any already-processed siblings"""
+        element.clear(keep_tail=True)
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def extract_from_chunks(
+    chunks: Iterable[bytes], source: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Run a PageExtractor over an iterable of byte chunks (e.g. a saved fixture)"""
+    extractor = PageExtractor(source=source)
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+    yield from extractor.close()
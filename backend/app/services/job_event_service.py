@@ -0,0 +1,108 @@
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+from app.models.research_job import JobStatus
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sent instead of a status when the job no longer exists
+JOB_DELETED = "deleted"
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED.value, JobStatus.FAILED.value, JOB_DELETED}
+
+# Connection pools are shared per process; clients are cheap wrappers around them
+_sync_pool: Optional[redis.ConnectionPool] = None
+_async_pool: Optional[aioredis.ConnectionPool] = None
+
+
+def _get_sync_client() -> redis.Redis:
+    global _sync_pool
+    if _sync_pool is None:
+        _sync_pool = redis.ConnectionPool.from_url(settings.REDIS_URL)
+    return redis.Redis(connection_pool=_sync_pool)
+
+
+def _get_async_client() -> aioredis.Redis:
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = aioredis.ConnectionPool.from_url(settings.REDIS_URL)
+    return aioredis.Redis(connection_pool=_async_pool)
+
+
+class JobEventService:
+    """Service for publishing and streaming research job status transitions"""
+
+    @staticmethod
+    def channel(job_id: int) -> str:
+        return f"job-events:{job_id}"
+
+    @staticmethod
+    def build_event(job_id: int, status: JobStatus, **extra: Any) -> Dict[str, Any]:
+        """Build the payload sent to subscribers"""
+        event = {
+            "job_id": job_id,
+            "status": status.value if isinstance(status, JobStatus) else status,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        event.update({k: v for k, v in extra.items() if v is not None})
+        return event
+
+    def publish(self, job_id: int, status: JobStatus, **extra: Any) -> None:
+        """
+        Publish a status transition (sync - used by Celery tasks)
+
+        Failures are logged and swallowed: the job row remains the source of
+        truth and clients can always fall back to GET /jobs/{id}.
+        """
+        event = self.build_event(job_id, status, **extra)
+        try:
+            _get_sync_client().publish(self.channel(job_id), json.dumps(event))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to publish event for job {job_id}: {str(e)}")
+
+    async def subscribe(self, job_id: int) -> aioredis.client.PubSub:
+        """
+        Subscribe to a job's channel; pass the result to unsubscribe when done
+
+        Raises:
+            redis.RedisError: Redis is unavailable
+        """
+        pubsub = _get_async_client().pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.channel(job_id))
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        return pubsub
+
+    async def unsubscribe(self, pubsub: aioredis.client.PubSub) -> None:
+        """Close a subscription; errors are logged, as the stream is over either way"""
+        try:
+            await pubsub.unsubscribe()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to unsubscribe from {list(pubsub.channels)}: {str(e)}")
+        finally:
+            await pubsub.aclose()
+
+    async def listen(
+        self, pubsub: aioredis.client.PubSub, heartbeat_seconds: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events from a subscription as they arrive
+
+        Yields None after heartbeat_seconds without traffic so callers can
+        keep idle connections alive. The caller decides when to stop.
+        """
+        while True:
+            message = await pubsub.get_message(timeout=heartbeat_seconds)
+            if message is None:
+                yield None
+                continue
+            try:
+                yield json.loads(message["data"])
+            except (TypeError, ValueError):
+                logger.warning(f"Dropping malformed event on {pubsub.channels}")
@@ -0,0 +1,144 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.research_job import ResearchJob, JobStatus
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+import time
+
+# Order stages are reported in
+STAGES = [
+    "queue_wait",
+    "research",
+    "generation_ttft",
+    "generation",
+    "parse",
+    "persist",
+    "markdown",
+    "pdf",
+    "notify",
+]
+
+
+class StageTimer:
+    """Per-stage wall-clock durations for one job, in seconds"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the block; repeated stages accumulate"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: Optional[float]) -> None:
+        if seconds is None:
+            return
+        self.timings[name] = round(self.timings.get(name, 0.0) + max(seconds, 0.0), 3)
+
+
+def seconds_between(earlier: Optional[datetime], later: datetime) -> Optional[float]:
+    """Seconds from a (possibly timezone-aware) DB timestamp to a naive UTC time"""
+    if earlier is None:
+        return None
+    if earlier.tzinfo is not None:
+        earlier = earlier.replace(tzinfo=None) - (earlier.utcoffset() or timedelta())
+    return (later - earlier).total_seconds()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class JobMetricsService:
+    """Service aggregating job timings and token usage for the admin metrics endpoint"""
+
+    async def summary(self, db: AsyncSession, days: int, limit: int = 5000) -> Dict[str, Any]:
+        """
+        Stage latency percentiles and token totals over recent jobs
+
+        Args:
+            db: Database session
+            days: Window, counted back from now
+            limit: Most recent finished jobs sampled for the percentiles
+
+        Returns:
+            Job counts by status, per-stage count/p50/p95/p99/max (seconds)
+            over completed jobs, and token totals and per-job averages
+        """
+        since = datetime.utcnow() - timedelta(days=days)
+
+        status_counts = {
+            job_status.value: count
+            for job_status, count in (
+                await db.execute(
+                    select(ResearchJob.status, func.count(ResearchJob.id))
+                    .filter(ResearchJob.created_at >= since)
+                    .group_by(ResearchJob.status)
+                )
+            ).all()
+        }
+
+        tokens = (
+            await db.execute(
+                select(
+                    func.count(ResearchJob.id),
+                    func.coalesce(func.sum(ResearchJob.input_tokens), 0),
+                    func.coalesce(func.sum(ResearchJob.output_tokens), 0),
+                    func.coalesce(func.sum(ResearchJob.cached_tokens), 0),
+                )
+                .filter(ResearchJob.created_at >= since, ResearchJob.input_tokens.isnot(None))
+            )
+        ).one()
+        jobs_with_usage, input_tokens, output_tokens, cached_tokens = tokens
+
+        timings = (
+            await db.execute(
+                select(ResearchJob.stage_timings)
+                .filter(
+                    ResearchJob.created_at >= since,
+                    ResearchJob.status == JobStatus.COMPLETED,
+                    ResearchJob.stage_timings.isnot(None),
+                )
+                .order_by(ResearchJob.id.desc())
+                .limit(limit)
+            )
+        ).scalars().all()
+
+        samples: Dict[str, List[float]] = {}
+        for job_timings in timings:
+            for stage, seconds in (job_timings or {}).items():
+                samples.setdefault(stage, []).append(seconds)
+
+        stages = {}
+        for stage in STAGES + sorted(set(samples) - set(STAGES)):
+            values = sorted(samples.get(stage, []))
+            if not values:
+                continue
+            stages[stage] = {
+                "count": len(values),
+                "p50": _percentile(values, 0.5),
+                "p95": _percentile(values, 0.95),
+                "p99": _percentile(values, 0.99),
+                "max": values[-1],
+            }
+
+        per_job = max(jobs_with_usage, 1)
+        return {
+            "days": days,
+            "jobs": status_counts,
+            "sampled_jobs": len(timings),
+            "stages": stages,
+            "tokens": {
+                "input": input_tokens,
+                "output": output_tokens,
+                "cached": cached_tokens,
+                "avg_input_per_job": round(input_tokens / per_job),
+                "avg_output_per_job": round(output_tokens / per_job),
+                "avg_cached_per_job": round(cached_tokens / per_job),
+            },
+        }
@@ -0,0 +1,205 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.keyword import Keyword, KeywordPosting, KeywordStat
+from app.models.research_job import ResearchJob
+from app.models.research_snapshot import ResearchSnapshot
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_term(value: str) -> str:
+    """Canonical form used for keywords, sectors and locations"""
+    return re.sub(r"\s+", " ", value or "").strip().lower()
+
+
+def _insert_for(db: Session, table):
+    """Dialect-specific INSERT supporting ON CONFLICT"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def _greatest(db: Session, *values):
+    """GREATEST() on Postgres, multi-argument max() on SQLite"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.greatest(*values)
+    return func.max(*values)
+
+
+class KeywordIndexService:
+    """Service maintaining the cross-job keyword inverted index"""
+
+    def index_job(self, db: Session, job: ResearchJob) -> int:
+        """
+        Add a job's keywords to the index (sync - used by Celery tasks)
+
+        Jobs served from a research snapshot are skipped: the snapshot was
+        indexed when it was built. Re-indexing the same job is a no-op. The
+        caller commits.
+
+        Returns:
+            Number of new postings
+        """
+        if (job.research_data or {}).get("snapshot_version") is not None:
+            return 0
+        return self._index(
+            db, job.keywords_found, job.sector, job.location, job.created_at, job_id=job.id
+        )
+
+    def index_snapshot(self, db: Session, snapshot: ResearchSnapshot) -> int:
+        """
+        Add a research snapshot's keywords to the index, once per snapshot version
+
+        The caller commits.
+
+        Returns:
+            Number of new postings
+        """
+        return self._index(
+            db,
+            snapshot.research_data.get("keywords"),
+            snapshot.sector,
+            snapshot.location,
+            snapshot.refreshed_at,
+            snapshot_id=snapshot.id,
+        )
+
+    def _index(
+        self,
+        db: Session,
+        keywords: Optional[List[str]],
+        sector: str,
+        location: str,
+        seen_at: Optional[datetime],
+        job_id: Optional[int] = None,
+        snapshot_id: Optional[int] = None,
+    ) -> int:
+        """Insert postings for one research run and bump per sector/location counters"""
+        terms = sorted({normalize_term(k) for k in (keywords or []) if normalize_term(k)})
+        if not terms:
+            return 0
+
+        sector = normalize_term(sector)
+        location = normalize_term(location)
+        seen_at = seen_at or datetime.utcnow()
+
+        db.execute(
+            _insert_for(db, Keyword)
+            .values([{"term": term} for term in terms])
+            .on_conflict_do_nothing(index_elements=["term"])
+        )
+        keyword_ids = dict(
+            db.execute(select(Keyword.term, Keyword.id).filter(Keyword.term.in_(terms))).all()
+        )
+
+        inserted = db.execute(
+            _insert_for(db, KeywordPosting)
+            .values([
+                {
+                    "keyword_id": keyword_ids[term],
+                    "job_id": job_id,
+                    "snapshot_id": snapshot_id,
+                    "sector": sector,
+                    "location": location,
+                    "created_at": seen_at,
+                }
+                for term in terms
+            ])
+            .on_conflict_do_nothing(
+                index_elements=["keyword_id", "job_id" if job_id is not None else "snapshot_id"]
+            )
+            .returning(KeywordPosting.keyword_id)
+        ).scalars().all()
+
+        # Only count keywords whose posting is new, so retries don't double count
+        if inserted:
+            stmt = _insert_for(db, KeywordStat).values([
+                {
+                    "keyword_id": keyword_id,
+                    "sector": sector,
+                    "location": location,
+                    "job_count": 1,
+                    "last_seen_at": seen_at,
+                }
+                for keyword_id in inserted
+            ])
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["keyword_id", "sector", "location"],
+                    set_={
+                        "job_count": KeywordStat.job_count + 1,
+                        "last_seen_at": _greatest(
+                            db, KeywordStat.last_seen_at, stmt.excluded.last_seen_at
+                        ),
+                    },
+                )
+            )
+
+        return len(inserted)
+
+    def frequencies(
+        self, db: Session, sector: str, location: str, terms: List[str]
+    ) -> Dict[str, int]:
+        """
+        Historical job counts for candidate terms in a sector/location
+
+        Returns a mapping of the original term to its count; unseen terms are omitted.
+        """
+        by_normalized = {normalize_term(t): t for t in terms if normalize_term(t)}
+        if not by_normalized:
+            return {}
+
+        rows = db.execute(
+            select(Keyword.term, KeywordStat.job_count)
+            .join(KeywordStat, KeywordStat.keyword_id == Keyword.id)
+            .filter(
+                Keyword.term.in_(list(by_normalized)),
+                KeywordStat.sector == normalize_term(sector),
+                KeywordStat.location == normalize_term(location),
+            )
+        ).all()
+        return {by_normalized[term]: count for term, count in rows}
+
+    async def top_keywords(
+        self,
+        db: AsyncSession,
+        sector: Optional[str] = None,
+        location: Optional[str] = None,
+        days: Optional[int] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, object]]:
+        """
+        Most frequent keywords, optionally scoped by sector, location and time window
+
+        All-time queries read the counters; windowed queries aggregate postings.
+        """
+        if days:
+            count = func.count().label("job_count")
+            query = (
+                select(Keyword.term, count)
+                .join(KeywordPosting, KeywordPosting.keyword_id == Keyword.id)
+                .filter(KeywordPosting.created_at >= datetime.utcnow() - timedelta(days=days))
+            )
+            scope = KeywordPosting
+        else:
+            count = func.sum(KeywordStat.job_count).label("job_count")
+            query = select(Keyword.term, count).join(
+                KeywordStat, KeywordStat.keyword_id == Keyword.id
+            )
+            scope = KeywordStat
+
+        if sector:
+            query = query.filter(scope.sector == normalize_term(sector))
+        if location:
+            query = query.filter(scope.location == normalize_term(location))
+
+        result = await db.execute(
+            query.group_by(Keyword.term).order_by(count.desc(), Keyword.term).limit(limit)
+        )
+        return [{"keyword": term, "job_count": job_count} for term, job_count in result.all()]
@@ -0,0 +1,138 @@
+import numpy as np
+import operator
+from itertools import repeat
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# Feature weights. The length/sector/location/history defaults reproduce the
+# original per-keyword heuristic; tfidf rewards terms that are frequent in
+# this job's sources but rare across them.
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "tfidf": 1.0,
+    "sector": 3.0,
+    "location": 2.0,
+    "length": 2.0,
+    "history": 3.0,
+}
+
+LONG_KEYWORD_CHARS = 8
+
+
+class KeywordScorer:
+    """Batch keyword scorer computing every feature as a NumPy array"""
+
+    def __init__(self, weights: Optional[Mapping[str, float]] = None):
+        unknown = set(weights or {}) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown keyword scoring features: {sorted(unknown)}")
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+    def features(
+        self,
+        terms: Sequence[str],
+        sector: str,
+        location: str,
+        term_counts: Optional[Sequence[int]] = None,
+        doc_freqs: Optional[Sequence[int]] = None,
+        n_docs: Optional[int] = None,
+        history: Optional[Mapping[str, int]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Compute the feature matrix for a batch of candidate terms
+
+        Args:
+            terms: Candidate keywords
+            sector: Industry sector
+            location: Target location
+            term_counts: Occurrences of each term across fetched sources (default 1)
+            doc_freqs: Number of sources containing each term (default 1)
+            n_docs: Number of sources examined (default max(doc_freqs))
+            history: Historical job counts per term from the keyword index
+
+        Returns:
+            Mapping of feature name to a float array aligned with terms
+        """
+        n = len(terms)
+
+        # String features take one map() pass over builtins each; everything
+        # after that is array math. np.char is avoided: it dispatches a str
+        # method per element and benchmarked several times slower.
+        lowered = list(map(str.lower, terms))
+
+        counts = np.ones(n) if term_counts is None else np.asarray(term_counts, dtype=float)
+        dfs = np.ones(n) if doc_freqs is None else np.asarray(doc_freqs, dtype=float)
+        total_docs = float(n_docs if n_docs else max(dfs.max(initial=1.0), 1.0))
+
+        idf = np.log((1.0 + total_docs) / (1.0 + dfs)) + 1.0
+        tfidf = np.log1p(counts) * idf
+
+        # Sector and location are lowercased once for the whole batch
+        sector_match = self._contains(lowered, sector.lower())
+        location_match = self._contains(lowered, location.lower())
+
+        long_term = np.fromiter(map(len, terms), dtype=np.int64, count=n) > LONG_KEYWORD_CHARS
+
+        if history:
+            hist = np.fromiter(map(history.get, terms, repeat(0)), dtype=float, count=n)
+        else:
+            hist = np.zeros(n)
+
+        return {
+            "tfidf": tfidf,
+            "sector": sector_match.astype(float),
+            "location": location_match.astype(float),
+            "length": long_term.astype(float),
+            "history": np.log1p(hist),
+        }
+
+    @staticmethod
+    def _contains(lowered: List[str], needle: str) -> np.ndarray:
+        """Boolean array: needle is a substring of each term"""
+        if not needle:
+            return np.zeros(len(lowered), dtype=bool)
+        return np.fromiter(
+            map(operator.contains, lowered, repeat(needle)), dtype=bool, count=len(lowered)
+        )
+
+    def score(self, features: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Weighted sum of feature arrays"""
+        scores = None
+        for name, weight in self.weights.items():
+            if weight == 0 or name not in features:
+                continue
+            contribution = weight * features[name]
+            scores = contribution if scores is None else scores + contribution
+        if scores is None:
+            return np.zeros(len(next(iter(features.values()), [])))
+        return scores
+
+    def top_k(self, scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+        """
+        Indices of the k best scores, best first
+
+        Uses argpartition so selection is O(n) and only the k winners are
+        sorted. Winners with equal scores keep input order.
+        """
+        n = len(scores)
+        if k is None or k >= n:
+            candidates = np.arange(n)
+        elif k <= 0:
+            return np.empty(0, dtype=np.intp)
+        else:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        # lexsort: last key is primary (descending score), then original index
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order]
+
+    def rank(
+        self,
+        terms: Sequence[str],
+        sector: str,
+        location: str,
+        limit: Optional[int] = None,
+        **feature_inputs,
+    ) -> List[str]:
+        """Score a batch of terms and return the top ones, best first"""
+        if len(terms) == 0:
+            return []
+        scores = self.score(self.features(terms, sector, location, **feature_inputs))
+        return [terms[i] for i in self.top_k(scores, limit)]
@@ -0,0 +1,121 @@
+import json
+import time
+import redis
+from app.core.config import settings
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shared per process, like the job event pools
+_pool: Optional[redis.ConnectionPool] = None
+
+# User ids with buffered notifications, scored by when their digest is due
+DUE_KEY = "notify-digest:due"
+
+
+def _get_client() -> redis.Redis:
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(settings.REDIS_URL)
+    return redis.Redis(connection_pool=_pool)
+
+
+def _window_key(user_id: int) -> str:
+    return f"notify-digest:window:{user_id}"
+
+
+def _items_key(user_id: int) -> str:
+    return f"notify-digest:items:{user_id}"
+
+
+class NotificationDigestService:
+    """
+    Service batching job notifications per user
+
+    The first job to finish opens a window of EMAIL_DIGEST_WINDOW_MINUTES
+    and is emailed straight away, so a single job still gets its own
+    email. Jobs finishing while the window is open are buffered in Redis;
+    send_notification_digests emails them as one summary once the window
+    closes, and reopens the window so a long batch keeps producing one
+    email per window. If Redis is unavailable every job is emailed
+    individually.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or _get_client()
+
+    @property
+    def window_seconds(self) -> int:
+        return settings.EMAIL_DIGEST_WINDOW_MINUTES * 60
+
+    def open_window(self, user_id: int) -> bool:
+        """True if this notification should be emailed now, False if it belongs in a digest"""
+        if not settings.EMAIL_DIGEST_ENABLED:
+            return True
+        try:
+            return bool(self.client.set(_window_key(user_id), 1, nx=True, ex=self.window_seconds))
+        except redis.RedisError as e:
+            logger.warning(f"Notification digest unavailable, emailing directly: {str(e)}")
+            return True
+
+    def buffer(self, user_id: int, entry: Dict[str, Any]) -> bool:
+        """
+        Add a finished job to the user's next digest
+
+        Returns:
+            False if it couldn't be buffered (the caller should email it directly)
+        """
+        try:
+            remaining = self.client.ttl(_window_key(user_id))
+            due = time.time() + max(remaining, 0)
+            pipe = self.client.pipeline()
+            pipe.rpush(_items_key(user_id), json.dumps(entry))
+            pipe.zadd(DUE_KEY, {str(user_id): due}, nx=True)
+            pipe.execute()
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Failed to buffer notification for user {user_id}: {str(e)}")
+            return False
+
+    def due_users(self, limit: int = 500) -> List[int]:
+        """Users whose digest window has closed"""
+        return [int(user_id) for user_id in self.client.zrangebyscore(DUE_KEY, "-inf", time.time(), start=0, num=limit)]
+
+    def take(self, user_id: int) -> List[Dict[str, Any]]:
+        """
+        Atomically remove and return a user's buffered entries, and reopen their window
+
+        Entries buffered after this land in a new digest.
+        """
+        pipe = self.client.pipeline()
+        pipe.lrange(_items_key(user_id), 0, -1)
+        pipe.delete(_items_key(user_id))
+        pipe.zrem(DUE_KEY, str(user_id))
+        pipe.set(_window_key(user_id), 1, ex=self.window_seconds)
+        items, _, _, _ = pipe.execute()
+        return [json.loads(item) for item in items]
+
+    def restore(self, user_id: int, entries: List[Dict[str, Any]]) -> None:
+        """Put entries back after a digest could not be queued; retried on the next run"""
+        pipe = self.client.pipeline()
+        pipe.lpush(_items_key(user_id), *(json.dumps(entry) for entry in reversed(entries)))
+        pipe.zadd(DUE_KEY, {str(user_id): time.time()})
+        pipe.execute()
+
+    @staticmethod
+    def entry(job, blog=None, error_message: Optional[str] = None) -> Dict[str, Any]:
+        """What a digest lists about one finished job"""
+        return {
+            "job_id": job.id,
+            "status": "failed" if error_message is not None else "completed",
+            "sector": job.sector,
+            "location": job.location,
+            "blog_id": blog.id if blog is not None else None,
+            "blog_title": blog.title if blog is not None else None,
+            "error_message": error_message,
+        }
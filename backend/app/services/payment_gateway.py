@@ -0,0 +1,246 @@
+import asyncio
+import contextvars
+import httpx
+import stripe
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from app.core.metrics import record_external_error, track_external
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Payment providers are called from async route handlers, so nothing here
+# may block the event loop. Stripe's SDK is synchronous and runs on a
+# bounded pool of its own; Paystack is a handful of REST calls made with a
+# pooled async client. Each provider has a circuit breaker, so an outage
+# turns into fast 503s rather than requests piling up behind timeouts.
+
+# Stripe errors that mean Stripe (or the way to it) is unhealthy, as opposed
+# to a declined card or a bad request
+STRIPE_OUTAGE_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.APIError,
+    stripe.error.RateLimitError,
+)
+
+
+class PaymentProviderUnavailable(Exception):
+    """A provider's circuit is open, its pool is saturated, or it timed out"""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider.title()} is temporarily unavailable ({reason}), please retry")
+        self.provider = provider
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After `threshold` failures in a row the circuit opens and calls are
+    rejected for `reset_seconds`. Then a single trial call is let through:
+    success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, threshold: int, reset_seconds: float):
+        self.name = name
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return "open"
+            return "half-open"
+
+    def before_call(self) -> None:
+        """Raise PaymentProviderUnavailable unless a call may go ahead"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at >= self.reset_seconds and not self._trial_running:
+                self._trial_running = True
+                return
+        raise PaymentProviderUnavailable(self.name, "circuit open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"{self.name} circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning(f"{self.name} circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+    def record_ignored(self) -> None:
+        """The call finished without telling us anything about the provider's health"""
+        with self._lock:
+            self._trial_running = False
+
+
+class StripeGateway:
+    """Runs Stripe SDK calls on a bounded thread pool"""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            "stripe", settings.PAYMENT_BREAKER_THRESHOLD, settings.PAYMENT_BREAKER_RESET_SECONDS
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.STRIPE_MAX_CONCURRENCY, thread_name_prefix="stripe"
+        )
+        # Slots cap running + queued calls; once exhausted callers get a 503
+        self._slots = threading.BoundedSemaphore(settings.STRIPE_MAX_CONCURRENCY + settings.STRIPE_MAX_QUEUE)
+
+    async def call(self, operation: str, fn: Callable, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the Stripe pool and await its result
+
+        Each HTTP request fn makes is bounded by STRIPE_TIMEOUT (set on the
+        SDK's client). A call still queued after STRIPE_TIMEOUT is dropped
+        before it reaches Stripe, since its caller would rather retry than
+        have a payment go through late.
+
+        Raises:
+            PaymentProviderUnavailable: circuit open, pool saturated or queued too long
+        """
+        self.breaker.before_call()
+        if not self._slots.acquire(blocking=False):
+            self.breaker.record_ignored()
+            record_external_error("stripe", operation, "saturated")
+            raise PaymentProviderUnavailable("stripe", "too many requests in flight")
+
+        submitted = time.monotonic()
+        # Carry the request's trace into the pool thread
+        ctx = contextvars.copy_context()
+
+        def run():
+            if time.monotonic() - submitted > settings.STRIPE_TIMEOUT:
+                record_external_error("stripe", operation, "queue_timeout")
+                raise PaymentProviderUnavailable("stripe", "queued too long")
+            return ctx.run(fn, *args, **kwargs)
+
+        try:
+            future = self._executor.submit(run)
+        except BaseException:
+            self._slots.release()
+            self.breaker.record_ignored()
+            raise
+        # Release on completion rather than on await so a cancelled request
+        # can't free a slot while its call is still running
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = await asyncio.wrap_future(future)
+        except PaymentProviderUnavailable:
+            self.breaker.record_ignored()
+            raise
+        except STRIPE_OUTAGE_ERRORS:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.record_ignored()
+            raise
+        self.breaker.record_success()
+        return result
+
+
+class PaystackGateway:
+    """Paystack's REST API over a pooled async HTTP client"""
+
+    base_url = "https://api.paystack.co"
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            "paystack", settings.PAYMENT_BREAKER_THRESHOLD, settings.PAYMENT_BREAKER_RESET_SECONDS
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use, inside the server's event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}"},
+                timeout=settings.PAYSTACK_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.PAYSTACK_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PAYSTACK_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def create_customer(self, email: str, first_name: str, last_name: str) -> Dict:
+        """POST /customer"""
+        return await self._request("customer.create", "POST", "/customer", json={
+            "email": email, "first_name": first_name, "last_name": last_name,
+        })
+
+    async def initialize_transaction(self, email: str, amount: int, currency: str, metadata: Dict) -> Dict:
+        """POST /transaction/initialize (amount in the currency's subunit, e.g. kobo)"""
+        return await self._request("transaction.initialize", "POST", "/transaction/initialize", json={
+            "email": email, "amount": amount, "currency": currency, "metadata": metadata,
+        })
+
+    async def verify_transaction(self, reference: str) -> Dict:
+        """GET /transaction/verify/{reference}"""
+        return await self._request("transaction.verify", "GET", f"/transaction/verify/{reference}")
+
+    async def _request(self, operation: str, method: str, path: str, **kwargs) -> Dict:
+        """
+        Call Paystack and return its JSON envelope ({"status": bool, "message", "data"})
+
+        A 4xx comes back as an envelope with status false, as from the SDK;
+        timeouts, connection errors and 5xx count against the circuit.
+        """
+        self.breaker.before_call()
+        try:
+            with track_external("paystack", operation):
+                response = await self.client.request(method, path, **kwargs)
+        except httpx.TimeoutException:
+            self.breaker.record_failure()
+            raise PaymentProviderUnavailable("paystack", "timed out")
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.record_ignored()
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            record_external_error("paystack", operation, str(response.status_code))
+            raise PaymentProviderUnavailable("paystack", f"HTTP {response.status_code}")
+        self.breaker.record_success()
+        try:
+            return response.json()
+        except ValueError:
+            return {"status": False, "message": response.text[:200], "data": None}
+
+
+# One gateway per provider per process
+stripe_gateway = StripeGateway()
+paystack_gateway = PaystackGateway()
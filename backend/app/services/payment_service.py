@@ -1,17 +1,34 @@
 import stripe
-from paystackapi.paystack import Paystack
-from paystackapi.transaction import Transaction
-from paystackapi.customer import Customer
 from app.core.config import settings
+from app.core.metrics import record_external_error, track_external
+from app.services.payment_gateway import PaymentProviderUnavailable, paystack_gateway, stripe_gateway
 from app.models.user import User, SubscriptionTier, PaymentProvider
 from typing import Dict, Optional
+from urllib.parse import urlsplit
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize payment providers
+
+class InstrumentedStripeClient(stripe.RequestsClient):
+    """Stripe's HTTP client, timing every API call (retries included) for /metrics"""
+
+    def request_with_retries(self, method, url, headers, post_data=None, *args, **kwargs):
+        # /v1/customers/cus_123 -> customers, to keep label values bounded
+        path = urlsplit(url).path.split("/")
+        operation = f"{method.lower()} {path[2] if len(path) > 2 else 'unknown'}"
+        with track_external("stripe", operation):
+            content, status_code, response_headers = super().request_with_retries(
+                method, url, headers, post_data, *args, **kwargs
+            )
+        if status_code >= 400:
+            record_external_error("stripe", operation, str(status_code))
+        return content, status_code, response_headers
+
+
+# Initialize payment providers (Paystack is called through paystack_gateway)
 stripe.api_key = settings.STRIPE_SECRET_KEY
-paystack = Paystack(secret_key=settings.PAYSTACK_SECRET_KEY)
+stripe.default_http_client = InstrumentedStripeClient(timeout=settings.STRIPE_TIMEOUT)
 
 
 class PaymentService:
@@ -57,64 +74,71 @@ class PaymentService:
     ) -> Dict:
         """Create a Stripe subscription"""
         try:
-            # Create or get Stripe customer
-            if not user.stripe_customer_id:
-                customer = stripe.Customer.create(
-                    email=user.email,
-                    name=user.full_name,
-                    payment_method=payment_method_id,
-                    invoice_settings={"default_payment_method": payment_method_id},
-                    metadata={
-                        "user_id": user.id,
-                        "country": user.country,
-                    }
-                )
-                user.stripe_customer_id = customer.id
-            else:
-                customer = stripe.Customer.retrieve(user.stripe_customer_id)
-                # Attach payment method
-                stripe.PaymentMethod.attach(
-                    payment_method_id,
-                    customer=customer.id,
-                )
-                stripe.Customer.modify(
-                    customer.id,
-                    invoice_settings={"default_payment_method": payment_method_id},
-                )
-
-            # Create price object if not exists (you should create these in Stripe Dashboard)
-            # For now, we'll create them dynamically
-            price_amount = self.stripe_prices[tier]
+            return await stripe_gateway.call(
+                "subscription.create", self._create_subscription_stripe, user, tier, payment_method_id
+            )
+        except stripe.error.StripeError as e:
+            logger.error(f"Stripe error: {str(e)}")
+            raise Exception(f"Payment failed: {str(e)}")
 
-            # Create subscription
-            subscription = stripe.Subscription.create(
+    def _create_subscription_stripe(
+        self, user: User, tier: SubscriptionTier, payment_method_id: str
+    ) -> Dict:
+        """The blocking SDK calls behind create_subscription_stripe; runs on the Stripe pool"""
+        # Create or get Stripe customer
+        if not user.stripe_customer_id:
+            customer = stripe.Customer.create(
+                email=user.email,
+                name=user.full_name,
+                payment_method=payment_method_id,
+                invoice_settings={"default_payment_method": payment_method_id},
+                metadata={
+                    "user_id": user.id,
+                    "country": user.country,
+                }
+            )
+            user.stripe_customer_id = customer.id
+        else:
+            customer = stripe.Customer.retrieve(user.stripe_customer_id)
+            # Attach payment method
+            stripe.PaymentMethod.attach(
+                payment_method_id,
                 customer=customer.id,
-                items=[{
-                    "price_data": {
-                        "currency": "usd",
-                        "product_data": {
-                            "name": f"Content Scout {tier.value.title()} Plan",
-                            "description": f"Monthly subscription to Content Scout {tier.value.title()} tier",
-                        },
-                        "unit_amount": price_amount,
-                        "recurring": {"interval": "month"},
-                    },
-                }],
-                payment_behavior="default_incomplete",
-                payment_settings={"save_default_payment_method": "on_subscription"},
-                expand=["latest_invoice.payment_intent"],
+            )
+            stripe.Customer.modify(
+                customer.id,
+                invoice_settings={"default_payment_method": payment_method_id},
             )
 
-            return {
-                "subscription_id": subscription.id,
-                "status": subscription.status,
-                "client_secret": subscription.latest_invoice.payment_intent.client_secret,
-                "current_period_end": subscription.current_period_end,
-            }
+        # Create price object if not exists (you should create these in Stripe Dashboard)
+        # For now, we'll create them dynamically
+        price_amount = self.stripe_prices[tier]
 
-        except stripe.error.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
-            raise Exception(f"Payment failed: {str(e)}")
+        # Create subscription
+        subscription = stripe.Subscription.create(
+            customer=customer.id,
+            items=[{
+                "price_data": {
+                    "currency": "usd",
+                    "product_data": {
+                        "name": f"Content Scout {tier.value.title()} Plan",
+                        "description": f"Monthly subscription to Content Scout {tier.value.title()} tier",
+                    },
+                    "unit_amount": price_amount,
+                    "recurring": {"interval": "month"},
+                },
+            }],
+            payment_behavior="default_incomplete",
+            payment_settings={"save_default_payment_method": "on_subscription"},
+            expand=["latest_invoice.payment_intent"],
+        )
+
+        return {
+            "subscription_id": subscription.id,
+            "status": subscription.status,
+            "client_secret": subscription.latest_invoice.payment_intent.client_secret,
+            "current_period_end": subscription.current_period_end,
+        }
 
     async def create_subscription_paystack(
         self, user: User, tier: SubscriptionTier, authorization_code: str = None
@@ -123,7 +147,7 @@ class PaymentService:
         try:
             # Create or get Paystack customer
             if not user.paystack_customer_code:
-                customer_response = Customer.create(
+                customer_response = await paystack_gateway.create_customer(
                     email=user.email,
                     first_name=user.full_name.split()[0] if user.full_name else "",
                     last_name=" ".join(user.full_name.split()[1:]) if len(user.full_name.split()) > 1 else "",
@@ -131,6 +155,7 @@ class PaymentService:
                 if customer_response["status"]:
                     user.paystack_customer_code = customer_response["data"]["customer_code"]
                 else:
+                    record_external_error("paystack", "customer.create", "status_false")
                     raise Exception("Failed to create Paystack customer")
 
             # For Paystack, we'll use the transaction flow
@@ -138,7 +163,7 @@ class PaymentService:
             price_amount = self.paystack_prices[tier]  # In kobo (Nigerian kobo)
 
             # Initialize transaction
-            transaction_response = Transaction.initialize(
+            transaction_response = await paystack_gateway.initialize_transaction(
                 email=user.email,
                 amount=price_amount,
                 currency="NGN",  # Nigerian Naira
@@ -156,8 +181,11 @@ class PaymentService:
                     "reference": transaction_response["data"]["reference"],
                 }
             else:
+                record_external_error("paystack", "transaction.initialize", "status_false")
                 raise Exception("Failed to initialize Paystack transaction")
 
+        except PaymentProviderUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Paystack error: {str(e)}")
             raise Exception(f"Payment failed: {str(e)}")
@@ -166,7 +194,7 @@ class PaymentService:
         """Cancel a Stripe subscription"""
         try:
             if user.subscription_id:
-                stripe.Subscription.delete(user.subscription_id)
+                await stripe_gateway.call("subscription.delete", stripe.Subscription.delete, user.subscription_id)
                 return True
             return False
         except stripe.error.StripeError as e:
@@ -186,10 +214,11 @@ class PaymentService:
     async def verify_paystack_transaction(self, reference: str) -> Dict:
         """Verify a Paystack transaction"""
         try:
-            response = Transaction.verify(reference=reference)
+            response = await paystack_gateway.verify_transaction(reference)
             if response["status"]:
                 return response["data"]
             else:
+                record_external_error("paystack", "transaction.verify", "status_false")
                 raise Exception("Transaction verification failed")
         except Exception as e:
             logger.error(f"Failed to verify Paystack transaction: {str(e)}")
@@ -0,0 +1,90 @@
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+
+DEFAULT_WORD_RANGE = "1200-1800"
+
+# Title, summary, headings and Markdown syntax on top of the body words
+OUTPUT_OVERHEAD_TOKENS = 400
+MIN_OUTPUT_TOKENS = 1024
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_RANGE_RE = re.compile(r"(\d[\d,]*)\s*(?:-|–|to)?\s*(\d[\d,]*)?")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Local token estimate for English prose and Markdown
+
+    Each word costs one token plus one per further 6 characters (long words
+    split into several BPE pieces), each punctuation mark one token, and
+    the total gets a 10% margin so the estimate errs high.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        tokens += 1 + (len(piece) - 1) // 6
+    return math.ceil(tokens * 1.1)
+
+
+def parse_word_range(value: Optional[str]) -> Tuple[int, int]:
+    """'2500-3000' -> (2500, 3000); a single number is used for both ends"""
+    match = _RANGE_RE.search(value or "") or _RANGE_RE.search(DEFAULT_WORD_RANGE)
+    low = int(match.group(1).replace(",", ""))
+    high = int((match.group(2) or match.group(1)).replace(",", ""))
+    return min(low, high), max(low, high)
+
+
+class PromptBudgetPlanner:
+    """Keeps prompts inside an input token budget and sizes the completion to the requested length"""
+
+    def __init__(self, input_budget: Optional[int] = None, output_cap: Optional[int] = None):
+        self.input_budget = input_budget or settings.PROMPT_INPUT_TOKEN_BUDGET
+        self.output_cap = output_cap or settings.GENERATION_MAX_OUTPUT_TOKENS
+
+    def truncate(self, text: Optional[str], max_tokens: int) -> Optional[str]:
+        """Cut text at a word boundary so it fits max_tokens"""
+        if not text or estimate_tokens(text) <= max_tokens:
+            return text
+        words = text.split()
+        # Binary search the longest word prefix that fits
+        low, high = 0, len(words)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if estimate_tokens(" ".join(words[:mid])) + 1 <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return " ".join(words[:low]) + " …"
+
+    def fit(
+        self, fixed_text: str, candidates: Iterable[Tuple[str, Any, str]]
+    ) -> Dict[str, List[Any]]:
+        """
+        Admit optional context items in priority order until the budget is spent
+
+        Args:
+            fixed_text: Everything that is always sent (instructions, format)
+            candidates: (section, value, rendered text) tuples, most important
+                first; an item that doesn't fit is skipped and smaller,
+                lower-priority items may still be admitted
+
+        Returns:
+            Mapping of section to the admitted values, in candidate order
+        """
+        remaining = self.input_budget - estimate_tokens(fixed_text)
+        admitted: Dict[str, List[Any]] = {}
+        for section, value, text in candidates:
+            cost = estimate_tokens(text) + 1  # Separator / newline
+            if cost <= remaining:
+                admitted.setdefault(section, []).append(value)
+                remaining -= cost
+        return admitted
+
+    def max_output_tokens(self, target_word_count: Optional[str]) -> int:
+        """Completion budget for the top of the requested word range"""
+        _, high = parse_word_range(target_word_count)
+        needed = math.ceil(high * settings.GENERATION_TOKENS_PER_WORD) + OUTPUT_OVERHEAD_TOKENS
+        return max(MIN_OUTPUT_TOKENS, min(needed, self.output_cap))
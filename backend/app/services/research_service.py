@@ -1,16 +1,40 @@
+import asyncio
 import httpx
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
-import json
+from collections import Counter
+from itertools import repeat
+from typing import Callable, List, Dict, Any, Mapping, Optional
+from app.core.config import settings
+from app.core.tracing import traced
+from app.services.keyword_scoring import KeywordScorer
+from app.services.topic_clustering import TopicClusterer
+from app.services.web_fetcher import FEED_TOPIC_RELEVANCE, WebFetcher
 import re
 
+# (sector, location, candidate terms) -> historical job count per term
+KeywordFrequencyLookup = Callable[[str, str, List[str]], Dict[str, int]]
+
+# (sector, location) -> precomputed research data, or None if there is no fresh snapshot
+SnapshotLookup = Callable[[str, str], Optional[Dict[str, Any]]]
+
 
 class ResearchService:
     """Service for conducting web research and keyword analysis"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        keyword_frequency_lookup: Optional[KeywordFrequencyLookup] = None,
+        keyword_weights: Optional[Mapping[str, float]] = None,
+        fetcher: Optional[WebFetcher] = None,
+        snapshot_lookup: Optional[SnapshotLookup] = None,
+    ):
         self.search_engines = []
+        self.keyword_frequency_lookup = keyword_frequency_lookup
+        self.keyword_scorer = KeywordScorer(keyword_weights)
+        self.fetcher = fetcher or WebFetcher()
+        self.topic_clusterer = TopicClusterer()
+        self.snapshot_lookup = snapshot_lookup
 
+    @traced("research.sector")
     async def research_sector(
         self, sector: str, location: str, additional_keywords: str = None
     ) -> Dict[str, Any]:
@@ -25,24 +49,68 @@ class ResearchService:
         Returns:
             Dictionary containing research data and trending keywords
         """
+        # Popular pairs are kept warm by the refresh_research_snapshots task.
+        # Additional keywords change the queries, so those jobs always run live.
+        if self.snapshot_lookup and not additional_keywords:
+            try:
+                snapshot = self.snapshot_lookup(sector, location)
+            except Exception as e:
+                print(f"Research snapshot lookup failed: {e}")
+                snapshot = None
+            if snapshot:
+                return {**snapshot, "sector": sector, "location": location}
+
         # Build search queries
         queries = self._build_search_queries(sector, location, additional_keywords)
 
         # Gather data from multiple sources
         trending_topics = []
-        keywords = set()
-
-        for query in queries:
-            try:
-                results = await self._search_web(query)
-                trending_topics.extend(results.get("topics", []))
-                keywords.update(results.get("keywords", []))
-            except Exception as e:
-                print(f"Error searching for '{query}': {e}")
-                continue
+        keyword_counts = Counter()  # Occurrences across all result sets
+        keyword_doc_freqs = Counter()  # Number of result sets containing the keyword
+        result_sets = 0
+
+        async with self.fetcher.client() as client:
+            # Every query is searched concurrently, then each distinct result
+            # page is fetched once, however many queries returned it
+            searches = await asyncio.gather(
+                *(self._search_web(client, query) for query in queries),
+                return_exceptions=True,
+            )
+
+            urls = []
+            for query, results in zip(queries, searches):
+                if isinstance(results, Exception):
+                    print(f"Error searching for '{query}': {results}")
+                    continue
+                # A headline shared by several queries is kept once
+                trending_topics.extend(
+                    topic for topic in results.get("topics", []) if topic.get("source") not in urls
+                )
+                found = results.get("keywords", [])
+                keyword_counts.update(found)
+                keyword_doc_freqs.update(set(found))
+                result_sets += 1
+                urls.extend(url for url in results.get("urls", []) if url not in urls)
+
+            # Each fetched page counts as one document for TF-IDF
+            for page in await self._fetch_pages(client, urls):
+                if not page["keywords"]:
+                    continue  # Failed or non-HTML fetch
+                trending_topics.extend(page["topics"])
+                keyword_counts.update(page["keywords"])
+                keyword_doc_freqs.update(page["keywords"].keys())
+                result_sets += 1
 
         # Analyze and rank keywords
-        ranked_keywords = self._rank_keywords(list(keywords), sector, location)
+        ranked_keywords = self._rank_keywords(
+            list(keyword_counts),
+            sector,
+            location,
+            limit=20,
+            term_counts=keyword_counts,
+            doc_freqs=keyword_doc_freqs,
+            n_docs=result_sets,
+        )
 
         # Extract trending topics
         top_topics = self._extract_top_topics(trending_topics, limit=5)
@@ -76,41 +144,54 @@ class ResearchService:
 
         return queries
 
-    async def _search_web(self, query: str) -> Dict[str, Any]:
+    async def _search_web(self, client: httpx.AsyncClient, query: str) -> Dict[str, Any]:
         """
-        Perform web search using available APIs or scraping
+        Search the web for a query
 
-        Note: In production, you would use Google Custom Search API,
-        Bing Search API, or similar services. This is a simplified version.
+        Returns feed headlines as topics, the query's own keywords, and the
+        result URLs to fetch. Falls back to the query alone if search fails,
+        so research never comes back empty.
         """
         topics = []
-        keywords = set()
+        keywords = set(self._extract_keywords_from_query(query))
+        urls = []
 
-        try:
-            # Simulate web search results
-            # In production, replace with actual API calls
-            async with httpx.AsyncClient() as client:
-                # Example: Search for blog posts, news articles
-                # For now, we'll use a simulated approach
-
-                # Extract keywords from query
-                query_keywords = self._extract_keywords_from_query(query)
-                keywords.update(query_keywords)
-
-                # Simulate finding trending topics
-                topics.append({
-                    "title": f"Latest trends in {query}",
-                    "relevance": 0.9
-                })
+        if settings.RESEARCH_FETCH_ENABLED:
+            try:
+                for result in await self.fetcher.search(client, query):
+                    urls.append(result["url"])
+                    if result["title"]:
+                        topics.append({
+                            "title": result["title"],
+                            "snippet": result["snippet"],
+                            "relevance": FEED_TOPIC_RELEVANCE,
+                            "source": result["url"],
+                        })
+            except Exception as e:
+                print(f"Search error: {e}")
 
-        except Exception as e:
-            print(f"Search error: {e}")
+        if not topics:
+            topics.append({
+                "title": f"Latest trends in {query}",
+                "relevance": 0.5
+            })
 
         return {
             "topics": topics,
-            "keywords": list(keywords)
+            "keywords": list(keywords),
+            "urls": urls,
         }
 
+    async def _fetch_pages(self, client: httpx.AsyncClient, urls: List[str]) -> List[Dict[str, Any]]:
+        """Fetch result pages and extract their topic and keyword candidates"""
+        if not urls:
+            return []
+        try:
+            return await self.fetcher.fetch_pages(client, urls)
+        except Exception as e:
+            print(f"Page fetch error: {e}")
+            return []
+
     def _extract_keywords_from_query(self, query: str) -> List[str]:
         """Extract potential keywords from search query"""
         # Remove common words
@@ -125,40 +206,47 @@ class ResearchService:
         return keywords
 
     def _rank_keywords(
-        self, keywords: List[str], sector: str, location: str
+        self,
+        keywords: List[str],
+        sector: str,
+        location: str,
+        limit: Optional[int] = None,
+        term_counts: Optional[Mapping[str, int]] = None,
+        doc_freqs: Optional[Mapping[str, int]] = None,
+        n_docs: Optional[int] = None,
     ) -> List[str]:
         """Rank keywords by relevance and potential"""
-        # Simple ranking based on length and uniqueness
-        # In production, use actual search volume and competition data
-
-        scored_keywords = []
-        for keyword in keywords:
-            score = 0
-
-            # Longer keywords often more specific
-            if len(keyword) > 8:
-                score += 2
-
-            # Keywords containing sector or location
-            if sector.lower() in keyword.lower():
-                score += 3
-            if location.lower() in keyword.lower():
-                score += 2
+        # Features (TF-IDF, sector/location affinity, length, historical
+        # frequency from the keyword index) are scored as arrays in one pass
 
-            scored_keywords.append((keyword, score))
-
-        # Sort by score descending
-        scored_keywords.sort(key=lambda x: x[1], reverse=True)
-
-        return [kw for kw, score in scored_keywords]
+        history = {}
+        if self.keyword_frequency_lookup and keywords:
+            try:
+                history = self.keyword_frequency_lookup(sector, location, keywords)
+            except Exception as e:
+                print(f"Keyword frequency lookup failed: {e}")
+
+        return self.keyword_scorer.rank(
+            keywords,
+            sector,
+            location,
+            limit=limit,
+            term_counts=list(map(term_counts.get, keywords, repeat(1))) if term_counts else None,
+            doc_freqs=list(map(doc_freqs.get, keywords, repeat(1))) if doc_freqs else None,
+            n_docs=n_docs,
+            history=history,
+        )
 
     def _extract_top_topics(
         self, topics: List[Dict[str, Any]], limit: int = 5
     ) -> List[Dict[str, Any]]:
         """Extract and rank top trending topics"""
-        # Sort by relevance if available
+        # Near-duplicates (one story syndicated across outlets) collapse into
+        # their best member, boosted by how many outlets carried it
+        clustered = self.topic_clusterer.cluster(topics)
+
         sorted_topics = sorted(
-            topics,
+            clustered,
             key=lambda x: x.get("relevance", 0),
             reverse=True
         )
@@ -0,0 +1,135 @@
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.models.research_job import ResearchJob
+from app.models.research_snapshot import ResearchSnapshot
+from app.services.keyword_index_service import normalize_term
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+
+class ResearchSnapshotService:
+    """Service storing and serving precomputed research for popular sector/location pairs"""
+
+    @staticmethod
+    def max_age(sector: str) -> timedelta:
+        """Staleness bound for a sector (per-sector override, else the default)"""
+        overrides = {
+            normalize_term(name): hours
+            for name, hours in settings.RESEARCH_SNAPSHOT_SECTOR_MAX_AGE_HOURS.items()
+        }
+        hours = overrides.get(normalize_term(sector), settings.RESEARCH_SNAPSHOT_MAX_AGE_HOURS)
+        return timedelta(hours=hours)
+
+    def popular_scopes(self, db: Session, limit: int, days: int) -> List[Dict[str, Any]]:
+        """
+        Most requested sector/location pairs over the last `days`
+
+        Returns:
+            [{"sector", "location", "job_count"}], most popular first. Sector
+            and location are as typed by the most recent requester.
+        """
+        sector = func.lower(func.trim(ResearchJob.sector))
+        location = func.lower(func.trim(ResearchJob.location))
+        job_count = func.count(ResearchJob.id).label("job_count")
+
+        rows = db.execute(
+            select(sector, location, job_count, func.max(ResearchJob.id))
+            .filter(ResearchJob.created_at >= datetime.utcnow() - timedelta(days=days))
+            .group_by(sector, location)
+            .order_by(job_count.desc())
+            .limit(limit)
+        ).all()
+
+        if not rows:
+            return []
+        display = {
+            job_id: (sector_text, location_text)
+            for job_id, sector_text, location_text in db.execute(
+                select(ResearchJob.id, ResearchJob.sector, ResearchJob.location)
+                .filter(ResearchJob.id.in_([row[3] for row in rows]))
+            ).all()
+        }
+        return [
+            {
+                "sector": display[job_id][0].strip(),
+                "location": display[job_id][1].strip(),
+                "job_count": count,
+            }
+            for _, _, count, job_id in rows
+        ]
+
+    def latest(self, db: Session, sector: str, location: str) -> Optional[ResearchSnapshot]:
+        """Newest snapshot for a pair, regardless of age"""
+        return db.execute(
+            select(ResearchSnapshot)
+            .filter(
+                ResearchSnapshot.sector == normalize_term(sector),
+                ResearchSnapshot.location == normalize_term(location),
+            )
+            .order_by(ResearchSnapshot.version.desc())
+            .limit(1)
+        ).scalars().first()
+
+    def fresh(self, db: Session, sector: str, location: str) -> Optional[Dict[str, Any]]:
+        """
+        Research data from the newest snapshot within the sector's staleness bound
+
+        Returns None when there is no snapshot or it is too old.
+        """
+        snapshot = self.latest(db, sector, location)
+        if snapshot is None or not self._within(snapshot, self.max_age(sector)):
+            record_cache("research_snapshot", False)
+            return None
+        record_cache("research_snapshot", True)
+        return {**snapshot.research_data, "snapshot_version": snapshot.version}
+
+    def needs_refresh(self, db: Session, sector: str, location: str) -> bool:
+        """True once the newest snapshot has used half its staleness bound"""
+        snapshot = self.latest(db, sector, location)
+        return snapshot is None or not self._within(snapshot, self.max_age(sector) / 2)
+
+    def store(
+        self, db: Session, sector: str, location: str, research_data: Dict[str, Any], job_count: int
+    ) -> ResearchSnapshot:
+        """
+        Save a new snapshot version and prune old ones (sync - used by Celery tasks)
+
+        The caller commits.
+        """
+        sector_key = normalize_term(sector)
+        location_key = normalize_term(location)
+        current = db.execute(
+            select(func.max(ResearchSnapshot.version)).filter(
+                ResearchSnapshot.sector == sector_key,
+                ResearchSnapshot.location == location_key,
+            )
+        ).scalar() or 0
+
+        snapshot = ResearchSnapshot(
+            sector=sector_key,
+            location=location_key,
+            version=current + 1,
+            research_data=research_data,
+            job_count=job_count,
+            refreshed_at=datetime.utcnow(),
+        )
+        db.add(snapshot)
+        db.flush()
+
+        keep_from = snapshot.version - settings.RESEARCH_SNAPSHOT_KEEP_VERSIONS + 1
+        db.query(ResearchSnapshot).filter(
+            ResearchSnapshot.sector == sector_key,
+            ResearchSnapshot.location == location_key,
+            ResearchSnapshot.version < keep_from,
+        ).delete(synchronize_session=False)
+
+        return snapshot
+
+    @staticmethod
+    def _within(snapshot: ResearchSnapshot, max_age: timedelta) -> bool:
+        refreshed_at = snapshot.refreshed_at
+        if refreshed_at.tzinfo is not None:
+            refreshed_at = refreshed_at.replace(tzinfo=None) - (refreshed_at.utcoffset() or timedelta())
+        return datetime.utcnow() - refreshed_at < max_age
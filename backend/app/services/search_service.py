@@ -0,0 +1,246 @@
+from sqlalchemy import and_, func, literal, null, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Blog
+from typing import Any, Dict, List, Tuple
+import html
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# The database marks matches with these control characters; the snippet is
+# HTML-escaped in Python and only then are they swapped for the tags above,
+# so markup in a blog's content is never returned as HTML
+_SENTINEL_START = "\x02"
+_SENTINEL_STOP = "\x03"
+
+# SQLite (local development / tests): external-content FTS5 table kept in
+# sync by triggers
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5(
+        title, summary, content,
+        content='blogs', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs BEGIN
+        INSERT INTO blogs_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, summary, content ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO blogs_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+]
+
+
+def install_search_index(connection: Connection) -> None:
+    """
+    Create the SQLite full-text index (idempotent)
+
+    On Postgres the search_vector column and GIN index come from
+    migrations/add_blog_search.sql; adding them here would lock the blogs
+    table on every API start.
+    """
+    if connection.dialect.name == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'blogs_fts'")
+        ).first()
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            # Index rows written before the FTS table existed
+            connection.execute(text("INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')"))
+
+
+class BlogSearchService:
+    """Service for ranked full-text search over a user's blogs"""
+
+    async def search(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        query: str,
+        page: int = 1,
+        page_size: int = 10,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Search a user's blogs
+
+        Args:
+            db: Database session
+            user_id: Owner of the blogs to search
+            query: Free-text search query
+            page: 1-based page number
+            page_size: Results per page
+
+        Returns:
+            Tuple of (results for the page, total number of matches)
+        """
+        dialect = db.bind.dialect.name
+        offset = (page - 1) * page_size
+
+        if dialect == "postgresql":
+            return await self._search_postgres(db, user_id, query, page_size, offset)
+        if dialect == "sqlite":
+            return await self._search_sqlite(db, user_id, query, page_size, offset)
+
+        return await self._search_unindexed(db, user_id, query, page_size, offset)
+
+    async def _search_postgres(
+        self, db: AsyncSession, user_id: int, query: str, limit: int, offset: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        params = {
+            "q": query,
+            "user_id": user_id,
+            "limit": limit,
+            "offset": offset,
+            "headline_options": (
+                f"StartSel={_SENTINEL_START}, StopSel={_SENTINEL_STOP}, "
+                "MaxFragments=2, MaxWords=30, MinWords=10"
+            ),
+        }
+
+        total = await db.scalar(
+            text("""
+                SELECT count(*) FROM blogs
+                WHERE user_id = :user_id
+                  AND search_vector @@ websearch_to_tsquery('english', :q)
+            """),
+            params,
+        )
+        if not total:
+            return [], 0
+
+        # Rank and paginate first, then build headlines for the page only -
+        # ts_headline re-parses the document and is the expensive part
+        result = await db.execute(
+            text("""
+                WITH q AS (SELECT websearch_to_tsquery('english', :q) AS query),
+                hits AS (
+                    SELECT b.id, b.title, b.summary, b.content, b.word_count,
+                           b.created_at, ts_rank_cd(b.search_vector, q.query) AS rank
+                    FROM blogs b, q
+                    WHERE b.user_id = :user_id AND b.search_vector @@ q.query
+                    ORDER BY rank DESC, b.created_at DESC
+                    LIMIT :limit OFFSET :offset
+                )
+                SELECT hits.id, hits.title, hits.summary, hits.word_count,
+                       hits.created_at, hits.rank,
+                       ts_headline('english', hits.content, q.query, :headline_options) AS snippet
+                FROM hits, q
+                ORDER BY hits.rank DESC, hits.created_at DESC
+            """),
+            params,
+        )
+        return [self._with_safe_snippet(row) for row in result.mappings()], total
+
+    async def _search_sqlite(
+        self, db: AsyncSession, user_id: int, query: str, limit: int, offset: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        match = self._to_fts5_query(query)
+        if not match:
+            return [], 0
+
+        params = {
+            "q": match,
+            "user_id": user_id,
+            "limit": limit,
+            "offset": offset,
+            "start": _SENTINEL_START,
+            "stop": _SENTINEL_STOP,
+        }
+
+        total = await db.scalar(
+            text("""
+                SELECT count(*) FROM blogs_fts
+                JOIN blogs b ON b.id = blogs_fts.rowid
+                WHERE blogs_fts MATCH :q AND b.user_id = :user_id
+            """),
+            params,
+        )
+        if not total:
+            return [], 0
+
+        # bm25 weights mirror the Postgres A/B/C weights; lower is better
+        result = await db.execute(
+            text("""
+                SELECT b.id, b.title, b.summary, b.word_count, b.created_at,
+                       -bm25(blogs_fts, 10.0, 4.0, 1.0) AS rank,
+                       snippet(blogs_fts, 2, :start, :stop, '...', 24) AS snippet
+                FROM blogs_fts
+                JOIN blogs b ON b.id = blogs_fts.rowid
+                WHERE blogs_fts MATCH :q AND b.user_id = :user_id
+                ORDER BY rank DESC, b.created_at DESC
+                LIMIT :limit OFFSET :offset
+            """),
+            params,
+        )
+        return [self._with_safe_snippet(row) for row in result.mappings()], total
+
+    async def _search_unindexed(
+        self, db: AsyncSession, user_id: int, query: str, limit: int, offset: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Unranked substring match for databases without a full-text index"""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return [], 0
+
+        matches = and_(
+            Blog.user_id == user_id,
+            *(
+                or_(
+                    Blog.title.icontains(term, autoescape=True),
+                    Blog.summary.icontains(term, autoescape=True),
+                    Blog.content.icontains(term, autoescape=True),
+                )
+                for term in terms
+            ),
+        )
+        total = await db.scalar(select(func.count(Blog.id)).where(matches))
+        if not total:
+            return [], 0
+
+        result = await db.execute(
+            select(
+                Blog.id, Blog.title, Blog.summary, Blog.word_count, Blog.created_at,
+                literal(0.0).label("rank"), null().label("snippet"),
+            )
+            .where(matches)
+            .order_by(Blog.created_at.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [dict(row) for row in result.mappings()], total
+
+    def _with_safe_snippet(self, row) -> Dict[str, Any]:
+        """Row as a dict, its snippet HTML-escaped apart from the <mark> highlights"""
+        result = dict(row)
+        if result.get("snippet") is not None:
+            result["snippet"] = (
+                html.escape(result["snippet"])
+                .replace(_SENTINEL_START, HIGHLIGHT_START)
+                .replace(_SENTINEL_STOP, HIGHLIGHT_STOP)
+            )
+        return result
+
+    def _to_fts5_query(self, query: str) -> str:
+        """Quote each term so user input can't inject FTS5 query syntax"""
+        terms = re.findall(r"\w+", query)
+        return " ".join(f'"{term}"' for term in terms)
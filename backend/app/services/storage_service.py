@@ -8,6 +8,7 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER
 from app.core.config import settings
+from app.core.tracing import traced
 from slugify import slugify
 import logging
 
@@ -32,6 +33,7 @@ class StorageService:
         slug = slugify(title)[:50]  # Limit length
         return f"{blog_id}_{slug}.{extension}"
 
+    @traced("storage.save_markdown")
     async def save_markdown(
         self, user_id: int, blog_id: int, title: str, content: str
     ) -> str:
@@ -55,6 +57,7 @@ class StorageService:
             logger.error(f"Failed to save Markdown file: {str(e)}")
             raise
 
+    @traced("storage.save_pdf")
     async def save_pdf(
         self,
         user_id: int,
@@ -0,0 +1,234 @@
+import json
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, SubscriptionTier, WebhookEvent, WebhookEventStatus
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROVIDER = "stripe"
+
+# Event types we act on; anything else is acknowledged without being stored
+HANDLED_EVENTS = {
+    "invoice.payment_succeeded",
+    "invoice.payment_failed",
+    "customer.subscription.deleted",
+}
+
+# Events that set a subscription's status. An older one is superseded by a
+# newer one for the same subscription, since both write the same field.
+# customer.subscription.deleted is final and is always applied.
+STATUS_EVENTS = {
+    "invoice.payment_succeeded",
+    "invoice.payment_failed",
+}
+
+
+def _insert_ignoring_duplicates(dialect: str, values: Dict):
+    """INSERT that silently skips an event already recorded"""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(WebhookEvent).values(**values)
+    return dialect_insert(WebhookEvent).values(**values).on_conflict_do_nothing(
+        index_elements=["provider", "event_id"]
+    )
+
+
+def _customer_filter(customer_id: Optional[str]):
+    if customer_id is None:
+        return WebhookEvent.customer_id.is_(None)
+    return WebhookEvent.customer_id == customer_id
+
+
+class StripeWebhookService:
+    """Service recording Stripe webhook events and applying them in order"""
+
+    @staticmethod
+    def customer_id(event) -> Optional[str]:
+        """The Stripe customer an event belongs to"""
+        obj = event["data"]["object"]
+        if obj.get("object") == "customer":
+            return obj.get("id")
+        return obj.get("customer")
+
+    @staticmethod
+    def subscription_id(event) -> Optional[str]:
+        """The Stripe subscription an event changes, if any"""
+        obj = event["data"]["object"]
+        if obj.get("object") == "subscription":
+            return obj.get("id")
+        if obj.get("subscription"):
+            return obj["subscription"]
+        # Newer API versions moved an invoice's subscription under parent
+        details = (obj.get("parent") or {}).get("subscription_details") or {}
+        return details.get("subscription")
+
+    async def record(self, db: AsyncSession, event, payload: bytes) -> bool:
+        """
+        Store a verified event for process_stripe_webhooks
+
+        Args:
+            db: Database session (committed here)
+            event: Event returned by PaymentService.construct_stripe_webhook_event
+            payload: Raw request body, stored as received
+
+        Returns:
+            False if the event had been recorded before (a redelivery)
+        """
+        statement = _insert_ignoring_duplicates(db.bind.dialect.name, {
+            "provider": PROVIDER,
+            "event_id": event["id"],
+            "event_type": event["type"],
+            "customer_id": self.customer_id(event),
+            "subscription_id": self.subscription_id(event),
+            "event_created": event["created"],
+            "payload": payload.decode("utf-8"),
+        })
+        try:
+            result = await db.execute(statement)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return False
+        return result.rowcount == 1
+
+    def process_customer(self, db: Session, customer_id: Optional[str]) -> Dict[str, int]:
+        """
+        Apply a customer's pending events, oldest first
+
+        The pending rows are locked (FOR UPDATE) until the commit, so a
+        second task for the same customer waits and then finds them done.
+        Stripe doesn't deliver in order, so a status event (STATUS_EVENTS)
+        created before a status change already applied to the same
+        subscription is superseded rather than applied. Deletions are
+        always applied, and events for other subscriptions don't interfere.
+
+        Returns:
+            Counts of events processed, superseded and failed
+        """
+        events: List[WebhookEvent] = (
+            db.query(WebhookEvent)
+            .filter(
+                WebhookEvent.provider == PROVIDER,
+                _customer_filter(customer_id),
+                WebhookEvent.status == WebhookEventStatus.PENDING,
+            )
+            .order_by(WebhookEvent.event_created, WebhookEvent.id)
+            .with_for_update()
+            .all()
+        )
+        counts = {"processed": 0, "superseded": 0, "failed": 0}
+        if not events:
+            return counts
+
+        # Latest status change applied per subscription; a deletion counts,
+        # so a stale payment event can't reactivate a canceled subscription
+        subscription_ids = {event.subscription_id for event in events if event.subscription_id is not None}
+        latest: Dict[str, int] = dict(
+            db.query(WebhookEvent.subscription_id, func.max(WebhookEvent.event_created))
+            .filter(
+                WebhookEvent.provider == PROVIDER,
+                _customer_filter(customer_id),
+                WebhookEvent.subscription_id.in_(list(subscription_ids)),
+                WebhookEvent.event_type.in_(STATUS_EVENTS | {"customer.subscription.deleted"}),
+                WebhookEvent.status == WebhookEventStatus.PROCESSED,
+            )
+            .group_by(WebhookEvent.subscription_id)
+            .all()
+        )
+        for event in events:
+            event.processed_at = datetime.utcnow()
+            if self._superseded(event, latest):
+                event.status = WebhookEventStatus.SUPERSEDED
+                counts["superseded"] += 1
+                continue
+            try:
+                with db.begin_nested():
+                    self._apply(db, json.loads(event.payload))
+            except Exception as e:
+                event.status = WebhookEventStatus.FAILED
+                event.last_error = f"{type(e).__name__}: {e}"[:1000]
+                counts["failed"] += 1
+                logger.error(f"Failed to process Stripe event {event.event_id} ({event.event_type}): {str(e)}")
+                continue
+            event.status = WebhookEventStatus.PROCESSED
+            if event.subscription_id is not None:
+                latest[event.subscription_id] = max(latest.get(event.subscription_id, 0), event.event_created)
+            counts["processed"] += 1
+
+        db.commit()
+        return counts
+
+    @staticmethod
+    def _superseded(event: WebhookEvent, latest: Dict[str, int]) -> bool:
+        """True if a newer status change has already been applied to the event's subscription"""
+        if event.event_type not in STATUS_EVENTS or event.subscription_id is None:
+            return False
+        applied = latest.get(event.subscription_id)
+        return applied is not None and event.event_created < applied
+
+    def stranded_customers(self, db: Session, older_than_seconds: int) -> List[Optional[str]]:
+        """Customers with events still pending after older_than_seconds (e.g. the broker was down)"""
+        cutoff = datetime.utcnow() - timedelta(seconds=older_than_seconds)
+        rows = (
+            db.query(WebhookEvent.customer_id)
+            .filter(
+                WebhookEvent.provider == PROVIDER,
+                WebhookEvent.status == WebhookEventStatus.PENDING,
+                WebhookEvent.received_at < cutoff,
+            )
+            .distinct()
+            .all()
+        )
+        return [row.customer_id for row in rows]
+
+    def purge(self, db: Session, days: int) -> int:
+        """
+        Delete handled events older than `days`; failed ones are kept for inspection
+
+        A purged event is no longer deduplicated, so keep them longer than
+        Stripe keeps retrying (3 days).
+        """
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        deleted = (
+            db.query(WebhookEvent)
+            .filter(
+                WebhookEvent.status.in_([WebhookEventStatus.PROCESSED, WebhookEventStatus.SUPERSEDED]),
+                WebhookEvent.received_at < cutoff,
+            )
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    def _apply(self, db: Session, event: Dict) -> None:
+        """Update the user an event refers to"""
+        obj = event["data"]["object"]
+
+        if event["type"] == "invoice.payment_succeeded":
+            # Payment successful, ensure subscription is active
+            user = db.query(User).filter(User.stripe_customer_id == obj["customer"]).first()
+            if user:
+                user.subscription_status = "active"
+                logger.info(f"Subscription payment succeeded for user {user.id}")
+
+        elif event["type"] == "invoice.payment_failed":
+            user = db.query(User).filter(User.stripe_customer_id == obj["customer"]).first()
+            if user:
+                user.subscription_status = "past_due"
+                logger.warning(f"Subscription payment failed for user {user.id}")
+
+        elif event["type"] == "customer.subscription.deleted":
+            user = db.query(User).filter(User.subscription_id == obj["id"]).first()
+            if user:
+                user.subscription_tier = SubscriptionTier.FREE
+                user.subscription_status = "canceled"
+                user.subscription_id = None
+                logger.info(f"Subscription canceled for user {user.id}")
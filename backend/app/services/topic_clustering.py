@@ -0,0 +1,129 @@
+import math
+import re
+import zlib
+import numpy as np
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+# 64 hashes in 16 bands of 4 rows: pairs with Jaccard similarity around 0.5
+# and above become candidates, and candidates are then verified against
+# SIMILARITY_THRESHOLD using the full signatures.
+NUM_HASHES = 64
+BANDS = 16
+SIMILARITY_THRESHOLD = 0.5
+SHINGLE_CHARS = 4
+
+# Relevance of a cluster: best member's relevance scaled by 1 + ln(size)
+CLUSTER_SIZE_WEIGHT = 1.0
+
+# Universal hashing (a*x + b) mod p with p = 2^31 - 1: shingle hashes are
+# reduced below p, so a*x + b < 2^62 never overflows uint64 and the modulo
+# actually permutes (a larger p with small a would barely wrap)
+_PRIME = (1 << 31) - 1
+_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+# Headline suffixes such as " - Outlet Name" or " | Outlet" differ between
+# syndicated copies; drop the last segment when there's a clear separator
+_OUTLET_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,40}$")
+
+
+def _shingles(text: str) -> np.ndarray:
+    """Hashes (below _PRIME) of the character shingles of normalized text"""
+    text = _NORMALIZE_RE.sub(" ", _OUTLET_SUFFIX_RE.sub("", text).lower()).strip()
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    if len(text) <= SHINGLE_CHARS:
+        grams = {text}
+    else:
+        grams = {text[i:i + SHINGLE_CHARS] for i in range(len(text) - SHINGLE_CHARS + 1)}
+    return np.fromiter(
+        (zlib.crc32(gram.encode()) % _PRIME for gram in grams), dtype=np.uint64, count=len(grams)
+    )
+
+
+class TopicClusterer:
+    """
+    Groups near-duplicate topics (the same story syndicated across outlets)
+
+    Titles and, where present, snippets each get a MinHash signature.
+    Signatures are bucketed band by band (LSH), so only topics sharing a
+    band are compared and the whole pass stays roughly linear.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, seed: int = 1):
+        self.threshold = threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=NUM_HASHES, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=NUM_HASHES, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text, or None if it has no shingles"""
+        shingles = _shingles(text)
+        if shingles.size == 0:
+            return None
+        hashes = (self._a[:, None] * shingles[None, :] + self._b[:, None]) % np.uint64(_PRIME)
+        return hashes.min(axis=1)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(first == second))
+
+    def cluster(self, topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapse near-duplicate topics
+
+        Returns one topic per cluster: the most relevant member, with
+        "cluster_size" set and its relevance boosted by the cluster size.
+        Order follows each cluster's first member.
+        """
+        if len(topics) < 2:
+            return [{**topic, "cluster_size": 1} for topic in topics]
+
+        fields = ("title", "snippet")
+        signatures = {
+            field: [self.signature(topic.get(field) or "") for topic in topics] for field in fields
+        }
+
+        parent = list(range(len(topics)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows = NUM_HASHES // BANDS
+        for field in fields:
+            buckets = defaultdict(list)
+            for i, sig in enumerate(signatures[field]):
+                if sig is None:
+                    continue
+                for band in range(BANDS):
+                    buckets[(band, sig[band * rows:(band + 1) * rows].tobytes())].append(i)
+
+            # Buckets are tiny (a handful of syndicated copies), so members are
+            # verified pairwise within each bucket
+            for members in buckets.values():
+                for position, other in enumerate(members[1:], start=1):
+                    for first in members[:position]:
+                        if find(first) == find(other):
+                            break
+                        if self.similarity(signatures[field][first], signatures[field][other]) >= self.threshold:
+                            parent[find(other)] = find(first)
+                            break
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(topics)):
+            clusters.setdefault(find(i), []).append(i)
+
+        representatives = []
+        for members in clusters.values():
+            best = max(members, key=lambda i: (topics[i].get("relevance", 0), -i))
+            topic = dict(topics[best])
+            topic["cluster_size"] = len(members)
+            topic["relevance"] = topic.get("relevance", 0) * (
+                1 + CLUSTER_SIZE_WEIGHT * math.log(len(members))
+            )
+            representatives.append(topic)
+        return representatives
@@ -0,0 +1,203 @@
+import httpx
+from app.core.config import settings
+from app.core.tracing import traced
+from app.services.fetch_scheduler import (
+    HostScheduler,
+    HostThrottled,
+    RobotsCache,
+    TokenBucket,
+    host_of,
+    parse_retry_after,
+)
+from app.services.html_extraction import PageExtractor
+from collections import Counter
+from lxml import etree
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import quote_plus
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "ContentScoutBot/1.0 (+https://contentscout.com/bot)"
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+THROTTLE_STATUSES = {429, 503}
+
+# Search feed item titles are headlines; ranked just below a page's own <title>
+FEED_TOPIC_RELEVANCE = 0.85
+
+_FEED_PARSER = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+
+MAX_SNIPPET_CHARS = 300
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+# Politeness state is per worker process so it carries over between jobs
+_host_buckets: Dict[str, TokenBucket] = {}
+_robots_cache: Optional[RobotsCache] = None
+
+
+def _get_robots_cache() -> RobotsCache:
+    global _robots_cache
+    if _robots_cache is None:
+        _robots_cache = RobotsCache(USER_AGENT, settings.RESEARCH_ROBOTS_TTL)
+    return _robots_cache
+
+
+def _clean_snippet(description: str) -> str:
+    """Feed item description as plain text (some feeds embed HTML)"""
+    return _SPACE_RE.sub(" ", _TAG_RE.sub(" ", description)).strip()[:MAX_SNIPPET_CHARS]
+
+
+def _new_host_bucket() -> TokenBucket:
+    return TokenBucket(settings.RESEARCH_HOST_RATE, settings.RESEARCH_HOST_BURST)
+
+
+class WebFetcher:
+    """
+    Fetches search results and streams result pages through the HTML extractor
+
+    Pass an httpx transport (e.g. httpx.MockTransport serving saved fixtures)
+    to run the whole pipeline offline.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        search_url: Optional[str] = None,
+        results_per_query: Optional[int] = None,
+        max_page_bytes: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        scheduler: Optional[HostScheduler] = None,
+        robots: Optional[RobotsCache] = None,
+    ):
+        self.transport = transport
+        self.search_url = search_url or settings.RESEARCH_SEARCH_URL
+        self.results_per_query = results_per_query or settings.RESEARCH_RESULTS_PER_QUERY
+        self.max_page_bytes = max_page_bytes or settings.RESEARCH_MAX_PAGE_BYTES
+        self.concurrency = concurrency or settings.RESEARCH_FETCH_CONCURRENCY
+        self.timeout = timeout or settings.RESEARCH_FETCH_TIMEOUT
+        self.scheduler = scheduler or HostScheduler(
+            buckets=_host_buckets,
+            bucket_factory=_new_host_bucket,
+            max_in_flight=self.concurrency,
+            per_host=settings.RESEARCH_HOST_CONCURRENCY,
+            max_host_failures=settings.RESEARCH_HOST_MAX_FAILURES,
+        )
+        self.robots = robots or _get_robots_cache()
+
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client shared by every request of one research run"""
+        return httpx.AsyncClient(
+            transport=self.transport,
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=self.concurrency),
+        )
+
+    @traced("research.search")
+    async def search(self, client: httpx.AsyncClient, query: str) -> List[Dict[str, str]]:
+        """
+        Look up result pages for a query via the configured RSS search feed
+
+        Returns:
+            List of {"title", "url", "snippet"} for the top results
+        """
+        response = await client.get(self.search_url.format(query=quote_plus(query)))
+        response.raise_for_status()
+
+        root = etree.fromstring(response.content, parser=_FEED_PARSER)
+        if root is None:
+            return []
+
+        results = []
+        for item in root.iter("item"):
+            url = (item.findtext("link") or "").strip()
+            if url.startswith(("http://", "https://")):
+                results.append({
+                    "title": (item.findtext("title") or "").strip(),
+                    "url": url,
+                    "snippet": _clean_snippet(item.findtext("description") or ""),
+                })
+            if len(results) >= self.results_per_query:
+                break
+        return results
+
+    async def extract(self, client: httpx.AsyncClient, url: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a page and yield topic/keyword candidates as they are parsed
+
+        Reading stops after max_page_bytes; non-HTML responses yield nothing.
+        """
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").lower()
+            if content_type and not content_type.startswith(HTML_CONTENT_TYPES):
+                return
+
+            extractor = PageExtractor(source=url)
+            received = 0
+            async for chunk in response.aiter_bytes():
+                chunk = chunk[:self.max_page_bytes - received]
+                received += len(chunk)
+                for candidate in extractor.feed(chunk):
+                    yield candidate
+                if received >= self.max_page_bytes:
+                    break
+            for candidate in extractor.close():
+                yield candidate
+
+    @traced("research.fetch_page")
+    async def fetch_page(self, client: httpx.AsyncClient, url: str) -> Dict[str, Any]:
+        """
+        Collect a page's candidates
+
+        Returns:
+            {"url", "topics": [...], "keywords": Counter of term occurrences};
+            empty if the page returned an error status or could not be parsed
+
+        Raises:
+            HostThrottled: On 429/503, so the scheduler can back off the host
+            httpx.TransportError: On timeouts and connection errors
+        """
+        topics = []
+        keywords = Counter()
+        try:
+            async for candidate in self.extract(client, url):
+                if candidate["type"] == "topic":
+                    topics.append(candidate)
+                else:
+                    keywords[candidate["term"]] += 1
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in THROTTLE_STATUSES:
+                raise HostThrottled(parse_retry_after(e.response.headers.get("retry-after")))
+            logger.warning(f"Failed to fetch {url}: {e}")
+        except etree.LxmlError as e:
+            logger.warning(f"Failed to parse {url}: {e}")
+        return {"url": url, "topics": topics, "keywords": keywords}
+
+    async def fetch_pages(self, client: httpx.AsyncClient, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch pages through the per-host scheduler, in input order
+
+        URLs disallowed by robots.txt, and pages that fail or are given up
+        on, come back empty.
+        """
+
+        async def job(url: str) -> Optional[Dict[str, Any]]:
+            rules = await self.robots.rules(client, url)
+            if not rules.can_fetch(USER_AGENT, url):
+                logger.info(f"Skipping {url}: disallowed by robots.txt")
+                return None
+            delay = rules.crawl_delay(USER_AGENT)
+            if delay:
+                self.scheduler.bucket(host_of(url)).slow_down(1.0 / max(float(delay), 0.001))
+            return await self.fetch_page(client, url)
+
+        pages = await self.scheduler.run(urls, job)
+        return [
+            page if page is not None else {"url": url, "topics": [], "keywords": Counter()}
+            for url, page in zip(urls, pages)
+        ]
@@ -1,31 +1,42 @@
 from celery import Task
 from app.tasks.celery_app import celery_app
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.models import ResearchJob, Blog, User, JobStatus
+from app.models import ResearchJob, ResearchSnapshot, Blog, User, JobStatus
 from app.services.research_service import ResearchService
-from app.services.blog_generation_service import BlogGenerationService
+from app.services.blog_generation_service import BlogGenerationService, blog_stats
+from app.services.enhancement_cache import EnhancementCache
 from app.services.storage_service import StorageService
 from app.services.email_service import EmailService
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.notification_digest_service import NotificationDigestService
+from app.services.job_event_service import JobEventService
+from app.services.keyword_index_service import KeywordIndexService
+from app.services.research_snapshot_service import ResearchSnapshotService
+from app.services.job_metrics_service import StageTimer, seconds_between
 from datetime import datetime
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 
 class DatabaseTask(Task):
     """Base task that provides database session"""
-    _db = None
+    # One task instance serves every execution in a worker process; keep
+    # the session per thread so the threads/gevent pools don't share one
+    _local = threading.local()
 
     @property
     def db(self):
-        if self._db is None:
-            self._db = SessionLocal()
-        return self._db
+        if getattr(self._local, "db", None) is None:
+            self._local.db = SessionLocal()
+        return self._local.db
 
     def after_return(self, *args, **kwargs):
-        if self._db is not None:
-            self._db.close()
-            self._db = None
+        if getattr(self._local, "db", None) is not None:
+            self._local.db.close()
+            self._local.db = None
 
 
 @celery_app.task(bind=True, base=DatabaseTask, name="generate_blog_task")
@@ -40,10 +51,24 @@ def generate_blog_task(self, job_id: int):
     4. Sends email notification to user
     """
     db = self.db
-    research_service = ResearchService()
+    keyword_index = KeywordIndexService()
+    snapshots = ResearchSnapshotService()
+    research_service = ResearchService(
+        keyword_frequency_lookup=lambda sector, location, terms: keyword_index.frequencies(
+            db, sector, location, terms
+        ),
+        snapshot_lookup=(
+            (lambda sector, location: snapshots.fresh(db, sector, location))
+            if settings.RESEARCH_SNAPSHOT_ENABLED else None
+        ),
+    )
     blog_service = BlogGenerationService()
     storage_service = StorageService()
     email_service = EmailService()
+    outbox = EmailOutboxService()
+    digests = NotificationDigestService()
+    job_events = JobEventService()
+    timer = StageTimer()
 
     try:
         # Get research job
@@ -61,7 +86,9 @@ def generate_blog_task(self, job_id: int):
         # Update job status to RESEARCHING
         job.status = JobStatus.RESEARCHING
         job.started_at = datetime.utcnow()
+        timer.record("queue_wait", seconds_between(job.created_at, job.started_at))
         db.commit()
+        job_events.publish(job.id, JobStatus.RESEARCHING)
 
         logger.info(f"Starting research for job {job_id}: {job.sector} in {job.location}")
 
@@ -74,11 +101,21 @@ def generate_blog_task(self, job_id: int):
 
         # Since research_sector is async, we need to run it synchronously
         import asyncio
-        research_data = asyncio.run(research_data)
+        with timer.stage("research"):
+            research_data = asyncio.run(research_data)
 
         # Store research data
         job.research_data = research_data
         job.keywords_found = research_data.get("keywords", [])
+
+        # Feed the cross-job keyword index (skipped for research served
+        # from a snapshot, which was indexed when built); never fail the job over it
+        try:
+            with db.begin_nested():
+                keyword_index.index_job(db, job)
+        except Exception as index_error:
+            logger.error(f"Failed to index keywords for job {job_id}: {str(index_error)}")
+
         db.commit()
 
         logger.info(f"Research completed. Found {len(job.keywords_found)} keywords")
@@ -86,6 +123,7 @@ def generate_blog_task(self, job_id: int):
         # Update job status to GENERATING
         job.status = JobStatus.GENERATING
         db.commit()
+        job_events.publish(job.id, JobStatus.GENERATING)
 
         logger.info(f"Generating blog content for job {job_id}")
 
@@ -95,27 +133,35 @@ def generate_blog_task(self, job_id: int):
         )
 
         # Generate blog content using Claude
-        blog_data = asyncio.run(
-            blog_service.generate_blog(
-                sector=job.sector,
-                location=job.location,
-                research_data=research_data,
-                keywords=job.keywords_found,
-                tone=job.tone,
-                outline=outline,
-                custom_title=job.custom_title,
-                target_word_count=job.target_word_count,
-                writing_style=job.writing_style,
-                target_audience=job.target_audience,
-                content_depth=job.content_depth,
-                seo_focus=job.seo_focus,
-                include_sections=job.include_sections,
-                custom_instructions=job.custom_instructions,
+        with timer.stage("generation"):
+            blog_data = asyncio.run(
+                blog_service.generate_blog(
+                    sector=job.sector,
+                    location=job.location,
+                    research_data=research_data,
+                    keywords=job.keywords_found,
+                    tone=job.tone,
+                    outline=outline,
+                    custom_title=job.custom_title,
+                    target_word_count=job.target_word_count,
+                    writing_style=job.writing_style,
+                    target_audience=job.target_audience,
+                    content_depth=job.content_depth,
+                    seo_focus=job.seo_focus,
+                    include_sections=job.include_sections,
+                    custom_instructions=job.custom_instructions,
+                )
             )
-        )
 
         logger.info(f"Blog generated: {blog_data['title']}")
 
+        usage = blog_data.pop("metrics", {})
+        timer.record("generation_ttft", usage.get("ttft"))
+        timer.record("parse", usage.get("parse"))
+        job.input_tokens = usage.get("input_tokens")
+        job.output_tokens = usage.get("output_tokens")
+        job.cached_tokens = usage.get("cached_tokens")
+
         # Save blog to database
         blog = Blog(
             user_id=user.id,
@@ -127,34 +173,37 @@ def generate_blog_task(self, job_id: int):
             word_count=blog_data.get("word_count"),
             reading_time_minutes=blog_data.get("reading_time_minutes"),
         )
-        db.add(blog)
-        db.commit()
-        db.refresh(blog)
+        with timer.stage("persist"):
+            db.add(blog)
+            db.commit()
+            db.refresh(blog)
 
         logger.info(f"Blog saved to database with ID {blog.id}")
 
         # Save files
-        markdown_path = asyncio.run(
-            storage_service.save_markdown(
-                user_id=user.id,
-                blog_id=blog.id,
-                title=blog.title,
-                content=blog.content,
-            )
-        )
-
-        # Try to save PDF, but don't fail the task if it fails
-        pdf_path = None
-        try:
-            pdf_path = asyncio.run(
-                storage_service.save_pdf(
+        with timer.stage("markdown"):
+            markdown_path = asyncio.run(
+                storage_service.save_markdown(
                     user_id=user.id,
                     blog_id=blog.id,
                     title=blog.title,
                     content=blog.content,
-                    summary=blog.summary,
                 )
             )
+
+        # Try to save PDF, but don't fail the task if it fails
+        pdf_path = None
+        try:
+            with timer.stage("pdf"):
+                pdf_path = asyncio.run(
+                    storage_service.save_pdf(
+                        user_id=user.id,
+                        blog_id=blog.id,
+                        title=blog.title,
+                        content=blog.content,
+                        summary=blog.summary,
+                    )
+                )
         except Exception as pdf_error:
             logger.error(f"Failed to generate PDF for blog {blog.id}: {str(pdf_error)}")
             # Continue without PDF - blog is still successful
@@ -166,27 +215,41 @@ def generate_blog_task(self, job_id: int):
         # Update user's blog count
         user.blogs_created_this_month += 1
 
+        # Notification is queued in the same commit that completes the job
+        # (drain_email_outbox delivers it), unless the user has other jobs
+        # finishing in this digest window; then it is buffered once committed
+        with timer.stage("notify"):
+            notify_now = digests.open_window(user.id)
+            if notify_now:
+                outbox.queue(db, email_service.blog_ready_notification(
+                    to_email=user.email,
+                    user_name=user.full_name,
+                    blog_title=blog.title,
+                    blog_id=blog.id,
+                    sector=job.sector,
+                    location=job.location,
+                ))
+
         # Update job status to COMPLETED
         job.status = JobStatus.COMPLETED
         job.completed_at = datetime.utcnow()
+        job.stage_timings = dict(timer.timings)
 
         db.commit()
+        job_events.publish(job.id, JobStatus.COMPLETED, blog_id=blog.id)
 
-        logger.info(f"Blog generation completed for job {job_id}")
-
-        # Send email notification
-        asyncio.run(
-            email_service.send_blog_ready_notification(
+        if not notify_now and not digests.buffer(user.id, digests.entry(job, blog=blog)):
+            outbox.queue(db, email_service.blog_ready_notification(
                 to_email=user.email,
                 user_name=user.full_name,
                 blog_title=blog.title,
                 blog_id=blog.id,
                 sector=job.sector,
                 location=job.location,
-            )
-        )
+            ))
+            db.commit()
 
-        logger.info(f"Email notification sent to {user.email}")
+        logger.info(f"Blog generation completed for job {job_id}")
 
         return {
             "status": "success",
@@ -197,28 +260,110 @@ def generate_blog_task(self, job_id: int):
     except Exception as e:
         logger.error(f"Error generating blog for job {job_id}: {str(e)}")
 
-        # Update job with error
+        # Whatever the failed step left in the session is discarded
+        db.rollback()
+
+        # Update job with error, and queue the failure notification with it
         job = db.query(ResearchJob).filter(ResearchJob.id == job_id).first()
         if job:
             job.status = JobStatus.FAILED
             job.error_message = str(e)
             job.completed_at = datetime.utcnow()
-            db.commit()
+            job.stage_timings = dict(timer.timings)
 
-            # Get user and send failure notification
             user = db.query(User).filter(User.id == job.user_id).first()
+            notify_now = False
             if user:
-                import asyncio
-                asyncio.run(
-                    email_service.send_job_failed_notification(
-                        to_email=user.email,
-                        user_name=user.full_name,
-                        sector=job.sector,
-                        location=job.location,
-                        error_message=str(e),
-                    )
+                failure_email = email_service.job_failed_notification(
+                    job_id=job.id,
+                    to_email=user.email,
+                    user_name=user.full_name,
+                    sector=job.sector,
+                    location=job.location,
+                    error_message=str(e),
+                )
+                notify_now = digests.open_window(user.id)
+                if notify_now:
+                    outbox.queue(db, failure_email)
+
+            db.commit()
+            job_events.publish(job.id, JobStatus.FAILED, error_message=str(e))
+
+            if user and not notify_now and not digests.buffer(
+                user.id, digests.entry(job, error_message=str(e))
+            ):
+                outbox.queue(db, failure_email)
+                db.commit()
+
+        raise
+
+
+@celery_app.task(bind=True, base=DatabaseTask, name="enhance_blog_task")
+def enhance_blog_task(self, blog_id: int, enhancement_type: str = "seo"):
+    """
+    Celery task to enhance an existing blog post
+
+    Rewrites the content section by section, then refreshes the Markdown
+    and PDF files. Saving bumps the blog's version, which is how clients
+    polling GET /blogs/{id} see the result.
+    """
+    import asyncio
+
+    db = self.db
+    blog_service = BlogGenerationService()
+    storage_service = StorageService()
+
+    blog = db.query(Blog).filter(Blog.id == blog_id).first()
+    if not blog:
+        logger.error(f"Blog {blog_id} not found")
+        return
+
+    try:
+        logger.info(f"Enhancing blog {blog_id} ({enhancement_type})")
+
+        content = asyncio.run(
+            blog_service.enhance_blog(blog.content, enhancement_type, cache=EnhancementCache())
+        )
+        stats = blog_stats(blog.title, blog.summary, content)
+
+        blog.content = stats["content"]
+        blog.word_count = stats["word_count"]
+        blog.reading_time_minutes = stats["reading_time_minutes"]
+
+        blog.markdown_file_path = asyncio.run(
+            storage_service.save_markdown(
+                user_id=blog.user_id,
+                blog_id=blog.id,
+                title=blog.title,
+                content=blog.content,
+            )
+        )
+        try:
+            blog.pdf_file_path = asyncio.run(
+                storage_service.save_pdf(
+                    user_id=blog.user_id,
+                    blog_id=blog.id,
+                    title=blog.title,
+                    content=blog.content,
+                    summary=blog.summary,
                 )
+            )
+        except Exception as pdf_error:
+            logger.error(f"Failed to regenerate PDF for blog {blog.id}: {str(pdf_error)}")
+
+        db.commit()
+
+        logger.info(f"Blog {blog_id} enhanced (version {blog.version})")
+
+        return {
+            "status": "success",
+            "blog_id": blog.id,
+            "version": blog.version,
+        }
 
+    except Exception as e:
+        logger.error(f"Error enhancing blog {blog_id}: {str(e)}")
+        db.rollback()
         raise
 
 
@@ -238,3 +383,94 @@ def reset_monthly_blog_counts():
         db.rollback()
     finally:
         db.close()
+
+
+@celery_app.task(name="rebuild_keyword_index")
+def rebuild_keyword_index(batch_size: int = 500):
+    """
+    Celery task to backfill the keyword index from existing research jobs and snapshots
+    Safe to re-run: jobs and snapshots that are already indexed are skipped by the index
+    """
+    db = SessionLocal()
+    keyword_index = KeywordIndexService()
+    indexed = 0
+    last_id = 0
+    try:
+        while True:
+            jobs = (
+                db.query(ResearchJob)
+                .filter(ResearchJob.id > last_id, ResearchJob.keywords_found.isnot(None))
+                .order_by(ResearchJob.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not jobs:
+                break
+            for job in jobs:
+                indexed += keyword_index.index_job(db, job)
+            last_id = jobs[-1].id
+            db.commit()
+        for snapshot in db.query(ResearchSnapshot).all():
+            indexed += keyword_index.index_snapshot(db, snapshot)
+        db.commit()
+        logger.info(f"Keyword index rebuilt: {indexed} new postings")
+    except Exception as e:
+        logger.error(f"Failed to rebuild keyword index: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@celery_app.task(name="refresh_research_snapshots")
+def refresh_research_snapshots(limit: int = None):
+    """
+    Celery periodic task to precompute research for popular sector/location pairs
+    Scheduled by Celery beat; pairs whose snapshot is still in the first half
+    of its staleness bound are skipped
+    """
+    if not settings.RESEARCH_SNAPSHOT_ENABLED:
+        return
+
+    import asyncio
+
+    db = SessionLocal()
+    snapshots = ResearchSnapshotService()
+    keyword_index = KeywordIndexService()
+    # No snapshot_lookup: refreshes always run live research
+    research_service = ResearchService(
+        keyword_frequency_lookup=lambda sector, location, terms: keyword_index.frequencies(
+            db, sector, location, terms
+        )
+    )
+    refreshed = 0
+    try:
+        scopes = snapshots.popular_scopes(
+            db,
+            limit=limit or settings.RESEARCH_SNAPSHOT_TOP_N,
+            days=settings.RESEARCH_SNAPSHOT_POPULARITY_DAYS,
+        )
+        for scope in scopes:
+            if not snapshots.needs_refresh(db, scope["sector"], scope["location"]):
+                continue
+            try:
+                research_data = asyncio.run(
+                    research_service.research_sector(scope["sector"], scope["location"])
+                )
+                snapshot = snapshots.store(
+                    db, scope["sector"], scope["location"], research_data, scope["job_count"]
+                )
+                # Counted once here; jobs served from the snapshot aren't indexed
+                keyword_index.index_snapshot(db, snapshot)
+                db.commit()
+                refreshed += 1
+            except Exception as e:
+                db.rollback()
+                logger.error(
+                    f"Failed to refresh research snapshot for {scope['sector']} in {scope['location']}: {str(e)}"
+                )
+        logger.info(f"Research snapshots refreshed: {refreshed} of {len(scopes)} popular pairs")
+    except Exception as e:
+        logger.error(f"Failed to refresh research snapshots: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
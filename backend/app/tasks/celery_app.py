@@ -1,12 +1,15 @@
 from celery import Celery
 from app.core.config import settings
+from app.core.metrics import instrument_celery
+from app.core.profiling import profile_celery
+from app.core.tracing import trace_celery
 
 # Create Celery app
 celery_app = Celery(
     "content_scout",
-    broker=settings.REDIS_URL,
-    backend=settings.REDIS_URL,
-    include=["app.tasks.blog_tasks"]
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+    backend=settings.CELERY_RESULT_BACKEND or settings.REDIS_URL,
+    include=["app.tasks.blog_tasks", "app.tasks.email_tasks", "app.tasks.webhook_tasks"]
 )
 
 # Configure Celery
@@ -21,4 +24,54 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # Email delivery gets its own queue; run a worker with -Q email (or add
+    # the queue to an existing worker) so the outbox is drained
+    task_routes={
+        "drain_email_outbox": {"queue": settings.EMAIL_OUTBOX_QUEUE},
+        "purge_email_outbox": {"queue": settings.EMAIL_OUTBOX_QUEUE},
+        "send_notification_digests": {"queue": settings.EMAIL_OUTBOX_QUEUE},
+    },
 )
+
+# Task runtime histograms (and METRICS_WORKER_PORT, if set)
+instrument_celery(celery_app)
+
+# Trace context through task headers, and a span per task
+if settings.TRACING_ENABLED:
+    trace_celery(celery_app)
+
+# Task profiles (PROFILING_TASKS) and the rolling profile, when enabled
+if settings.PROFILING_ENABLED:
+    profile_celery(celery_app)
+
+# Periodic tasks (run `celery -A app.tasks.celery_app beat` alongside the workers)
+celery_app.conf.beat_schedule = {
+    "refresh-research-snapshots": {
+        "task": "refresh_research_snapshots",
+        "schedule": settings.RESEARCH_SNAPSHOT_REFRESH_MINUTES * 60,
+    },
+    "drain-email-outbox": {
+        "task": "drain_email_outbox",
+        "schedule": settings.EMAIL_OUTBOX_POLL_SECONDS,
+        # A drain still waiting when the next one is due is redundant
+        "options": {"expires": settings.EMAIL_OUTBOX_POLL_SECONDS},
+    },
+    "purge-email-outbox": {
+        "task": "purge_email_outbox",
+        "schedule": 24 * 60 * 60,
+    },
+    "send-notification-digests": {
+        "task": "send_notification_digests",
+        "schedule": settings.EMAIL_DIGEST_POLL_SECONDS,
+        "options": {"expires": settings.EMAIL_DIGEST_POLL_SECONDS},
+    },
+    "sweep-stripe-webhooks": {
+        "task": "sweep_stripe_webhooks",
+        "schedule": settings.WEBHOOK_SWEEP_SECONDS,
+        "options": {"expires": settings.WEBHOOK_SWEEP_SECONDS},
+    },
+    "purge-webhook-events": {
+        "task": "purge_webhook_events",
+        "schedule": 24 * 60 * 60,
+    },
+}
@@ -0,0 +1,103 @@
+from app.tasks.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.email_service import EmailService
+from app.services.notification_digest_service import NotificationDigestService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="drain_email_outbox")
+def drain_email_outbox():
+    """
+    Celery periodic task delivering queued transactional email
+
+    Scheduled by Celery beat every EMAIL_OUTBOX_POLL_SECONDS and routed to
+    EMAIL_OUTBOX_QUEUE, so a dedicated worker can own delivery
+    """
+    db = SessionLocal()
+    try:
+        counts = EmailOutboxService().drain(db)
+    finally:
+        db.close()
+    if any(counts.values()):
+        logger.info(f"Email outbox: {counts['sent']} sent, {counts['retried']} to retry, {counts['failed']} failed")
+    return counts
+
+
+@celery_app.task(name="purge_email_outbox")
+def purge_email_outbox():
+    """Celery periodic task deleting delivered outbox rows past EMAIL_OUTBOX_RETENTION_DAYS"""
+    db = SessionLocal()
+    try:
+        deleted = EmailOutboxService().purge(db, settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    finally:
+        db.close()
+    logger.info(f"Purged {deleted} delivered email(s) from the outbox")
+    return deleted
+
+
+@celery_app.task(name="send_notification_digests")
+def send_notification_digests():
+    """
+    Celery periodic task emailing each user whose digest window has closed
+    one summary of the jobs buffered in it
+
+    Scheduled by Celery beat every EMAIL_DIGEST_POLL_SECONDS; the digests
+    go through the outbox like any other email.
+    """
+    digests = NotificationDigestService()
+    email_service = EmailService()
+    outbox = EmailOutboxService()
+    db = SessionLocal()
+    sent = 0
+    try:
+        for user_id in digests.due_users():
+            entries = digests.take(user_id)
+            if not entries:
+                continue
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                continue
+            try:
+                if len(entries) == 1:
+                    message = _single_notification(email_service, user, entries[0])
+                else:
+                    message = email_service.notification_digest(user.id, user.email, user.full_name, entries)
+                outbox.queue(db, message)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                digests.restore(user_id, entries)
+                logger.error(f"Failed to queue notification digest for user {user_id}: {str(e)}")
+                continue
+            sent += 1
+    finally:
+        db.close()
+    if sent:
+        logger.info(f"Queued {sent} notification digest(s)")
+    return sent
+
+
+def _single_notification(email_service: EmailService, user: User, entry: dict) -> dict:
+    """A window with one job in it gets that job's usual email"""
+    if entry["status"] == "failed":
+        return email_service.job_failed_notification(
+            job_id=entry["job_id"],
+            to_email=user.email,
+            user_name=user.full_name,
+            sector=entry["sector"],
+            location=entry["location"],
+            error_message=entry["error_message"],
+        )
+    return email_service.blog_ready_notification(
+        to_email=user.email,
+        user_name=user.full_name,
+        blog_title=entry["blog_title"],
+        blog_id=entry["blog_id"],
+        sector=entry["sector"],
+        location=entry["location"],
+    )
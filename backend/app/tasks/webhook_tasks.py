@@ -0,0 +1,60 @@
+from typing import Optional
+from app.tasks.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.stripe_webhook_service import StripeWebhookService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="process_stripe_webhooks")
+def process_stripe_webhooks(customer_id: Optional[str]):
+    """
+    Celery task applying a Stripe customer's recorded webhook events
+
+    Queued by the webhook endpoint for each new event; one run handles
+    every event pending for the customer, in order.
+    """
+    db = SessionLocal()
+    try:
+        counts = StripeWebhookService().process_customer(db, customer_id)
+    finally:
+        db.close()
+    if any(counts.values()):
+        logger.info(
+            f"Stripe webhooks for {customer_id}: {counts['processed']} processed, "
+            f"{counts['superseded']} superseded, {counts['failed']} failed"
+        )
+    return counts
+
+
+@celery_app.task(name="sweep_stripe_webhooks")
+def sweep_stripe_webhooks():
+    """
+    Celery periodic task re-queueing customers whose events were never processed
+
+    Covers an endpoint that recorded an event but couldn't reach the broker.
+    """
+    db = SessionLocal()
+    try:
+        customers = StripeWebhookService().stranded_customers(db, settings.WEBHOOK_SWEEP_SECONDS)
+    finally:
+        db.close()
+    for customer_id in customers:
+        process_stripe_webhooks.delay(customer_id)
+    if customers:
+        logger.warning(f"Re-queued Stripe webhooks for {len(customers)} customer(s)")
+    return len(customers)
+
+
+@celery_app.task(name="purge_webhook_events")
+def purge_webhook_events():
+    """Celery periodic task deleting handled webhook events past WEBHOOK_EVENT_RETENTION_DAYS"""
+    db = SessionLocal()
+    try:
+        deleted = StripeWebhookService().purge(db, settings.WEBHOOK_EVENT_RETENTION_DAYS)
+    finally:
+        db.close()
+    logger.info(f"Purged {deleted} handled webhook event(s)")
+    return deleted
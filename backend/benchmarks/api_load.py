@@ -0,0 +1,108 @@
+"""
+API load benchmark
+
+Drives authenticated read endpoints with a fixed number of concurrent
+clients and reports requests/sec. Run it against a single uvicorn worker
+to compare per-worker throughput between builds:
+
+    uvicorn app.main:app --workers 1 --port 8000
+    python -m benchmarks.api_load --base-url http://localhost:8000 --concurrency 64 --duration 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/auth/me",
+    "/api/v1/blogs",
+    "/api/v1/jobs",
+    "/api/v1/blogs/stats/summary",
+]
+
+
+async def _register(client: httpx.AsyncClient) -> str:
+    """Register a throwaway user and return its access token"""
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+            "password": "benchmark-password",
+            "full_name": "Load Benchmark",
+            "country": "US",
+        },
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    paths: List[str],
+    deadline: float,
+    latencies: List[float],
+    errors: Dict[str, int],
+):
+    """Issue requests round-robin over paths until the deadline"""
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url: str, concurrency: int, duration: float, paths: List[str]):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        token = await _register(client)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        latencies: List[float] = []
+        errors: Dict[str, int] = {}
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, paths, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"concurrency:  {concurrency}")
+    print(f"duration:     {elapsed:.1f}s")
+    print(f"requests:     {len(latencies)}")
+    print(f"requests/sec: {len(latencies) / elapsed:.1f}")
+    if latencies:
+        print(f"p50 latency:  {statistics.median(latencies) * 1000:.1f}ms")
+        print(f"p95 latency:  {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+        print(f"p99 latency:  {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+    if errors:
+        print(f"errors:       {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--path", action="append", dest="paths", help="Endpoint to hit (repeatable)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.concurrency, args.duration, args.paths or DEFAULT_PATHS))
+
+
+if __name__ == "__main__":
+    main()
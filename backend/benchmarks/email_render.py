@@ -0,0 +1,102 @@
+"""
+Email render microbenchmark
+
+Renders every notification email through EmailService many times and
+reports the cost per render, next to the same templates compiled on every
+call (an environment without a template cache), which is the work
+compiling once at startup saves. --storm simulates a notification storm:
+one blog-ready email per recipient, as after a large batch of jobs
+completes.
+
+    python -m benchmarks.email_render --iterations 5000 --storm 10000
+
+No database, broker or network is used.
+"""
+import argparse
+import os
+import time
+
+
+def _configure_environment():
+    for key, value in {
+        "SECRET_KEY": "email-benchmark",
+        "DATABASE_URL": "sqlite://",
+        "REDIS_URL": "redis://localhost:6379/0",
+        "ANTHROPIC_API_KEY": "sk-ant-fake",
+        "STRIPE_SECRET_KEY": "sk_test_fake",
+        "STRIPE_PUBLISHABLE_KEY": "pk_test_fake",
+        "PAYSTACK_SECRET_KEY": "sk_test_fake",
+        "PAYSTACK_PUBLIC_KEY": "pk_test_fake",
+    }.items():
+        os.environ.setdefault(key, value)
+
+
+def _time(fn, iterations: int) -> float:
+    """Microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="Renders per template")
+    parser.add_argument("--storm", type=int, default=5000, help="Recipients in the notification storm (0 to skip)")
+    args = parser.parse_args()
+
+    _configure_environment()
+    from app.services.email_service import EmailService
+    from app.services.email_templates import email_templates
+
+    service = EmailService()
+    emails = {
+        "welcome": lambda: service.welcome_email("ama@example.com", "Ama Mensah"),
+        "blog_ready": lambda: service.blog_ready_notification(
+            "ama@example.com", "Ama Mensah", "Fintech Trends <2025> & Beyond", 42, "Fintech", "Ghana"
+        ),
+        "job_failed": lambda: service.job_failed_notification(
+            42, "ama@example.com", "Ama Mensah", "Fintech", "Ghana", "Upstream error: <html>timeout</html>"
+        ),
+        "subscription_confirmation": lambda: service.subscription_confirmation(
+            "sub_123", "ama@example.com", "Ama Mensah", "pro", 99.0, "USD"
+        ),
+    }
+
+    # Baseline: the template and its layout are loaded and compiled per render
+    from jinja2 import Environment, StrictUndefined
+
+    uncached = Environment(
+        loader=email_templates.env.loader, autoescape=True, undefined=StrictUndefined, cache_size=0
+    )
+    uncached.globals.update(email_templates.env.globals)
+    contexts = {
+        "welcome": {"user_name": "Ama Mensah"},
+        "blog_ready": {"user_name": "Ama Mensah", "blog_title": "Fintech Trends", "blog_id": 42,
+                       "sector": "Fintech", "location": "Ghana"},
+        "job_failed": {"user_name": "Ama Mensah", "sector": "Fintech", "location": "Ghana",
+                       "error_message": "Upstream error"},
+        "subscription_confirmation": {"user_name": "Ama Mensah", "plan": "Pro", "amount": 99.0, "currency": "USD"},
+    }
+
+    baseline_iterations = max(1, args.iterations // 20)
+    print(f"{'template':<28} {'size':>7} {'compiled':>11} {'uncached':>13}")
+    for name, build in emails.items():
+        size = len(build()["html"])
+        compiled = _time(build, args.iterations)
+        per_call = _time(lambda: uncached.get_template(f"{name}.html").render(contexts[name]), baseline_iterations)
+        print(f"{name:<28} {size:>6}B {compiled:>9,.1f}us {per_call:>11,.1f}us")
+
+    if args.storm:
+        start = time.perf_counter()
+        for i in range(args.storm):
+            service.blog_ready_notification(
+                f"user{i}@example.com", f"User {i}", f"Blog {i}", i, "Fintech", "Ghana"
+            )
+        elapsed = time.perf_counter() - start
+        print(f"\nstorm: {args.storm:,} blog-ready emails in {elapsed * 1000:,.0f}ms "
+              f"({args.storm / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
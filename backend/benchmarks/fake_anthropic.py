@@ -0,0 +1,327 @@
+"""
+Fake Anthropic Messages API
+
+A local stand-in for POST /v1/messages so the pipeline can be load-tested
+without spending credits. Latency is drawn per request (log-normal time to
+first token, then a steady token rate), a fraction of requests can be
+rejected with 429 + retry-after, and both plain and streamed (SSE)
+responses are supported. Replies are canned but shaped like the real ones:
+TITLE/SUMMARY/CONTENT posts, long-form sections, stitching passes and
+enhanced chunks, sized from the request's max_tokens.
+
+It also serves what the rest of a job talks to, so a run stays offline:
+an RSS search feed and result pages for research (/search, /pages/N) and
+Resend's POST /emails and /emails/batch.
+
+    python -m benchmarks.fake_anthropic --port 8100 --ttft-ms 800 --tokens-per-sec 60 --rate-limit 0.05
+    ANTHROPIC_BASE_URL=http://localhost:8100 celery -A app.tasks.celery_app worker
+
+GET /stats returns request counters and server-side latency percentiles.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+WORDS = (
+    "market growth digital customers platform investment regional policy data adoption "
+    "mobile payments lending startups regulators banks consumers demand supply prices "
+    "infrastructure talent funding partnerships exports services innovation access"
+).split()
+
+# Output is streamed in deltas of this many words
+DELTA_WORDS = 8
+
+
+class LatencyModel:
+    """Per-request latency: log-normal time to first token, then a token rate"""
+
+    def __init__(self, ttft_ms: float, ttft_p95_ms: float, tokens_per_sec: float, seed: Optional[int] = None):
+        self.median = ttft_ms / 1000
+        # p95 of a log-normal is median * exp(1.645 sigma)
+        self.sigma = math.log(max(ttft_p95_ms, ttft_ms) / ttft_ms) / 1.645 if ttft_ms > 0 else 0.0
+        self.tokens_per_sec = tokens_per_sec
+        self.rng = random.Random(seed)
+
+    def ttft(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(self.rng.gauss(0, self.sigma))
+
+    def generation(self, tokens: int) -> float:
+        return tokens / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+
+def _prose(rng: random.Random, words: int) -> str:
+    """Paragraphs of filler words, about `words` long"""
+    paragraphs = []
+    while words > 0:
+        size = min(words, rng.randint(40, 80))
+        text = " ".join(rng.choice(WORDS) for _ in range(size))
+        paragraphs.append(text[0].upper() + text[1:] + ".")
+        words -= size
+    return "\n\n".join(paragraphs)
+
+
+def canned_reply(prompt: str, max_tokens: int, rng: random.Random) -> str:
+    """A reply in the shape the calling code expects, sized to max_tokens"""
+    words = max(20, int(max_tokens / 1.5) - 60)
+
+    if "TRANSITION 1:" in prompt:
+        seams = len(re.findall(r"^TRANSITION \d+:", prompt, re.MULTILINE))
+        lines = ["TITLE: Benchmark Stitched Post", f"SUMMARY: {_prose(rng, 30)}"]
+        lines += [f"TRANSITION {i + 1}: {_prose(rng, 15)}" for i in range(seams)]
+        return "\n".join(lines)
+
+    section = re.search(r'Start with the line "## (.+?)"', prompt)
+    if section:
+        return f"## {section.group(1)}\n\n{_prose(rng, words)}"
+
+    original = re.search(r"Original Content:\n(.*)\n\nProvide", prompt, re.DOTALL)
+    if original:
+        return original.group(1).strip() + "\n\n" + _prose(rng, 20)
+
+    if "CONTENT:" in prompt:
+        title = re.search(r'title: "(.+?)"', prompt)
+        body = [f"## Section {i + 1}\n\n{_prose(rng, words // 5)}" for i in range(5)]
+        return (
+            f"TITLE: {title.group(1) if title else 'Benchmark Blog Post'}\n\n"
+            f"SUMMARY: {_prose(rng, 40)}\n\n"
+            "CONTENT:\n" + "\n\n".join(body)
+        )
+
+    return _prose(rng, words)
+
+
+class FakeAnthropicServer:
+    """ASGI app plus counters; run it with uvicorn or in a thread via serve()"""
+
+    def __init__(
+        self,
+        latency: LatencyModel,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        email_ms: float = 50.0,
+        page_ms: float = 30.0,
+        results_per_query: int = 5,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.email_ms = email_ms
+        self.page_ms = page_ms
+        self.results_per_query = results_per_query
+        self.rng = random.Random(seed)
+        self.pages = sorted(FIXTURES.glob("*.html"))
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "streamed": 0,
+            "rate_limited": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "emails": 0,
+            "searches": 0,
+            "pages": 0,
+        }
+        self.durations: List[float] = []
+        self.app = self._build_app()
+
+    def count(self, **increments: int):
+        with self.lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            durations = sorted(self.durations)
+            stats = dict(self.stats)
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            stats[f"{name}_ms"] = round(durations[min(len(durations) - 1, int(len(durations) * q))] * 1000) if durations else None
+        return stats
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Anthropic Messages API")
+
+        @app.post("/v1/messages")
+        async def messages(request: Request):
+            body = await request.json()
+            if self.rng.random() < self.rate_limit:
+                self.count(rate_limited=1)
+                return JSONResponse(
+                    status_code=429,
+                    headers={"retry-after": str(self.retry_after)},
+                    content={"type": "error", "error": {"type": "rate_limit_error", "message": "Injected rate limit"}},
+                )
+
+            prompt = "\n".join(
+                part if isinstance(part, str) else " ".join(block.get("text", "") for block in part)
+                for part in [body.get("system") or ""] + [m["content"] for m in body.get("messages", [])]
+            )
+            text = canned_reply(prompt, body.get("max_tokens", 1024), self.rng)
+            input_tokens = len(prompt) // 4
+            output_tokens = min(body.get("max_tokens", 1024), int(len(text.split()) * 1.3))
+            cached = input_tokens if isinstance(body.get("system"), list) else 0
+            self.count(requests=1, input_tokens=input_tokens, output_tokens=output_tokens)
+
+            started = time.perf_counter()
+            ttft = self.latency.ttft()
+            usage = {"input_tokens": input_tokens - cached, "output_tokens": output_tokens}
+            if cached:
+                usage["cache_read_input_tokens"] = cached
+            message = {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "claude-fake"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": usage,
+            }
+
+            if not body.get("stream"):
+                await asyncio.sleep(ttft + self.latency.generation(output_tokens))
+                self._record(started)
+                return message
+
+            self.count(streamed=1)
+            return StreamingResponse(
+                self._stream(message, ttft, output_tokens, started), media_type="text/event-stream"
+            )
+
+        @app.post("/emails")
+        async def emails():
+            await asyncio.sleep(self.email_ms / 1000)
+            self.count(emails=1)
+            return {"id": str(uuid.uuid4())}
+
+        @app.post("/emails/batch")
+        async def email_batch(request: Request):
+            emails = await request.json()
+            await asyncio.sleep(self.email_ms / 1000)
+            self.count(emails=len(emails))
+            return {"data": [{"id": str(uuid.uuid4())} for _ in emails]}
+
+        @app.get("/search")
+        async def search(request: Request, q: str = ""):
+            self.count(searches=1)
+            base = str(request.base_url).rstrip("/")
+            items = "".join(
+                f"<item><title>{escape(q.title())} update {i + 1}</title>"
+                f"<link>{base}/pages/{i}?q={escape(q)}</link>"
+                f"<description>Latest {escape(q)} coverage, part {i + 1}.</description></item>"
+                for i in range(self.results_per_query)
+            )
+            return Response(
+                f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>',
+                media_type="application/rss+xml",
+            )
+
+        @app.get("/pages/{number}")
+        async def page(number: int):
+            await asyncio.sleep(self.page_ms / 1000)
+            self.count(pages=1)
+            if not self.pages:
+                return Response("<html><body><p>No fixtures</p></body></html>", media_type="text/html")
+            return Response(self.pages[number % len(self.pages)].read_bytes(), media_type="text/html")
+
+        @app.get("/stats")
+        async def stats():
+            return self.snapshot()
+
+        return app
+
+    def _record(self, started: float):
+        with self.lock:
+            self.durations.append(time.perf_counter() - started)
+
+    async def _stream(self, message: Dict[str, Any], ttft: float, output_tokens: int, started: float):
+        def event(name: str, data: Dict[str, Any]) -> str:
+            return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+        await asyncio.sleep(ttft)
+        text = message["content"][0]["text"]
+        start = {**message, "content": [], "stop_reason": None,
+                 "usage": {**message["usage"], "output_tokens": 1}}
+        yield event("message_start", {"type": "message_start", "message": start})
+        yield event("content_block_start", {"type": "content_block_start", "index": 0,
+                                            "content_block": {"type": "text", "text": ""}})
+
+        words = re.split(r"(?<=\s)", text)
+        per_delta = self.latency.generation(output_tokens) * DELTA_WORDS / max(len(words), 1)
+        for i in range(0, len(words), DELTA_WORDS):
+            await asyncio.sleep(per_delta)
+            yield event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": "".join(words[i:i + DELTA_WORDS])}})
+
+        yield event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        yield event("message_delta", {"type": "message_delta",
+                                      "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": output_tokens}})
+        yield event("message_stop", {"type": "message_stop"})
+        self._record(started)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8100):
+        """Start uvicorn in a daemon thread and wait until it accepts connections"""
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        return server
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Options shared with benchmarks.pipeline"""
+    parser.add_argument("--ttft-ms", type=float, default=800, help="Median time to first token")
+    parser.add_argument("--ttft-p95-ms", type=float, default=2000, help="p95 time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=60, help="Output rate after the first token")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests rejected with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds on injected 429s")
+    parser.add_argument("--email-ms", type=float, default=50)
+    parser.add_argument("--page-ms", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def from_arguments(args: argparse.Namespace) -> FakeAnthropicServer:
+    return FakeAnthropicServer(
+        LatencyModel(args.ttft_ms, args.ttft_p95_ms, args.tokens_per_sec, seed=args.seed),
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        email_ms=args.email_ms,
+        page_ms=args.page_ms,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(from_arguments(args).app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+HTML extraction benchmark
+
+Runs the streaming extractor over a corpus of saved pages (default:
+benchmarks/fixtures/html), then runs the full research step offline with
+every search and page request served from that corpus through an
+httpx.MockTransport with simulated network latency:
+
+    python -m benchmarks.html_extraction --chunk-size 4096 --latency-ms 150
+
+Reports extraction throughput, peak traced memory per page, research wall
+time at concurrency 1 vs --concurrency, and the resulting topics/keywords.
+Settings are read from the environment as usual (.env).
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from app.services.fetch_scheduler import HostScheduler, TokenBucket
+from app.services.html_extraction import extract_from_chunks
+from app.services.research_service import ResearchService
+from app.services.web_fetcher import WebFetcher
+
+DEFAULT_CORPUS = Path(__file__).parent / "fixtures" / "html"
+FIXTURE_HOST = "https://fixtures.local"
+SEARCH_URL = f"{FIXTURE_HOST}/search?q={{query}}"
+
+
+def _load_corpus(path: Path) -> Dict[str, bytes]:
+    pages = {p.name: p.read_bytes() for p in sorted(path.glob("*.html"))}
+    if not pages:
+        raise SystemExit(f"No .html fixtures found in {path}")
+    return pages
+
+
+def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def bench_extraction(pages: Dict[str, bytes], chunk_size: int, repeat: int):
+    """Extractor throughput and peak memory per page"""
+    total_bytes = sum(len(data) for data in pages.values()) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name, data in pages.items():
+            for _candidate in extract_from_chunks(_chunks(data, chunk_size), source=name):
+                pass
+    elapsed = time.perf_counter() - start
+
+    print(f"Extraction ({len(pages)} pages x {repeat}, {chunk_size}-byte chunks)")
+    print(f"  {len(pages) * repeat / elapsed:,.0f} pages/s, {total_bytes / elapsed / 1e6:.1f} MB/s")
+
+    for name, data in pages.items():
+        tracemalloc.start()
+        candidates = list(extract_from_chunks(_chunks(data, chunk_size), source=name))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        topics = sum(1 for c in candidates if c["type"] == "topic")
+        print(
+            f"  {name:<28} {len(data) / 1024:>7.1f} KiB  peak {peak / 1024:>7.1f} KiB  "
+            f"{topics} topics, {len(candidates) - topics} keyword hits"
+        )
+
+
+def _fixture_transport(pages: Dict[str, bytes], latency: float, chunk_size: int) -> httpx.MockTransport:
+    """Search feed listing every fixture, and the fixtures themselves, streamed slowly"""
+    feed = "".join(
+        f"<item><title>{name}</title><link>{FIXTURE_HOST}/pages/{name}</link></item>" for name in pages
+    )
+    feed = f"<?xml version='1.0'?><rss><channel>{feed}</channel></rss>".encode()
+
+    async def body(data: bytes):
+        await asyncio.sleep(latency)
+        for chunk in _chunks(data, chunk_size):
+            yield chunk
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/search":
+            return httpx.Response(200, headers={"content-type": "application/rss+xml"}, content=body(feed))
+        name = request.url.path.rsplit("/", 1)[-1]
+        if name not in pages:
+            return httpx.Response(404)
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, content=body(pages[name]))
+
+    return httpx.MockTransport(handler)
+
+
+async def bench_research(pages: Dict[str, bytes], args) -> List[Dict]:
+    """End-to-end research step against the fixture corpus"""
+    print(f"\nResearch step ({args.latency_ms:.0f} ms simulated latency per request)")
+    research = None
+    for concurrency in sorted({1, args.concurrency}):
+        fetcher = WebFetcher(
+            transport=_fixture_transport(pages, args.latency_ms / 1000, args.chunk_size),
+            search_url=SEARCH_URL,
+            results_per_query=len(pages),
+            concurrency=concurrency,
+            # Every fixture lives on one host; politeness limits are
+            # measured separately by benchmarks.fetch_scheduler
+            scheduler=HostScheduler(
+                buckets={},
+                bucket_factory=lambda: TokenBucket(rate=1000.0, burst=1000),
+                max_in_flight=concurrency,
+                per_host=concurrency,
+                max_host_failures=3,
+            ),
+        )
+        service = ResearchService(fetcher=fetcher)
+        start = time.perf_counter()
+        research = await service.research_sector(args.sector, args.location)
+        print(f"  concurrency {concurrency:>3}: {(time.perf_counter() - start) * 1000:,.0f} ms")
+    return research
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sector", default="Real Estate")
+    parser.add_argument("--location", default="Ghana")
+    args = parser.parse_args()
+
+    pages = _load_corpus(args.corpus)
+    bench_extraction(pages, args.chunk_size, args.repeat)
+    research = asyncio.run(bench_research(pages, args))
+
+    print("\nTopics:")
+    for topic in research["trending_topics"]:
+        print(f"  {topic['relevance']:.2f}  {topic['title']}")
+    print("Keywords:")
+    print("  " + ", ".join(research["keywords"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Keyword scoring benchmark
+
+Compares the vectorized KeywordScorer with the original per-keyword loop
+on synthetic candidate sets:
+
+    python -m benchmarks.keyword_scoring --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+from app.services.keyword_scoring import KeywordScorer
+
+SECTOR = "Real Estate"
+LOCATION = "Ghana"
+
+
+def _make_terms(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    vocab = ["real estate", "ghana", "housing", "mortgage", "accra", "rent", "market"]
+    terms = []
+    for _ in range(n):
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 14)))
+        if rng.random() < 0.1:
+            word = f"{rng.choice(vocab)} {word}"
+        terms.append(word)
+    counts = np.random.default_rng(seed).zipf(1.8, size=n).clip(max=10_000)
+    doc_freqs = np.minimum(counts, np.random.default_rng(seed + 1).integers(1, 50, size=n))
+    return terms, counts, doc_freqs
+
+
+def _legacy_rank(terms, sector, location, limit):
+    """Original ResearchService._rank_keywords loop, for reference"""
+    scored = []
+    for keyword in terms:
+        score = 0
+        if len(keyword) > 8:
+            score += 2
+        if sector.lower() in keyword.lower():
+            score += 3
+        if location.lower() in keyword.lower():
+            score += 2
+        scored.append((keyword, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [kw for kw, _ in scored][:limit]
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    scorer = KeywordScorer()
+    print(f"{'terms':>10} {'vectorized':>12} {'legacy loop':>12} {'speedup':>8}")
+    for n in args.sizes:
+        terms, counts, doc_freqs = _make_terms(n)
+        history = {t: 5 for t in terms[: n // 100]}
+
+        vectorized = _time(
+            lambda: scorer.rank(
+                terms, SECTOR, LOCATION, limit=args.top_k,
+                term_counts=counts, doc_freqs=doc_freqs, n_docs=50, history=history,
+            ),
+            args.repeat,
+        )
+        legacy = _time(lambda: _legacy_rank(terms, SECTOR, LOCATION, args.top_k), args.repeat)
+        print(f"{n:>10} {vectorized * 1000:>10.1f}ms {legacy * 1000:>10.1f}ms {legacy / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
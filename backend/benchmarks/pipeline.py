@@ -0,0 +1,282 @@
+"""
+End-to-end pipeline benchmark
+
+Submits research jobs through POST /api/v1/jobs and lets an in-process
+Celery worker run generate_blog_task on each, with every external service
+(Claude, the research search feed and pages, Resend) served by
+benchmarks.fake_anthropic. Nothing leaves the machine and no credits are
+spent:
+
+    python -m benchmarks.pipeline --jobs 40 --workers 8 --arrival-rate 2
+
+The broker is Celery's in-memory transport and the database defaults to a
+fresh SQLite file; pass --database-url to use a local Postgres instead
+(SQLite serialises writers, which shows up as persist time). Job events
+go to REDIS_URL and are dropped with a warning if Redis isn't running.
+
+Reports jobs/min, per-stage latency percentiles (queue wait, research,
+generation, markdown, pdf, end to end, plus time to first token, parse,
+persist and notify as recorded on each job) and worker utilization. Queued
+notification emails are delivered through the outbox after the run.
+"""
+import argparse
+import asyncio
+import functools
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks import fake_anthropic
+
+STAGES = ["queue_wait", "research", "generation", "markdown", "pdf", "end_to_end"]
+
+# Stages only the job rows know about (ResearchJob.stage_timings)
+RECORDED_STAGES = ["generation_ttft", "parse", "persist", "notify"]
+
+
+class StageRecorder:
+    """Thread-safe per-stage durations, plus task busy time"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.submitted: Dict[int, float] = {}
+        self.started: Dict[str, float] = {}
+        self.finished: Dict[int, float] = {}
+        self.busy = 0.0
+
+    def add(self, stage: str, seconds: float):
+        with self.lock:
+            self.durations[stage].append(seconds)
+
+    def timed(self, stage: str, method):
+        """Wrap an async service method so each call is recorded under stage"""
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return wrapper
+
+    def task_started(self, task_id: str, job_id: int):
+        now = time.perf_counter()
+        with self.lock:
+            self.started[task_id] = now
+            if job_id in self.submitted:
+                self.durations["queue_wait"].append(now - self.submitted[job_id])
+
+    def task_finished(self, task_id: str, job_id: int):
+        now = time.perf_counter()
+        with self.lock:
+            self.busy += now - self.started.pop(task_id, now)
+            self.finished[job_id] = now
+            if job_id in self.submitted:
+                self.durations["end_to_end"].append(now - self.submitted[job_id])
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _configure_environment(args, fake_url: str):
+    """Point settings at the fake services before the app is imported"""
+    storage = tempfile.mkdtemp(prefix="pipeline-bench-")
+    os.environ.update({
+        "DATABASE_URL": args.database_url or f"sqlite:///{storage}/pipeline.db",
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_RESULT_BACKEND": "cache+memory://",
+        "ANTHROPIC_BASE_URL": fake_url,
+        "RESEARCH_SEARCH_URL": f"{fake_url}/search?q={{query}}",
+        # One fake host serves every page; don't throttle it like a real site
+        "RESEARCH_HOST_RATE": "1000",
+        "RESEARCH_HOST_BURST": "100",
+        "RESEARCH_HOST_CONCURRENCY": "8",
+        "RESEARCH_SNAPSHOT_ENABLED": "false",
+        "STORAGE_PATH": storage,
+    })
+    for key, value in {
+        "SECRET_KEY": "pipeline-benchmark",
+        "REDIS_URL": "redis://localhost:6379/0",
+        "ANTHROPIC_API_KEY": "sk-ant-fake",
+        "RESEND_API_KEY": "re_fake",
+        "STRIPE_SECRET_KEY": "sk_test_fake",
+        "STRIPE_PUBLISHABLE_KEY": "pk_test_fake",
+        "PAYSTACK_SECRET_KEY": "sk_test_fake",
+        "PAYSTACK_PUBLIC_KEY": "pk_test_fake",
+        "BCRYPT_ROUNDS": "4",
+    }.items():
+        os.environ.setdefault(key, value)
+
+
+def _instrument(recorder: StageRecorder):
+    """Time the service calls generate_blog_task makes, and task busy time"""
+    from celery.signals import task_postrun, task_prerun
+    from app.services.blog_generation_service import BlogGenerationService
+    from app.services.research_service import ResearchService
+    from app.services.storage_service import StorageService
+
+    for cls, name, stage in [
+        (ResearchService, "research_sector", "research"),
+        (BlogGenerationService, "generate_blog", "generation"),
+        (StorageService, "save_markdown", "markdown"),
+        (StorageService, "save_pdf", "pdf"),
+    ]:
+        setattr(cls, name, recorder.timed(stage, getattr(cls, name)))
+
+    @task_prerun.connect(weak=False)
+    def on_prerun(task_id=None, task=None, args=None, **_):
+        if task.name == "generate_blog_task":
+            recorder.task_started(task_id, args[0])
+
+    @task_postrun.connect(weak=False)
+    def on_postrun(task_id=None, task=None, args=None, **_):
+        if task.name == "generate_blog_task":
+            recorder.task_finished(task_id, args[0])
+
+
+async def _submit(app, recorder: StageRecorder, jobs: int, arrival_rate: float, word_count: str) -> List[int]:
+    """Register a Pro user and POST jobs at the arrival rate (0 = all at once)"""
+    import httpx
+    from app.core.database import SessionLocal
+    from app.models import User
+    from app.models.user import SubscriptionTier
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://pipeline-bench", timeout=60) as client:
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        response = await client.post("/api/v1/auth/register", json={
+            "email": email, "password": "benchmark-password",
+            "full_name": "Pipeline Benchmark", "country": "US",
+        })
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        with SessionLocal() as db:
+            db.query(User).filter(User.email == email).update({"subscription_tier": SubscriptionTier.PRO})
+            db.commit()
+
+        job_ids = []
+        sectors = ["Fintech", "Real Estate", "Agriculture", "Healthcare", "Renewable Energy"]
+        for i in range(jobs):
+            response = await client.post("/api/v1/jobs", json={
+                "sector": sectors[i % len(sectors)],
+                "location": "Ghana",
+                "target_word_count": word_count,
+            })
+            response.raise_for_status()
+            job_id = response.json()["id"]
+            with recorder.lock:
+                recorder.submitted[job_id] = time.perf_counter()
+            job_ids.append(job_id)
+            if arrival_rate > 0:
+                await asyncio.sleep(1 / arrival_rate)
+        return job_ids
+
+
+def _wait(job_ids: List[int], timeout: float) -> Dict[str, int]:
+    """Poll until every job is completed or failed"""
+    from app.core.database import SessionLocal
+    from app.models import JobStatus, ResearchJob
+
+    deadline = time.monotonic() + timeout
+    while True:
+        with SessionLocal() as db:
+            statuses = [s for (s,) in db.query(ResearchJob.status).filter(ResearchJob.id.in_(job_ids)).all()]
+        counts = {
+            "completed": sum(s == JobStatus.COMPLETED for s in statuses),
+            "failed": sum(s == JobStatus.FAILED for s in statuses),
+        }
+        if counts["completed"] + counts["failed"] >= len(job_ids) or time.monotonic() > deadline:
+            counts["unfinished"] = len(job_ids) - counts["completed"] - counts["failed"]
+            return counts
+        time.sleep(0.25)
+
+
+def _recorded(job_ids: List[int]) -> Dict[str, List[float]]:
+    """Stage timings generate_blog_task persisted on the job rows"""
+    from app.core.database import SessionLocal
+    from app.models import ResearchJob
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    with SessionLocal() as db:
+        for (timings,) in db.query(ResearchJob.stage_timings).filter(ResearchJob.id.in_(job_ids)).all():
+            for stage in RECORDED_STAGES:
+                if (timings or {}).get(stage) is not None:
+                    samples[stage].append(timings[stage])
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4, help="Celery worker concurrency (threads)")
+    parser.add_argument("--arrival-rate", type=float, default=0.0, help="Jobs submitted per second (0 = all at once)")
+    parser.add_argument("--word-count", default="1200-1800", help="target_word_count for every job")
+    parser.add_argument("--database-url", default=None, help="Defaults to a fresh SQLite file")
+    parser.add_argument("--port", type=int, default=8100, help="Port for the fake services")
+    parser.add_argument("--timeout", type=float, default=600)
+    fake_anthropic.add_arguments(parser)
+    args = parser.parse_args()
+
+    fake = fake_anthropic.from_arguments(args)
+    fake.serve(port=args.port)
+    fake_url = f"http://127.0.0.1:{args.port}"
+    _configure_environment(args, fake_url)
+
+    import resend
+    resend.api_url = fake_url
+
+    from celery.contrib.testing.worker import start_worker
+    from app.main import app
+    from app.tasks.celery_app import celery_app
+
+    recorder = StageRecorder()
+    _instrument(recorder)
+
+    with start_worker(celery_app, pool="threads", concurrency=args.workers, perform_ping_check=False, loglevel="WARNING"):
+        started = time.perf_counter()
+        job_ids = asyncio.run(_submit(app, recorder, args.jobs, args.arrival_rate, args.word_count))
+        counts = _wait(job_ids, args.timeout)
+        elapsed = time.perf_counter() - started
+
+    from app.core.database import SessionLocal
+    from app.services.email_outbox_service import EmailOutboxService
+
+    with SessionLocal() as db:
+        emails = EmailOutboxService().drain(db)
+
+    recorder.durations.update(_recorded(job_ids))
+    finished = [recorder.finished[j] for j in job_ids if j in recorder.finished]
+    span = (max(finished) - started) if finished else elapsed
+    stats = fake.snapshot()
+
+    print(f"jobs:               {len(job_ids)} ({counts['completed']} completed, {counts['failed']} failed, {counts['unfinished']} unfinished)")
+    print(f"workers:            {args.workers}")
+    print(f"wall time:          {elapsed:.1f}s")
+    print(f"throughput:         {counts['completed'] / span * 60:.1f} jobs/min")
+    print(f"worker utilization: {recorder.busy / (span * args.workers) * 100:.0f}%")
+    print(f"claude requests:    {stats['requests']} ({stats['streamed']} streamed, {stats['rate_limited']} rate limited)")
+    print(f"claude tokens:      {stats['input_tokens']:,} in, {stats['output_tokens']:,} out")
+    print(f"emails:             {emails['sent']} sent from the outbox, {emails['failed']} failed")
+    print()
+    print(f"{'stage':<16} {'n':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for stage in STAGES[:3] + RECORDED_STAGES[:3] + STAGES[3:5] + RECORDED_STAGES[3:] + STAGES[5:]:
+        values = recorder.durations.get(stage)
+        if not values:
+            continue
+        p50, p95, p99 = (_percentile(values, q) * 1000 for q in (0.5, 0.95, 0.99))
+        print(f"{stage:<16} {len(values):>5} {p50:>7,.0f}ms {p95:>7,.0f}ms {p99:>7,.0f}ms {max(values) * 1000:>7,.0f}ms")
+    if len(recorder.durations.get("end_to_end", [])) > 1:
+        print(f"\nend-to-end stdev: {statistics.stdev(recorder.durations['end_to_end']) * 1000:,.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Topic clustering benchmark
+
+Generates synthetic stories, each syndicated under a few outlet-style
+variants of its headline, and times TopicClusterer against an exhaustive
+pairwise comparison of exact shingle sets:
+
+    python -m benchmarks.topic_clustering --sizes 1000 10000 50000
+
+Also reports how many synthetic stories collapsed into exactly one cluster.
+"""
+import argparse
+import random
+import string
+import time
+from collections import Counter
+
+from app.services.topic_clustering import SIMILARITY_THRESHOLD, TopicClusterer, _shingles
+
+OUTLETS = ["MyJoyOnline", "GhanaWeb", "Citi Newsroom", "Graphic Online", "Reuters"]
+
+
+def _make_topics(n: int, seed: int = 3):
+    """Roughly n topics: stories of 1-4 syndicated copies each"""
+    rng = random.Random(seed)
+    topics, story_of = [], []
+    story = 0
+    while len(topics) < n:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(6, 11))]
+        headline = " ".join(words)
+        for copy in range(rng.randint(1, 4)):
+            title = headline.title() if copy % 2 else headline
+            if copy:
+                title = f"{title} {rng.choice(['-', '|'])} {rng.choice(OUTLETS)}"
+            topics.append({"title": title, "relevance": rng.choice([0.6, 0.85, 0.9])})
+            story_of.append(story)
+        story += 1
+    return topics, story_of
+
+
+def _exhaustive(topics):
+    """O(n^2) exact Jaccard comparison, for reference"""
+    sets = [set(_shingles(t["title"]).tolist()) for t in topics]
+    pairs = 0
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            if len(sets[i] & sets[j]) / max(len(sets[i] | sets[j]), 1) >= SIMILARITY_THRESHOLD:
+                pairs += 1
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--exhaustive-max", type=int, default=2_000, help="Skip the O(n^2) reference above this size")
+    args = parser.parse_args()
+
+    clusterer = TopicClusterer()
+    print(f"{'topics':>8} {'stories':>8} {'clusters':>9} {'exact':>7} {'minhash':>10} {'exhaustive':>11}")
+    for n in args.sizes:
+        topics, story_of = _make_topics(n)
+        stories = len(set(story_of))
+
+        for topic, story in zip(topics, story_of):
+            topic["story"] = story
+        start = time.perf_counter()
+        clustered = clusterer.cluster(topics)
+        elapsed = time.perf_counter() - start
+
+        # A story is recovered exactly when one cluster holds all its copies
+        copies = Counter(story_of)
+        exact = sum(1 for c in clustered if c["cluster_size"] == copies[c["story"]])
+
+        reference = "-"
+        if n <= args.exhaustive_max:
+            start = time.perf_counter()
+            _exhaustive(topics)
+            reference = f"{(time.perf_counter() - start) * 1000:,.0f}ms"
+        print(f"{n:>8} {stories:>8} {len(clustered):>9} {exact:>7} {elapsed * 1000:>8,.0f}ms {reference:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Trace report
+
+Summarises spans written by the file exporter (TRACING_EXPORTER=file):
+latency percentiles per span name, then, for the slowest traces, where
+their time went. Self time is a span's duration minus the time covered by
+its children, so a parent isn't charged for time its concurrent children
+(research fetches, long-form sections) cover. Those siblings each count
+their own time, so per-name totals can exceed the trace length.
+
+    TRACING_ENABLED=true TRACING_EXPORTER=file python -m benchmarks.pipeline --jobs 40
+    python -m benchmarks.trace_report /tmp/content-scout-traces.jsonl --tail 0.05
+
+Spans from both the API and worker processes can be appended to the same
+file; traces are joined by trace id.
+"""
+import argparse
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _covered(intervals: List[Tuple[float, float]]) -> float:
+    """Total length of the union of (start, end) intervals"""
+    total, end = 0.0, float("-inf")
+    for start, stop in sorted(intervals):
+        if stop <= max(start, end):
+            continue
+        total += stop - max(start, end)
+        end = stop
+    return total
+
+
+def load(path: str) -> Dict[str, List[dict]]:
+    """Spans grouped by trace id, with start/end in milliseconds"""
+    traces: Dict[str, List[dict]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            span = json.loads(line)
+            span["start_ms"] = datetime.fromisoformat(span["start"]).timestamp() * 1000
+            span["end_ms"] = span["start_ms"] + span["duration_ms"]
+            traces[span["trace_id"]].append(span)
+    return traces
+
+
+def self_times(spans: List[dict]) -> Dict[str, float]:
+    """Self time per span name within one trace"""
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append((span["start_ms"], span["end_ms"]))
+    totals: Dict[str, float] = defaultdict(float)
+    for span in spans:
+        covered = _covered([
+            (max(start, span["start_ms"]), min(end, span["end_ms"]))
+            for start, end in children.get(span["span_id"], [])
+        ])
+        totals[span["name"]] += max(span["duration_ms"] - covered, 0.0)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSON lines written by the file exporter")
+    parser.add_argument("--tail", type=float, default=0.05, help="Fraction of slowest traces to break down")
+    parser.add_argument("--top", type=int, default=15, help="Span names shown per table")
+    args = parser.parse_args()
+
+    traces = load(args.path)
+    durations: Dict[str, List[float]] = defaultdict(list)
+    for spans in traces.values():
+        for span in spans:
+            durations[span["name"]].append(span["duration_ms"])
+
+    print(f"traces: {len(traces)}, spans: {sum(len(spans) for spans in traces.values())}")
+    print()
+    print(f"{'span':<40} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    by_total = sorted(durations.items(), key=lambda item: sum(item[1]), reverse=True)
+    for name, values in by_total[:args.top]:
+        p50, p95, p99 = (_percentile(values, q) for q in (0.5, 0.95, 0.99))
+        print(f"{name[:40]:<40} {len(values):>6} {p50:>7,.0f}ms {p95:>7,.0f}ms {p99:>7,.0f}ms {max(values):>7,.0f}ms")
+
+    # A trace's length is first start to last end, across processes
+    lengths = {
+        trace_id: max(s["end_ms"] for s in spans) - min(s["start_ms"] for s in spans)
+        for trace_id, spans in traces.items()
+    }
+    slowest = sorted(lengths, key=lengths.get, reverse=True)[:max(1, int(len(lengths) * args.tail))]
+    totals: Dict[str, float] = defaultdict(float)
+    for trace_id in slowest:
+        for name, ms in self_times(traces[trace_id]).items():
+            totals[name] += ms
+    grand_total = sum(totals.values()) or 1.0
+
+    print()
+    print(f"self time in the slowest {len(slowest)} trace(s) (>= {lengths[slowest[-1]]:,.0f}ms):")
+    for name, ms in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name[:40]:<40} {ms / len(slowest):>9,.0f}ms/trace {ms / grand_total * 100:>5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+-- Migration: Add full-text search index to blogs
+-- Date: 2026-10-19
+-- Description: Stored generated tsvector over title/summary/content with a GIN index (requires PostgreSQL 12+)
+-- Adding the generated column rewrites blogs under an exclusive lock; run it in a quiet period.
+
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(content, '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_blogs_search_vector ON blogs USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS ix_blogs_user_id ON blogs (user_id);
+
+COMMENT ON COLUMN blogs.search_vector IS 'Weighted full-text vector (title A, summary B, content C), maintained by Postgres';
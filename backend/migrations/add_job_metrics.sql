@@ -0,0 +1,11 @@
+-- Migration: Add per-stage timings and token usage to research_jobs
+-- Date: 2026-10-19
+-- Description: Filled in by generate_blog_task; aggregated by GET /admin/metrics/jobs
+
+ALTER TABLE research_jobs ADD COLUMN IF NOT EXISTS stage_timings JSON;
+ALTER TABLE research_jobs ADD COLUMN IF NOT EXISTS input_tokens INTEGER;
+ALTER TABLE research_jobs ADD COLUMN IF NOT EXISTS output_tokens INTEGER;
+ALTER TABLE research_jobs ADD COLUMN IF NOT EXISTS cached_tokens INTEGER;
+
+COMMENT ON COLUMN research_jobs.stage_timings IS 'Seconds spent per pipeline stage (queue_wait, research, generation_ttft, generation, parse, persist, markdown, pdf, notify)';
+COMMENT ON COLUMN research_jobs.cached_tokens IS 'Prompt tokens served from the prompt cache';
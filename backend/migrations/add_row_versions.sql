@@ -0,0 +1,9 @@
+-- Migration: Add row version columns to blogs and research_jobs
+-- Date: 2026-10-19
+-- Description: Integer version bumped on every UPDATE, used to build ETags for conditional GETs
+
+ALTER TABLE blogs ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE research_jobs ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+COMMENT ON COLUMN blogs.version IS 'Row version, incremented by the ORM on every update (ETag source)';
+COMMENT ON COLUMN research_jobs.version IS 'Row version, incremented by the ORM on every update (ETag source)';
@@ -0,0 +1,26 @@
+-- Migration: Index research snapshots in the keyword index
+-- Date: 2026-10-19
+-- Description: A research snapshot's keywords are indexed once, when it is built, instead of
+-- once per job served from it. Postings get a surrogate key and either a job_id or a snapshot_id.
+
+ALTER TABLE keyword_postings DROP CONSTRAINT IF EXISTS keyword_postings_pkey;
+ALTER TABLE keyword_postings ADD COLUMN IF NOT EXISTS id SERIAL PRIMARY KEY;
+ALTER TABLE keyword_postings ALTER COLUMN job_id DROP NOT NULL;
+ALTER TABLE keyword_postings ADD COLUMN IF NOT EXISTS snapshot_id INTEGER;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_keyword_postings_job ON keyword_postings (keyword_id, job_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_keyword_postings_snapshot ON keyword_postings (keyword_id, snapshot_id);
+
+COMMENT ON COLUMN keyword_postings.snapshot_id IS 'research_snapshots.id the keyword was found by (set instead of job_id)';
+
+-- Jobs served from a snapshot were indexed like live research: drop their
+-- postings and recount. Run the rebuild_keyword_index task afterwards to
+-- index the existing snapshots.
+DELETE FROM keyword_postings p USING research_jobs j
+WHERE p.job_id = j.id AND (j.research_data::jsonb) ? 'snapshot_version';
+
+UPDATE keyword_stats s SET job_count = (
+    SELECT count(*) FROM keyword_postings p
+    WHERE p.keyword_id = s.keyword_id AND p.sector = s.sector AND p.location = s.location
+);
+DELETE FROM keyword_stats WHERE job_count = 0;
@@ -0,0 +1,10 @@
+-- Migration: Add an explicit admin flag to users
+-- Date: 2026-10-19
+-- Description: Admin endpoints (/api/v1/admin/*) require users.is_admin instead of an email
+-- matching ADMIN_EMAIL, which anyone could register. Nobody is an admin until granted:
+--
+--   UPDATE users SET is_admin = true WHERE id = <user id>;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS is_admin BOOLEAN NOT NULL DEFAULT false;
+
+COMMENT ON COLUMN users.is_admin IS 'Grants access to /api/v1/admin endpoints; only ever set directly in the database';